@@ -1,21 +1,34 @@
 #!/usr/bin/env python3
 """
 Ajio Search Script
-Navigates to Ajio.com, searches for keywords from zara_keywords.json, waits 3 seconds between searches
+Navigates to Ajio.com, searches for keywords from keywords.json, waits 3 seconds between searches
 """
 
 import time
 import json
 import random
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+import heartbeat
+import metrics
+from utils import filter_keywords
+from site_registry import get_site
+from selector_cache import SelectorResolver
+from browser_setup import create_driver
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Search result link selectors, tried in order until one matches (the matching one is remembered)
+PRODUCT_LINK_SELECTORS = [
+    "a.rilrtl-products-list_link.desktop",
+    "a[class*='products-list_link']",
+    "a[href*='/p/']",
+]
 
 def random_delay(min_seconds=1, max_seconds=3):
     """Add random delay to mimic human behavior"""
@@ -30,13 +43,26 @@ def human_like_typing(element, text):
 
 def main():
     try:
-        with open('zara_keywords.json', 'r') as f:
+        with open('keywords.json', 'r') as f:
             keywords_data = json.load(f)
-        print(f"Loaded {len(keywords_data)} keywords from zara_keywords.json")
+        logger.info("Loaded %s keywords from keywords.json", len(keywords_data))
     except Exception as e:
-        print(f"Error loading keywords file: {e}")
+        logger.error("Error loading keywords file: %s", e)
         return
     
+    start_id, end_id = get_site("ajio")["keyword_range"]
+    
+    filtered_keywords = filter_keywords(keywords_data, start_id, end_id)
+    
+    logger.info("Scraping keywords with IDs %s to %s", start_id, end_id)
+    logger.info("Total keywords to scrape: %s", len(filtered_keywords))
+    
+    if not filtered_keywords:
+        logger.warning("No keywords found in range %s-%s", start_id, end_id)
+        return
+    
+    metrics.start_metrics("ajio")
+    selectors = SelectorResolver("ajio")
     chrome_options = Options()
     
     chrome_options.add_argument("--no-sandbox")
@@ -72,8 +98,13 @@ def main():
     window_sizes = ["1920,1080", "1366,768", "1440,900", "1536,864"]
     chrome_options.add_argument(f"--window-size={random.choice(window_sizes)}")
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    # No records to keep; the checkpoint only tells a watchdog restart which keywords are done
+    _, done_keyword_ids = heartbeat.load_checkpoint()
+    if done_keyword_ids:
+        logger.info("⏩ Resuming from checkpoint: %s keywords already done", len(done_keyword_ids))
+    
+    heartbeat.beat("startup")
+    driver = create_driver(chrome_options, "ajio")
     
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     driver.execute_cdp_cmd('Network.setUserAgentOverride', {
@@ -86,32 +117,35 @@ def main():
     try:
         wait = WebDriverWait(driver, 15)
         
-        print("Navigating to Ajio...")
+        logger.debug("Navigating to Ajio...")
         driver.get("https://www.ajio.com/")
         
         random_delay(2, 4)
         
-        print("Waiting for page to load...")
+        logger.debug("Waiting for page to load...")
         try:
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "[aria-label='Search Ajio']")))
-            print("✅ Page loaded successfully - search input found")
+            logger.info("✅ Page loaded successfully - search input found")
             random_delay(1, 2)  
         except TimeoutException:
-            print("❌ Page load timeout - search input not found within 15 seconds")
+            logger.error("❌ Page load timeout - search input not found within 15 seconds")
             return
         
-        for i, keyword_obj in enumerate(keywords_data):
+        for i, keyword_obj in enumerate(filtered_keywords):
             keyword_id = keyword_obj["id"]
             keyword = keyword_obj["keyword"]
-            print(f"\nSearching for keyword {i+1}/{len(keywords_data)}: '{keyword}' (ID: {keyword_id})")
+            if str(keyword_id) in done_keyword_ids:
+                continue
+            logger.info("Searching for keyword %s/%s: '%s' (ID: %s)", i+1, len(filtered_keywords), keyword, keyword_id)
+            heartbeat.beat("search", keyword_id=keyword_id, keyword=keyword)
             
             try:
                 if i > 0:
-                    print("Navigating back to main page...")
+                    logger.debug("Navigating back to main page...")
                     driver.get("https://www.ajio.com/")
                     random_delay(2, 4)  
                 
-                print(f"Looking for search input for keyword: '{keyword}'")
+                logger.debug("Looking for search input for keyword: '%s'", keyword)
                 search_input = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[aria-label='Search Ajio']")))
                 
                 random_delay(0.5, 1.5)
@@ -119,25 +153,25 @@ def main():
                 search_input.clear()
                 search_input.send_keys(Keys.CONTROL + "a")
                 search_input.send_keys(Keys.DELETE)
-                print(f"Cleared search input for keyword: '{keyword}'")
+                logger.debug("Cleared search input for keyword: '%s'", keyword)
                 
                 random_delay(0.3, 0.8)
                 
                 human_like_typing(search_input, keyword)
-                print(f"Typed: {keyword}")
+                logger.debug("Typed: %s", keyword)
                 
                 random_delay(0.5, 1.0)
                 
                 search_input.send_keys(Keys.RETURN)
-                print("Pressed Enter")
+                logger.debug("Pressed Enter")
                 
-                print("Waiting for search results to load...")
+                logger.debug("Waiting for search results to load...")
                 random_delay(3, 5)
                 
                 try:
-                    print("Looking for gender filter...")
+                    logger.debug("Looking for gender filter...")
                     
-                    print("Debugging: Looking for all possible gender filter elements...")
+                    logger.debug("Debugging: Looking for all possible gender filter elements...")
                     
                     gender_selectors = [
                         "div.facet-linkhead",
@@ -152,27 +186,28 @@ def main():
                     ]
                     
                     gender_filter_div = None
-                    for selector in gender_selectors:
+                    for selector in selectors.ordered("gender_filter", gender_selectors):
                         try:
                             elements = driver.find_elements(By.CSS_SELECTOR, selector)
                             if elements:
-                                print(f"Found {len(elements)} elements with selector: {selector}")
+                                logger.debug("Found %s elements with selector: %s", len(elements), selector)
                                 for i, elem in enumerate(elements):
                                     try:
                                         text = elem.text.strip()
                                         if text and ('gender' in text.lower() or 'women' in text.lower() or 'men' in text.lower()):
-                                            print(f"  Element {i}: '{text}'")
+                                            logger.debug("  Element %s: '%s'", i, text)
                                             gender_filter_div = elem
                                             break
                                     except:
                                         pass
                                 if gender_filter_div:
+                                    selectors.remember("gender_filter", selector)
                                     break
                         except:
                             continue
                     
                     if gender_filter_div:
-                        print("Found gender filter div")
+                        logger.debug("Found gender filter div")
                         
                         women_selectors = [
                             "input[id='women']",
@@ -191,7 +226,7 @@ def main():
                         ]
                         
                         women_checkbox = None
-                        for selector in women_selectors:
+                        for selector in selectors.ordered("women_checkbox", women_selectors):
                             try:
                                 if gender_filter_div:
                                     checkboxes = gender_filter_div.find_elements(By.CSS_SELECTOR, selector)
@@ -206,48 +241,43 @@ def main():
                                         
                                         if any(keyword in (checkbox_id + checkbox_value + checkbox_name).lower() 
                                                for keyword in ['women', 'female', 'girl']):
-                                            print(f"Found potential women checkbox: id='{checkbox_id}', value='{checkbox_value}', name='{checkbox_name}'")
+                                            logger.debug("Found potential women checkbox: id='%s', value='%s', name='%s'", checkbox_id, checkbox_value, checkbox_name)
                                             women_checkbox = checkbox
                                             break
                                     except:
                                         pass
                                 
                                 if women_checkbox:
+                                    selectors.remember("women_checkbox", selector)
                                     break
                             except:
                                 continue
                         
                         if women_checkbox:
-                            print("Found women checkbox, clicking it...")
+                            logger.debug("Found women checkbox, clicking it...")
                             try:
                                 driver.execute_script("arguments[0].scrollIntoView(true);", women_checkbox)
                                 time.sleep(1)
                                 
                                 women_checkbox.click()
-                                print("Clicked women checkbox using regular click")
+                                logger.debug("Clicked women checkbox using regular click")
                             except:
                                 try:    
                                     driver.execute_script("arguments[0].click();", women_checkbox)
-                                    print("Clicked women checkbox using JavaScript")
+                                    logger.debug("Clicked women checkbox using JavaScript")
                                 except Exception as js_error:
-                                    print(f"JavaScript click also failed: {js_error}")
+                                    logger.debug("JavaScript click also failed: %s", js_error)
                             
-                            print("Waiting after clicking women filter...")
+                            logger.debug("Waiting after clicking women filter...")
                             random_delay(3, 5)
                             
-                            print("Looking for product links to visit...")
+                            logger.debug("Looking for product links to visit...")
                             try:
                                 random_delay(2, 4)
                                 
-                                product_links = driver.find_elements(By.CSS_SELECTOR, "a.rilrtl-products-list_link.desktop")
+                                product_links = selectors.find_elements(driver, "product_links", PRODUCT_LINK_SELECTORS)
                                 
-                                if not product_links:
-                                    product_links = driver.find_elements(By.CSS_SELECTOR, "a[class*='products-list_link']")
-                                
-                                if not product_links:
-                                    product_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']")
-                                
-                                print(f"Found {len(product_links)} product links")
+                                logger.info("Found %s product links", len(product_links))
                                 
                                 products_to_visit = min(10, len(product_links))
                                 
@@ -257,32 +287,36 @@ def main():
                                         product_url = product_link.get_attribute('href')
                                         product_name = product_link.get_attribute('aria-label') or product_link.text.strip()
                                         
-                                        print(f"\n--- Visiting Product {i+1}/{products_to_visit} ---")
-                                        print(f"Product: {product_name}")
-                                        print(f"URL: {product_url}")
+                                        logger.debug("--- Visiting Product %s/%s ---", i+1, products_to_visit)
+                                        logger.debug("Product: %s", product_name)
+                                        logger.debug("URL: %s", product_url)
+                                        
+                                        pdp_started = time.time()
                                         
+                                        heartbeat.beat("pdp_load", product=product_url)
                                         driver.get(product_url)
                                         
                                         random_delay(3, 5)
+                                        metrics.observe_phase("pdp_load", pdp_started)
                                         
                                         try:
                                             page_title = driver.title
-                                            print(f"Page Title: {page_title}")
+                                            logger.debug("Page Title: %s", page_title)
                                             
                                             current_url = driver.current_url
-                                            print(f"Current URL: {current_url}")
+                                            logger.debug("Current URL: %s", current_url)
                                             
 
                                             
                                         except Exception as detail_error:
-                                            print(f"Error extracting product details: {detail_error}")
+                                            logger.debug("Error extracting product details: %s", detail_error)
                                         
                                         driver.back()
                                         
                                         random_delay(2, 4)
                                         
                                     except Exception as product_error:
-                                        print(f"Error visiting product {i+1}: {product_error}")
+                                        logger.warning("Error visiting product %s: %s", i+1, product_error)
                                         try:
                                             driver.back()
                                             random_delay(2, 3)
@@ -291,38 +325,32 @@ def main():
                                             random_delay(2, 4)
                                         continue
                                 
-                                print(f"Completed visiting {products_to_visit} product detail pages")
+                                logger.info("Completed visiting %s product detail pages", products_to_visit)
                                 
                             except Exception as visit_error:
-                                print(f"Error during product page visits: {visit_error}")
+                                logger.warning("Error during product page visits: %s", visit_error)
                                 import traceback
                                 traceback.print_exc()
                         else:
-                            print("Women checkbox not found with any selector")
+                            logger.debug("Women checkbox not found with any selector")
                             all_checkboxes = driver.find_elements(By.CSS_SELECTOR, "input[type='checkbox']")
-                            print(f"Found {len(all_checkboxes)} total checkboxes on page")
+                            logger.debug("Found %s total checkboxes on page", len(all_checkboxes))
                             for i, cb in enumerate(all_checkboxes[:5]):  
                                 try:
                                     cb_id = cb.get_attribute('id') or 'no-id'
                                     cb_value = cb.get_attribute('value') or 'no-value'
                                     cb_name = cb.get_attribute('name') or 'no-name'
-                                    print(f"  Checkbox {i}: id='{cb_id}', value='{cb_value}', name='{cb_name}'")
+                                    logger.debug("  Checkbox %s: id='%s', value='%s', name='%s'", i, cb_id, cb_value, cb_name)
                                 except:
                                     pass
                             
-                            print("Attempting to visit product pages without women filter...")
+                            logger.debug("Attempting to visit product pages without women filter...")
                             try:
                                 random_delay(2, 4)
                                 
-                                product_links = driver.find_elements(By.CSS_SELECTOR, "a.rilrtl-products-list_link.desktop")
-                                
-                                if not product_links:
-                                    product_links = driver.find_elements(By.CSS_SELECTOR, "a[class*='products-list_link']")
-                                
-                                if not product_links:
-                                    product_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']")
+                                product_links = selectors.find_elements(driver, "product_links", PRODUCT_LINK_SELECTORS)
                                 
-                                print(f"Found {len(product_links)} product links")
+                                logger.info("Found %s product links", len(product_links))
                                 
                                 products_to_visit = min(10, len(product_links))
                                 
@@ -332,30 +360,34 @@ def main():
                                         product_url = product_link.get_attribute('href')
                                         product_name = product_link.get_attribute('aria-label') or product_link.text.strip()
                                         
-                                        print(f"\n--- Visiting Product {i+1}/{products_to_visit} ---")
-                                        print(f"Product: {product_name}")
-                                        print(f"URL: {product_url}")
+                                        logger.debug("--- Visiting Product %s/%s ---", i+1, products_to_visit)
+                                        logger.debug("Product: %s", product_name)
+                                        logger.debug("URL: %s", product_url)
                                         
+                                        pdp_started = time.time()
+                                        
+                                        heartbeat.beat("pdp_load", product=product_url)
                                         driver.get(product_url)
                                         
                                         random_delay(3, 5)
+                                        metrics.observe_phase("pdp_load", pdp_started)
                                         
                                         try:
                                             page_title = driver.title
-                                            print(f"Page Title: {page_title}")
+                                            logger.debug("Page Title: %s", page_title)
                                             
                                             current_url = driver.current_url
-                                            print(f"Current URL: {current_url}")
+                                            logger.debug("Current URL: %s", current_url)
                                             
                                         except Exception as detail_error:
-                                            print(f"Error extracting product details: {detail_error}")
+                                            logger.debug("Error extracting product details: %s", detail_error)
                                         
                                         driver.back()
                                         
                                         random_delay(2, 4)
                                         
                                     except Exception as product_error:
-                                        print(f"Error visiting product {i+1}: {product_error}")
+                                        logger.warning("Error visiting product %s: %s", i+1, product_error)
                                         try:
                                             driver.back()
                                             random_delay(2, 3)
@@ -364,36 +396,30 @@ def main():
                                             random_delay(2, 4)
                                         continue
                                 
-                                print(f"Completed visiting {products_to_visit} product detail pages")
+                                logger.info("Completed visiting %s product detail pages", products_to_visit)
                                 
                             except Exception as visit_error:
-                                print(f"Error during product page visits: {visit_error}")
+                                logger.warning("Error during product page visits: %s", visit_error)
                                 import traceback
                                 traceback.print_exc()
                     else:
-                        print("Gender filter div not found with any selector")
+                        logger.debug("Gender filter div not found with any selector")
                         filter_elements = driver.find_elements(By.CSS_SELECTOR, "div[class*='filter'], div[class*='Filter'], div[class*='facet'], div[class*='Facet']")
-                        print(f"Found {len(filter_elements)} filter-related elements")
+                        logger.debug("Found %s filter-related elements", len(filter_elements))
                         for i, elem in enumerate(filter_elements[:3]):  
                             try:
                                 text = elem.text.strip()[:100]  
-                                print(f"  Filter element {i}: '{text}'")
+                                logger.debug("  Filter element %s: '%s'", i, text)
                             except:
                                 pass
                         
-                        print("Attempting to visit product pages without any filter...")
+                        logger.debug("Attempting to visit product pages without any filter...")
                         try:
                             time.sleep(2)
                             
-                            product_links = driver.find_elements(By.CSS_SELECTOR, "a.rilrtl-products-list_link.desktop")
-                            
-                            if not product_links:
-                                product_links = driver.find_elements(By.CSS_SELECTOR, "a[class*='products-list_link']")
+                            product_links = selectors.find_elements(driver, "product_links", PRODUCT_LINK_SELECTORS)
                             
-                            if not product_links:
-                                product_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']")
-                            
-                            print(f"Found {len(product_links)} product links")
+                            logger.info("Found %s product links", len(product_links))
                             
                             products_to_visit = min(10, len(product_links))
                             
@@ -403,30 +429,34 @@ def main():
                                     product_url = product_link.get_attribute('href')
                                     product_name = product_link.get_attribute('aria-label') or product_link.text.strip()
                                     
-                                    print(f"\n--- Visiting Product {i+1}/{products_to_visit} ---")
-                                    print(f"Product: {product_name}")
-                                    print(f"URL: {product_url}")
+                                    logger.debug("--- Visiting Product %s/%s ---", i+1, products_to_visit)
+                                    logger.debug("Product: %s", product_name)
+                                    logger.debug("URL: %s", product_url)
+                                    
+                                    pdp_started = time.time()
                                     
+                                    heartbeat.beat("pdp_load", product=product_url)
                                     driver.get(product_url)
                                     
                                     random_delay(3, 5)
+                                    metrics.observe_phase("pdp_load", pdp_started)
                                     
                                     try:
                                         page_title = driver.title
-                                        print(f"Page Title: {page_title}")
+                                        logger.debug("Page Title: %s", page_title)
                                         
                                         current_url = driver.current_url
-                                        print(f"Current URL: {current_url}")
+                                        logger.debug("Current URL: %s", current_url)
                                         
                                     except Exception as detail_error:
-                                        print(f"Error extracting product details: {detail_error}")
+                                        logger.debug("Error extracting product details: %s", detail_error)
                                     
                                     driver.back()
                                     
                                     random_delay(2, 4)
                                     
                                 except Exception as product_error:
-                                    print(f"Error visiting product {i+1}: {product_error}")
+                                    logger.warning("Error visiting product %s: %s", i+1, product_error)
                                     try:
                                         driver.back()
                                         random_delay(2, 3)
@@ -435,35 +465,38 @@ def main():
                                         random_delay(2, 4)
                                     continue
                             
-                            print(f"Completed visiting {products_to_visit} product detail pages")
+                            logger.info("Completed visiting %s product detail pages", products_to_visit)
                             
                         except Exception as visit_error:
-                            print(f"Error during product page visits: {visit_error}")
+                            logger.warning("Error during product page visits: %s", visit_error)
                             import traceback
                             traceback.print_exc()
                                 
                 except Exception as e:
-                    print(f"Error with gender filter: {e}")
+                    logger.warning("Error with gender filter: %s", e)
                     import traceback
                     traceback.print_exc()
                 
-                print(f"Completed search for keyword: '{keyword}'")
+                logger.info("Completed search for keyword: '%s'", keyword)
+                metrics.keyword_done()
+                done_keyword_ids.add(str(keyword_id))
+                heartbeat.save_checkpoint([], done_keyword_ids)
                 
             except TimeoutException as e:
-                print(f"Timeout error searching for keyword '{keyword}': {e}")
+                logger.error("Timeout error searching for keyword '%s': %s", keyword, e)
                 continue
             except Exception as e:
-                print(f"Error searching for keyword '{keyword}': {e}")
+                logger.error("Error searching for keyword '%s': %s", keyword, e)
                 continue
         
-        print("\nAll keyword searches completed!")
+        logger.info("All keyword searches completed!")
         
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
     
     finally:
         driver.quit()
-        print("Browser closed")
+        logger.info("Browser closed")
 
 if __name__ == "__main__":
     main()
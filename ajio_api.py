@@ -1,10 +1,17 @@
 from curl_cffi import requests as cureq
-from utils import get_random_headers
+from utils import filter_keywords, get_output_file, get_random_headers
+from site_registry import get_site
+import heartbeat
+import metrics
+import argparse
 import json
 from urllib.parse import quote
 import time
 import random
 import os
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
 
 search_url = "https://www.ajio.com/api/search?fields=SITE&currentPage=1&pageSize=45&format=json&classifier=intent&gridColumns=3&advfilter=true&platform=Desktop&is_ads_enable_plp=true&is_ads_enable_slp=true&showAdsOnNextPage=false&displayRatings=true&previousSource=Saas&vertexEnabled=false&segmentIds=,"
 
@@ -14,12 +21,140 @@ PROXY_LIST = []
 
 current_proxy_index = 0
 
+# Hybrid mode: a real Chrome visit establishes the session, curl_cffi reuses its cookies and headers
+HOME_URL = "https://www.ajio.com/"
+SESSION_MAX_AGE = 20 * 60   # re-bootstrap proactively after this many seconds
+MAX_BOOTSTRAPS = 5          # per run, so a hard block does not loop forever
+BOOTSTRAP_STATUS_CODES = [401, 403]
+
+browser_session = None
+
+
+class SessionExhausted(RuntimeError):
+    """Raised once a run has used up MAX_BOOTSTRAPS browser sessions"""
+
+
+class BrowserSession:
+    """curl_cffi session carrying the cookies and headers of a real Chrome visit to AJIO"""
+
+    def __init__(self, max_age=SESSION_MAX_AGE, proxy=None):
+        self.max_age = max_age
+        self.proxy = proxy
+        self.session = None
+        self.started_at = 0
+        self.bootstraps = 0
+
+    def _create_driver(self):
+        from selenium.webdriver.chrome.options import Options
+        from browser_setup import create_driver
+
+        chrome_options = Options()
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        chrome_options.add_argument("--window-size=1920,1080")
+        if self.proxy:
+            # Cookies are tied to the client IP, so the browser must use the same exit as the HTTP client
+            if '@' in self.proxy:
+                logger.warning("⚠️ Chrome cannot authenticate to user:pass proxies; bootstrapping without the proxy")
+            else:
+                chrome_options.add_argument(f"--proxy-server={self.proxy}")
+        return create_driver(chrome_options, "ajio")
+
+    def bootstrap(self):
+        """Visit AJIO in Chrome and move its cookies and headers into a fresh curl_cffi session"""
+        if self.bootstraps >= MAX_BOOTSTRAPS:
+            raise SessionExhausted(f"AJIO session bootstrapped {self.bootstraps} times this run, giving up")
+        self.bootstraps += 1
+        heartbeat.beat("startup")
+        logger.debug("🌐 Bootstrapping AJIO session in Chrome (%s/%s)...", self.bootstraps, MAX_BOOTSTRAPS)
+        from browser_setup import release_profile
+        started = time.time()
+        driver = self._create_driver()
+        try:
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver.get(HOME_URL)
+            time.sleep(random.uniform(3, 5))
+            # The search API is what gets fingerprinted, so touch it once from the page itself
+            driver.execute_script("return fetch(arguments[0], {credentials: 'include'}).then((r) => r.status)",
+                                  search_url + "&query=shirt%3Arelevance&text=shirt")
+            time.sleep(random.uniform(1, 2))
+            user_agent = driver.execute_script("return navigator.userAgent")
+            language = driver.execute_script("return navigator.languages.join(',')")
+            cookies = driver.get_cookies()
+        finally:
+            driver.quit()
+            release_profile(driver)
+
+        session = cureq.Session(impersonate="chrome")
+        for cookie in cookies:
+            session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": language or "en-IN,en;q=0.9",
+            "Referer": HOME_URL,
+            "Origin": HOME_URL.rstrip("/"),
+        })
+        if self.proxy:
+            session.proxies = {"http": self.proxy, "https": self.proxy}
+        if self.session is not None:
+            self.session.close()
+        self.session = session
+        self.started_at = time.time()
+        metrics.observe_phase("session_bootstrap", started)
+        logger.info("✅ AJIO session ready with %s cookies in %.1fs", len(cookies), time.time() - started)
+
+    def expired(self):
+        return self.session is None or time.time() - self.started_at > self.max_age
+
+    def get(self, url, max_attempts=3):
+        """GET over the shared session, re-bootstrapping when AJIO stops accepting it"""
+        attempt = 0
+        while attempt < max_attempts:
+            attempt += 1
+            try:
+                if self.expired():
+                    self.bootstrap()
+                response = self.session.get(url, timeout=30)
+            except SessionExhausted:
+                raise
+            except Exception as e:
+                metrics.record_retry("exception")
+                logger.debug("Session request failed: %s (attempt %s/%s)", e, attempt, max_attempts)
+                time.sleep(random.uniform(1, 3))
+                continue
+
+            if response.status_code == 200:
+                return response
+            metrics.record_retry(response.status_code)
+            if response.status_code in BOOTSTRAP_STATUS_CODES:
+                logger.debug("Got %s: session no longer accepted, re-bootstrapping", response.status_code)
+                self.session.close()
+                self.session = None
+            else:
+                logger.debug("Unexpected status code: %s (attempt %s/%s)", response.status_code, attempt, max_attempts)
+                time.sleep(random.uniform(1, 3))
+        return None
+
+
+def fall_back_to_api(reason):
+    """Drop the hybrid session for the rest of the run instead of recording empty keywords"""
+    global browser_session
+    logger.error("❌ %s; continuing in api mode", reason)
+    if browser_session is not None and browser_session.session is not None:
+        browser_session.session.close()
+    browser_session = None
+
 def get_proxy():
     """Get a proxy from the proxy list with rotation"""
     global current_proxy_index
     
     if not PROXY_LIST:
-        print("Warning: No proxies configured. Running without proxy.")
+        logger.warning("No proxies configured. Running without proxy.")
         return None
     
     proxy = PROXY_LIST[current_proxy_index]
@@ -34,11 +169,11 @@ def load_proxies_from_file(filepath="proxies.txt"):
             with open(filepath, 'r') as f:
                 PROXY_LIST = [line.strip() for line in f.readlines() 
                              if line.strip() and not line.strip().startswith('#')]
-            print(f"Loaded {len(PROXY_LIST)} proxies from {filepath}")
+            logger.info("Loaded %s proxies from %s", len(PROXY_LIST), filepath)
         except Exception as e:
-            print(f"Error loading proxies from {filepath}: {e}")
+            logger.error("Error loading proxies from %s: %s", filepath, e)
     else:
-        print(f"Proxy file {filepath} not found. Using empty proxy list.")
+        logger.debug("Proxy file %s not found. Using empty proxy list.", filepath)
 
 def make_request_with_proxy(url, **kwargs):
     """Make a request with proxy support and fallback"""
@@ -50,27 +185,28 @@ def make_request_with_proxy(url, **kwargs):
         try:
             if proxy:
                 masked_proxy = proxy.split('@')[1] if '@' in proxy else proxy
-                print(f"Making request with rotating proxy: {masked_proxy}")
+                logger.debug("Making request with rotating proxy: %s", masked_proxy)
                 kwargs['proxies'] = {'http': proxy, 'https': proxy}
             else:
-                print("Making request without proxy")
+                logger.debug("Making request without proxy")
             
             response = cureq.get(url, **kwargs)
             return response
             
         except Exception as e:
-            print(f"Request attempt {attempt + 1} failed: {e}")
+            logger.debug("Request attempt %s failed: %s", attempt + 1, e)
+            metrics.record_retry("proxy")
             if attempt < max_retries - 1:
-                print("Retrying with rotating proxy...")
+                logger.debug("Retrying with rotating proxy...")
                 time.sleep(random.uniform(1, 2)) 
             else:
-                print("All proxy attempts failed. Trying without proxy...")
+                logger.debug("All proxy attempts failed. Trying without proxy...")
                 try:
                     kwargs.pop('proxies', None)
                     response = cureq.get(url, **kwargs)
                     return response
                 except Exception as final_e:
-                    print(f"Final request without proxy also failed: {final_e}")
+                    logger.debug("Final request without proxy also failed: %s", final_e)
                     raise final_e
     
     return None
@@ -91,23 +227,26 @@ def make_request_with_persistent_retry(url, max_attempts=10, **kwargs):
                 return response
             elif response and response.status_code in [403, 502, 503, 504]:
                 attempt += 1
+                metrics.record_retry(response.status_code)
                 delay = base_delay * (2 ** min(attempt, 5)) + random.uniform(0, 2)
-                print(f"Got {response.status_code} error. Retrying with fresh headers in {delay:.1f}s (attempt {attempt}/{max_attempts})")
+                logger.warning("Got %s error. Retrying with fresh headers in %.1fs (attempt %s/%s)", response.status_code, delay, attempt, max_attempts)
                 time.sleep(delay)
                 continue
             else:
-                print(f"Unexpected status code: {response.status_code if response else 'No response'}")
+                logger.debug("Unexpected status code: %s", response.status_code if response else 'No response')
                 attempt += 1
+                metrics.record_retry(response.status_code if response else "no_response")
                 time.sleep(random.uniform(1, 3))
                 continue
                 
         except Exception as e:
             attempt += 1
+            metrics.record_retry("exception")
             delay = base_delay * (2 ** min(attempt, 5)) + random.uniform(0, 2)
-            print(f"Request failed: {e}. Retrying with fresh headers in {delay:.1f}s (attempt {attempt}/{max_attempts})")
+            logger.warning("Request failed: %s. Retrying with fresh headers in %.1fs (attempt %s/%s)", e, delay, attempt, max_attempts)
             time.sleep(delay)
     
-    print(f"Max attempts ({max_attempts}) reached. Giving up.")
+    logger.debug("Max attempts (%s) reached. Giving up.", max_attempts)
     return None
 
 def extract_size_stock_info(product_detail_data):
@@ -134,7 +273,7 @@ def extract_size_stock_info(product_detail_data):
                 in_stock_sizes.append(size)
 
     except Exception as e:
-        print(f"Error extracting size/stock info: {e}")
+        logger.debug("Error extracting size/stock info: %s", e)
 
     return in_stock_sizes
 
@@ -158,29 +297,39 @@ def extract_product_data(product):
             try:
                 time.sleep(random.uniform(0.5, 1.5))
 
-                print(f"Fetching sizes for product {product_code}...")
-                detail_response = make_request_with_persistent_retry(
-                    product_detail_url_base + product_code,
-                    max_attempts=3,  
-                    impersonate="chrome",
-                    headers=get_random_headers()
-                )
+                logger.debug("Fetching sizes for product %s...", product_code)
+                heartbeat.beat("detail", product=product_code)
+                with metrics.time_phase("detail"):
+                    detail_response = None
+                    if browser_session:
+                        try:
+                            detail_response = browser_session.get(product_detail_url_base + product_code, max_attempts=3)
+                        except SessionExhausted as e:
+                            fall_back_to_api(e)
+                    if not browser_session:
+                        detail_response = make_request_with_persistent_retry(
+                            product_detail_url_base + product_code,
+                            max_attempts=3,  
+                            impersonate="chrome",
+                            headers=get_random_headers()
+                        )
                 
                 if detail_response and detail_response.status_code == 200:
                     detail_data = detail_response.json()
                     sizes = extract_size_stock_info(detail_data)
-                    print(f"✅ Successfully fetched sizes for product {product_code}: {sizes}")
+                    logger.debug("✅ Successfully fetched sizes for product %s: %s", product_code, sizes)
                 else:
-                    print(f"❌ Failed to fetch details for {product_code} after all retries")
+                    logger.error("❌ Failed to fetch details for %s after all retries", product_code)
                     sizes = []  
             except Exception as e:
-                print(f"❌ Error fetching details for {product_code}: {e}")
+                logger.error("❌ Error fetching details for %s: %s", product_code, e)
                 sizes = []  # Empty sizes if we couldn't fetch them
         
 
         return {
             "name": product.get("name", ""),
             "id": product_code, 
+            "brandName": product.get("fnlColorVariantData", {}).get("brandName") or product.get("brandName", ""),
             "images": images,
             "ratingsCount": product.get("ratingCount", "0"),
             "averageRating": product.get("averageRating", 0),
@@ -189,10 +338,11 @@ def extract_product_data(product):
             "sizes": sizes
         }
     except Exception as e:
-        print(f"Error extracting product data: {e}")
+        logger.warning("⚠️ Error extracting product data: %s", e)
         return {
             "name": "",
             "id": "",
+            "brandName": "",
             "images": [],
             "ratingsCount": "0",
             "averageRating": 0,
@@ -202,78 +352,125 @@ def extract_product_data(product):
         }
 
 def main():
+    global browser_session
+    parser = argparse.ArgumentParser(description='Scrape AJIO over its JSON API')
+    parser.add_argument('--mode', choices=['api', 'hybrid'], default=os.environ.get("SCRAPER_AJIO_MODE", "api"),
+                        help='hybrid: bootstrap the session in Chrome, then fetch everything over HTTP')
+    parser.add_argument('--session-max-age', type=float, default=SESSION_MAX_AGE,
+                        help='Seconds before a hybrid session is re-bootstrapped')
+    args = parser.parse_args()
+
     load_proxies_from_file("proxies.txt")
+    metrics.start_metrics("ajio_api")
+
+    if args.mode == "hybrid":
+        browser_session = BrowserSession(args.session_max_age, get_proxy())
+        try:
+            browser_session.bootstrap()
+        except Exception as e:
+            logger.error("❌ Could not bootstrap a browser session: %s", e)
+            return
     
     try:
-        with open("zara_keywords.json", "r") as f:
-            keywords = json.load(f)
-        print(f"Loaded {len(keywords)} keywords from zara_keywords.json")
+        with open("keywords.json", "r") as f:
+            keywords_data = json.load(f)
+        logger.info("Loaded %s keywords from keywords.json", len(keywords_data))
     except Exception as e:
-        print(f"Error loading keywords file: {e}")
+        logger.error("Error loading keywords file: %s", e)
         return
 
-    all_scraped_data = []
+    start_id, end_id = get_site("ajio_api")["keyword_range"]
+    keywords = filter_keywords(keywords_data, start_id, end_id)
+    logger.info("Scraping keywords with IDs %s to %s (%s keywords)", start_id, end_id, len(keywords))
+    output_file = get_output_file("ajio_scraped_data.json")
+
+    # A watchdog restart resumes after the keywords the checkpoint already covers
+    all_scraped_data, done_keyword_ids = heartbeat.load_checkpoint()
+    if done_keyword_ids:
+        logger.info("⏩ Resuming from checkpoint: %s keywords already done", len(done_keyword_ids))
 
     for keyword in keywords:
+        if str(keyword["id"]) in done_keyword_ids:
+            continue
         lowercase_keyword = keyword["keyword"].lower()
         encoded_keyword = quote(lowercase_keyword)
-        print(f"Searching for keyword: {lowercase_keyword}")
+        logger.info("Searching for keyword: %s", lowercase_keyword)
+        heartbeat.beat("search", keyword_id=keyword["id"], keyword=lowercase_keyword)
 
         try:
-            response = make_request_with_proxy(
-                search_url + "&query=" + encoded_keyword + '%3Arelevance' + '&text=' + encoded_keyword,
-                impersonate="chrome",
-                headers=get_random_headers()
-            )
+            keyword_search_url = search_url + "&query=" + encoded_keyword + '%3Arelevance' + '&text=' + encoded_keyword
+            with metrics.time_phase("search"):
+                response = None
+                if browser_session:
+                    try:
+                        response = browser_session.get(keyword_search_url)
+                    except SessionExhausted as e:
+                        fall_back_to_api(e)
+                if not browser_session:
+                    response = make_request_with_proxy(
+                        keyword_search_url,
+                        impersonate="chrome",
+                        headers=get_random_headers()
+                    )
             status_code = response.status_code if response else 0
-            print(f"Status code for search '{lowercase_keyword}': {status_code}")
+            logger.debug("Status code for search '%s': %s", lowercase_keyword, status_code)
 
             if status_code == 200:
-                print("AJIO Search API is working")
+                logger.debug("AJIO Search API is working")
                 response_data = response.json()
                 products = response_data.get("products", [])
+                if not products:
+                    metrics.record_empty_results()
 
                 keyword_products = []
                 for i, product in enumerate(products[:10]):
                     product_data = extract_product_data(product)
                     if product_data and product_data['name']:
                         keyword_products.append(product_data)
-                        print(f"Extracted product {i+1}: {product_data['name']} (ID: {product_data['id']}) - Sizes: {product_data['sizes']}")
+                        metrics.record_product(product_data)
+                        logger.debug("Extracted product %s: %s (ID: %s) - Sizes: %s", i+1, product_data['name'], product_data['id'], product_data['sizes'])
 
                 all_scraped_data.append({
+                    "keyword_id": keyword["id"],
                     "keyword": lowercase_keyword,
                     "products": keyword_products
                 })
 
-                print(f"Successfully scraped {len(keyword_products)} products for keyword: {lowercase_keyword}")
+                logger.info("Successfully scraped %s products for keyword: %s", len(keyword_products), lowercase_keyword)
+                metrics.keyword_done()
                 
-                print("⏳ Rate limiting: Waiting 3-5 seconds before next keyword...")
+                logger.debug("⏳ Rate limiting: Waiting 3-5 seconds before next keyword...")
                 time.sleep(random.uniform(3, 5))
                 
             else:
-                print(f"AJIO Search API failed for '{lowercase_keyword}'")
+                logger.warning("⚠️ AJIO Search API failed for '%s'", lowercase_keyword)
                 all_scraped_data.append({
+                    "keyword_id": keyword["id"],
                     "keyword": lowercase_keyword,
                     "products": []
                 })
                 
-                print("⏳ Rate limiting: Waiting 2-3 seconds before next keyword...")
+                logger.debug("⏳ Rate limiting: Waiting 2-3 seconds before next keyword...")
                 time.sleep(random.uniform(2, 3))
 
         except Exception as e:
-            print(f"Error processing keyword {lowercase_keyword}: {e}")
+            logger.warning("Error processing keyword %s: %s", lowercase_keyword, e)
             all_scraped_data.append({
+                "keyword_id": keyword["id"],
                 "keyword": lowercase_keyword,
                 "products": []
             })
 
+        done_keyword_ids.add(str(keyword["id"]))
+        heartbeat.save_checkpoint(all_scraped_data, done_keyword_ids)
+
     try:
-        with open("ajio_scraped_data.json", "w") as f:
+        with open(output_file, "w") as f:
             json.dump(all_scraped_data, f, indent=2)
-        print(f"\nSuccessfully saved scraped data to ajio_scraped_data.json")
-        print(f"Total keywords processed: {len(all_scraped_data)}")
+        logger.info("Successfully saved scraped data to %s", output_file)
+        logger.info("Total keywords processed: %s", len(all_scraped_data))
     except Exception as e:
-        print(f"Error saving data to JSON file: {e}")
+        logger.error("Error saving data to JSON file: %s", e)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+End-to-End Scraper Benchmark
+Runs the real browser scrapers against fixture_server.py and reports products/min and
+per-phase latency for each site and orchestrator configuration, so performance changes
+can be compared reproducibly on a machine with no network.
+
+Configurations:
+    sequential - one site at a time
+    parallel   - every site at once (what parallel_scraper.py does)
+
+Usage:
+    python benchmark.py --sites nykaa myntra zara --keywords 2 --latency 0.2 --lazy
+    python benchmark.py --configs parallel --compare bench_results/20250101_120000.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fixture_server
+from metrics import parse_metrics_text
+from site_registry import get_site
+
+RESULTS_DIR = "bench_results"
+DEFAULT_SITES = ["nykaa", "myntra", "zara"]
+CONFIGURATIONS = ["sequential", "parallel"]
+
+
+def pick_keyword_ids(count: int, keywords_file: str = "keywords.json"):
+    with open(keywords_file, 'r', encoding='utf-8') as f:
+        keywords_data = json.load(f)
+    return [str(keyword["id"]) for keyword in keywords_data[:count]]
+
+
+def phase_stats(samples):
+    """Average and approximate p95 (from histogram buckets) per phase"""
+    buckets, sums, counts = {}, {}, {}
+    for (name, labels), value in samples.items():
+        label_dict = dict(labels)
+        phase = label_dict.get("phase")
+        if name == "scraper_phase_duration_seconds_bucket" and label_dict.get("le") != "+Inf":
+            buckets.setdefault(phase, []).append((float(label_dict["le"]), value))
+        elif name == "scraper_phase_duration_seconds_sum":
+            sums[phase] = value
+        elif name == "scraper_phase_duration_seconds_count":
+            counts[phase] = value
+
+    stats = {}
+    for phase, count in counts.items():
+        if not count:
+            continue
+        p95 = None
+        for bound, cumulative in sorted(buckets.get(phase, [])):
+            if cumulative >= 0.95 * count:
+                p95 = bound
+                break
+        stats[phase] = {"avg": round(sums.get(phase, 0) / count, 3), "p95": p95, "count": int(count)}
+    return stats
+
+
+def run_site(site_key: str, config_name: str, run_dir: str, base_url: str, keyword_ids, timeout: int):
+    """Run one scraper against the fixture server and collect its metrics"""
+    site = get_site(site_key)
+    metrics_file = os.path.join(run_dir, f"{config_name}_{site_key}.prom")
+    env = os.environ.copy()
+    env.update({
+        "SCRAPER_BASE_URL": base_url,
+        "SCRAPER_KEYWORD_IDS": ",".join(keyword_ids),
+        "SCRAPER_OUTPUT_FILE": os.path.join(run_dir, f"{config_name}_{site_key}.json"),
+        "SCRAPER_METRICS_FILE": metrics_file,
+        "SCRAPER_WORKER_ID": f"bench-{config_name}",
+    })
+
+    print(f"🚀 [{config_name}] {site['name']} -> {base_url}")
+    started = time.time()
+    try:
+        result = subprocess.run([sys.executable, site["script"]], env=env, capture_output=True, text=True, timeout=timeout)
+        returncode = result.returncode
+    except subprocess.TimeoutExpired:
+        returncode = "timeout"
+    elapsed = time.time() - started
+
+    samples = {}
+    if os.path.exists(metrics_file):
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            samples = parse_metrics_text(f.read())
+    products = int(sum(value for (name, _), value in samples.items() if name == "scraper_products_total"))
+
+    return {
+        "site": site_key,
+        "config": config_name,
+        "returncode": returncode,
+        "seconds": round(elapsed, 2),
+        "products": products,
+        "products_per_minute": round(products * 60 / elapsed, 2) if elapsed else 0,
+        "phases": phase_stats(samples),
+    }
+
+
+def run_configuration(config_name: str, sites, run_dir: str, host: str, port: int, keyword_ids, timeout: int):
+    jobs = [(site, config_name, run_dir, fixture_server.get_base_url(site, host, port), keyword_ids, timeout) for site in sites]
+    started = time.time()
+    if config_name == "parallel":
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            results = list(executor.map(lambda job: run_site(*job), jobs))
+    else:
+        results = [run_site(*job) for job in jobs]
+    elapsed = time.time() - started
+    total_products = sum(result["products"] for result in results)
+    summary = {
+        "config": config_name,
+        "seconds": round(elapsed, 2),
+        "products": total_products,
+        "products_per_minute": round(total_products * 60 / elapsed, 2) if elapsed else 0,
+    }
+    return results, summary
+
+
+def print_report(results, summaries, baseline=None):
+    print("\n" + "=" * 70)
+    print(f"{'config':<11} {'site':<8} {'products':>9} {'/min':>8} {'seconds':>8}  phases (avg / p95 s)")
+    print("-" * 70)
+    baseline_rates = {(r["config"], r["site"]): r["products_per_minute"] for r in (baseline or {}).get("sites", [])}
+    for result in results:
+        phases = "  ".join(f"{phase} {stat['avg']:.2f}/{stat['p95'] if stat['p95'] is not None else '-'}"
+                           for phase, stat in sorted(result["phases"].items()))
+        change = ""
+        previous = baseline_rates.get((result["config"], result["site"]))
+        if previous:
+            change = f" ({(result['products_per_minute'] - previous) / previous * 100:+.1f}%)"
+        status = "" if result["returncode"] == 0 else f"  ❌ exit {result['returncode']}"
+        print(f"{result['config']:<11} {result['site']:<8} {result['products']:>9} "
+              f"{result['products_per_minute']:>8.2f} {result['seconds']:>8.1f}  {phases}{change}{status}")
+    print("-" * 70)
+    for summary in summaries:
+        print(f"{summary['config']:<11} {'total':<8} {summary['products']:>9} "
+              f"{summary['products_per_minute']:>8.2f} {summary['seconds']:>8.1f}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the browser scrapers against the offline fixture server')
+    parser.add_argument('--sites', nargs='+', default=DEFAULT_SITES, choices=list(fixture_server.FIXTURE_SITES))
+    parser.add_argument('--configs', nargs='+', default=CONFIGURATIONS, choices=CONFIGURATIONS)
+    parser.add_argument('--keywords', type=int, default=2, help='Number of keywords (from the top of keywords.json) per site')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Fixture page latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--image-latency', type=float, default=0.0)
+    parser.add_argument('--lazy', action='store_true', help='Lazy-load images on the fixture pages')
+    parser.add_argument('--products', type=int, default=12, help='Products per fixture search page')
+    parser.add_argument('--timeout', type=int, default=1800, help='Seconds before a scraper run is abandoned')
+    parser.add_argument('--compare', help='Earlier results file to compare products/min against')
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    fixture_options = {
+        "latency": args.latency, "jitter": args.jitter, "image_latency": args.image_latency,
+        "lazy": args.lazy, "products_per_search": args.products,
+    }
+    server = fixture_server.start_fixture_server(args.port, host, **fixture_options)
+    print(f"🧪 Fixture server on http://{host}:{args.port}/ ({fixture_options})")
+
+    keyword_ids = pick_keyword_ids(args.keywords)
+    run_dir = os.path.join(RESULTS_DIR, time.strftime('%Y%m%d_%H%M%S'))
+    os.makedirs(run_dir, exist_ok=True)
+
+    all_results, summaries = [], []
+    try:
+        for config_name in args.configs:
+            results, summary = run_configuration(config_name, args.sites, run_dir, host, args.port, keyword_ids, args.timeout)
+            all_results.extend(results)
+            summaries.append(summary)
+    finally:
+        server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(all_results, summaries, baseline)
+
+    results_file = f"{run_dir}.json"
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump({"fixture": fixture_options, "keyword_ids": keyword_ids, "sites": all_results,
+                   "configs": summaries}, f, indent=2)
+    print(f"💾 Results saved to {results_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Browser Daemon
+Keeps N Chrome instances running with remote debugging enabled so scrapers can attach to a
+warm browser (chromeOptions debuggerAddress) instead of launching Chrome and waiting for it
+every run. A small HTTP API on 127.0.0.1 hands out exclusive leases; on release the daemon
+closes the leased tabs and clears cookies before the instance is leased again.
+Instances that stop answering are restarted, and leases of dead scraper processes are
+reclaimed.
+
+Scrapers use the daemon when SCRAPER_BROWSER_DAEMON is set (browser_setup.create_driver) and
+fall back to launching their own Chrome when it is unreachable or fully leased.
+
+Usage:
+    python browser_daemon.py --instances 4
+    SCRAPER_BROWSER_DAEMON=127.0.0.1:9300 python parallel_scraper.py
+
+API (POST, JSON replies):
+    /lease?site=zara&pid=123       -> {"id": 0, "debugger_address": "127.0.0.1:9222"} or 503
+    /release?id=0&healthy=1
+    /status                         (GET)
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse, parse_qs
+from urllib.request import Request, urlopen
+
+from profile_pool import ProfilePool, _pid_alive
+
+DEFAULT_PORT = 9300
+DEFAULT_DEBUG_PORT = 9222
+HEALTH_INTERVAL = 10
+CHROME_CANDIDATES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+CHROME_ARGS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI",
+    "--disable-blink-features=AutomationControlled",
+    "--force-device-scale-factor=1",
+    "--window-size=1920,1080",
+]
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+
+def find_chrome() -> Optional[str]:
+    configured = os.environ.get("SCRAPER_CHROME_BINARY")
+    if configured:
+        return configured
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.exists(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def _devtools(port: int, path: str, method: str = "GET", timeout: float = 3):
+    with urlopen(Request(f"http://127.0.0.1:{port}{path}", method=method), timeout=timeout) as response:
+        body = response.read().decode("utf-8")
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body
+
+
+class ChromeInstance:
+    """One Chrome process with a fixed remote debugging port and profile"""
+
+    def __init__(self, index: int, chrome: str, debug_port: int, profile_dir: str, headless: bool):
+        self.index = index
+        self.chrome = chrome
+        self.debug_port = debug_port
+        self.profile_dir = profile_dir
+        self.headless = headless
+        self.process = None
+        self.lease: Optional[Dict[str, Any]] = None
+        self.last_site = None
+        self.leases = 0
+
+    @property
+    def debugger_address(self) -> str:
+        return f"127.0.0.1:{self.debug_port}"
+
+    def start(self) -> None:
+        args = [self.chrome, f"--remote-debugging-port={self.debug_port}", f"--user-data-dir={self.profile_dir}", *CHROME_ARGS]
+        if self.headless:
+            args.append("--headless=new")
+        self.process = subprocess.Popen(args + ["about:blank"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            if self.alive():
+                print(f"🟢 Chrome #{self.index} ready on {self.debugger_address}")
+                return
+            time.sleep(0.25)
+        print(f"⚠️ Chrome #{self.index} did not open its debugging port")
+
+    def alive(self) -> bool:
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            _devtools(self.debug_port, "/json/version", timeout=2)
+            return True
+        except OSError:
+            return False
+
+    def stop(self) -> None:
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def reset(self, clear_storage: bool = True) -> None:
+        """Leave a single blank tab and, optionally, no cookies"""
+        targets = [target for target in _devtools(self.debug_port, "/json/list") if target.get("type") == "page"]
+        _devtools(self.debug_port, "/json/new?about:blank", method="PUT")
+        for target in targets:
+            _devtools(self.debug_port, f"/json/close/{target['id']}")
+        if not clear_storage:
+            return
+        if websocket is None:
+            print("⚠️ websocket-client is not installed; cookies are kept between leases")
+            return
+        browser_ws = _devtools(self.debug_port, "/json/version")["webSocketDebuggerUrl"]
+        connection = websocket.create_connection(browser_ws, timeout=10)
+        try:
+            # The HTTP cache stays: keeping it warm is the point of the daemon
+            connection.send(json.dumps({"id": 1, "method": "Storage.clearCookies"}))
+            connection.recv()
+        finally:
+            connection.close()
+
+
+class BrowserDaemon:
+    def __init__(self, instances: int, debug_port: int = DEFAULT_DEBUG_PORT, headless: bool = False,
+                 clear_storage: bool = True):
+        chrome = find_chrome()
+        if not chrome:
+            raise RuntimeError("Chrome not found - set SCRAPER_CHROME_BINARY")
+        self.lock = threading.Lock()
+        self.clear_storage = clear_storage
+        self.profile_leases = []
+        pool = ProfilePool("daemon", size=instances)
+        self.instances: List[ChromeInstance] = []
+        for index in range(instances):
+            lease = pool.lease()
+            if lease is None:
+                raise RuntimeError("Daemon profiles are in use - is another browser_daemon.py running?")
+            self.profile_leases.append(lease)
+            self.instances.append(ChromeInstance(index, chrome, debug_port + index, lease.path, headless))
+        self.stopping = threading.Event()
+
+    def start(self) -> None:
+        for instance in self.instances:
+            instance.start()
+        threading.Thread(target=self._health_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        for instance in self.instances:
+            instance.stop()
+        for lease in self.profile_leases:
+            lease.release()
+
+    def lease(self, site: str, pid: int) -> Optional[ChromeInstance]:
+        """A free live instance, preferring one that last served the same site"""
+        with self.lock:
+            free = [instance for instance in self.instances if instance.lease is None and instance.alive()]
+            if not free:
+                return None
+            instance = next((i for i in free if i.last_site == site), free[0])
+            instance.lease = {"site": site, "pid": pid, "since": time.time()}
+            instance.last_site = site
+            instance.leases += 1
+            return instance
+
+    def release(self, index: int, healthy: bool = True) -> bool:
+        if not 0 <= index < len(self.instances):
+            return False
+        instance = self.instances[index]
+        try:
+            if healthy and instance.alive():
+                instance.reset(self.clear_storage)
+            else:
+                instance.stop()
+                instance.start()
+        except Exception as e:
+            print(f"⚠️ Could not reset Chrome #{index} ({e}), restarting it")
+            instance.stop()
+            instance.start()
+        with self.lock:
+            instance.lease = None
+        return True
+
+    def _health_loop(self) -> None:
+        while not self.stopping.wait(HEALTH_INTERVAL):
+            for instance in self.instances:
+                lease = instance.lease
+                if lease and not _pid_alive(lease["pid"]):
+                    print(f"🧹 Reclaiming Chrome #{instance.index} from dead process {lease['pid']}")
+                    self.release(instance.index)
+                elif not lease and not instance.alive():
+                    print(f"♻️ Chrome #{instance.index} is not responding, restarting")
+                    with self.lock:
+                        instance.lease = {"site": "restart", "pid": os.getpid(), "since": time.time()}
+                    instance.stop()
+                    instance.start()
+                    with self.lock:
+                        instance.lease = None
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [{"id": i.index, "debugger_address": i.debugger_address, "alive": i.alive(),
+                 "lease": i.lease, "last_site": i.last_site, "leases": i.leases} for i in self.instances]
+
+
+def make_handler(daemon: BrowserDaemon):
+    class DaemonHandler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, payload) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/status":
+                self._reply(200, daemon.status())
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            parsed = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            if parsed.path == "/lease":
+                instance = daemon.lease(query.get("site", "unknown"), int(query.get("pid", 0)))
+                if instance is None:
+                    self._reply(503, {"error": "no free browser"})
+                else:
+                    print(f"🔑 Chrome #{instance.index} leased to {query.get('site')} (pid {query.get('pid')})")
+                    self._reply(200, {"id": instance.index, "debugger_address": instance.debugger_address})
+            elif parsed.path == "/release":
+                released = daemon.release(int(query.get("id", -1)), query.get("healthy", "1") == "1")
+                self._reply(200 if released else 404, {"released": released})
+            else:
+                self.send_error(404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return DaemonHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep warm Chrome instances for scrapers to attach to')
+    parser.add_argument('-n', '--instances', type=int, default=4)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Lease API port')
+    parser.add_argument('--debug-port', type=int, default=DEFAULT_DEBUG_PORT, help='First Chrome remote debugging port')
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--keep-cookies', action='store_true', help='Do not clear cookies between leases')
+    args = parser.parse_args()
+
+    daemon = BrowserDaemon(args.instances, args.debug_port, args.headless, clear_storage=not args.keep_cookies)
+    daemon.start()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(daemon))
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"🚀 Browser daemon with {args.instances} Chrome instances - export SCRAPER_BROWSER_DAEMON=127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("\n🛑 Stopping Chrome instances...")
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
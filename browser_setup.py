@@ -0,0 +1,132 @@
+"""
+Browser Setup
+Shared Chrome driver creation for the Selenium scrapers. With SCRAPER_BROWSER_DAEMON set the
+driver attaches to a warm Chrome leased from browser_daemon.py; otherwise it leases a
+persistent profile for the site from profile_pool, installs ChromeDriver and falls back to
+the macOS Chrome binary.
+"""
+
+import atexit
+import json
+import os
+from urllib.request import Request, urlopen
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from profile_pool import ProfilePool, POOL_SIZE, get_profile_root
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+MAC_CHROME_BINARY = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+
+_leases = {}
+
+
+class AttachedChrome(webdriver.Chrome):
+    """Driver on a daemon-owned Chrome: quit() ends the session and returns the browser
+    to the daemon instead of closing it"""
+
+    def __init__(self, daemon_address: str, lease_id: int, **kwargs):
+        super().__init__(**kwargs)
+        self.daemon_address = daemon_address
+        self.lease_id = lease_id
+        self.lease_released = False
+
+    def release_lease(self, healthy: bool = True) -> None:
+        if self.lease_released:
+            return
+        self.lease_released = True
+        try:
+            _daemon_request(self.daemon_address, f"/release?id={self.lease_id}&healthy={int(healthy)}")
+        except OSError as e:
+            logger.warning("⚠️ Could not return browser #%s to the daemon: %s", self.lease_id, e)
+
+    def quit(self) -> None:
+        try:
+            self.service.stop()
+        finally:
+            self.release_lease()
+
+
+def _daemon_request(address: str, path: str, timeout: float = 30):
+    with urlopen(Request(f"http://{address}{path}", method="POST"), timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _attach_to_daemon(address: str, site: str):
+    """Driver on a leased daemon browser, or None when the daemon is unreachable or full"""
+    try:
+        lease = _daemon_request(address, f"/lease?site={site}&pid={os.getpid()}", timeout=5)
+    except OSError as e:
+        logger.warning("⚠️ Browser daemon at %s unavailable (%s), launching Chrome", address, e)
+        return None
+
+    # Launch flags belong to the daemon's Chrome; an attached session accepts only the address
+    options = Options()
+    options.debugger_address = lease["debugger_address"]
+    try:
+        driver = AttachedChrome(address, lease["id"], service=Service(ChromeDriverManager().install()), options=options)
+    except Exception as e:
+        logger.warning("⚠️ Could not attach to browser #%s (%s), launching Chrome", lease['id'], e)
+        try:
+            _daemon_request(address, f"/release?id={lease['id']}&healthy=0")
+        except OSError:
+            pass
+        return None
+    atexit.register(driver.release_lease)
+    logger.info("🔌 Attached to warm browser #%s at %s", lease['id'], lease['debugger_address'])
+    return driver
+
+
+def _start_chrome(chrome_options):
+    try:
+        service = Service(ChromeDriverManager().install())
+        return webdriver.Chrome(service=service, options=chrome_options)
+    except Exception as e:
+        logger.warning("Error initializing Chrome driver: %s", e)
+        logger.info("Trying alternative Chrome path...")
+        chrome_options.binary_location = MAC_CHROME_BINARY
+        service = Service(ChromeDriverManager().install())
+        return webdriver.Chrome(service=service, options=chrome_options)
+
+
+def create_driver(chrome_options, site: str):
+    """Chrome with the site's options, running on a warm persistent profile when one is free"""
+    daemon_address = os.environ.get("SCRAPER_BROWSER_DAEMON")
+    if daemon_address:
+        driver = _attach_to_daemon(daemon_address, site)
+        if driver:
+            return driver
+
+    lease = None
+    if get_profile_root():
+        pool = ProfilePool(site, size=int(os.environ.get("SCRAPER_PROFILE_POOL_SIZE", POOL_SIZE)))
+        lease = pool.lease()
+        if lease:
+            chrome_options.add_argument(f"--user-data-dir={lease.path}")
+            logger.info("🗂️ Using %s profile %s", site, lease.index)
+        else:
+            logger.warning("⚠️ All %s %s profiles are in use, starting with a temporary profile", pool.size, site)
+
+    try:
+        driver = _start_chrome(chrome_options)
+    except Exception:
+        if lease:
+            lease.release(healthy=False)
+        raise
+
+    if lease:
+        _leases[id(driver)] = lease
+        atexit.register(lease.release)
+    return driver
+
+
+def release_profile(driver, healthy: bool = True) -> None:
+    """Hand the driver's profile back to the pool (also done automatically at exit)"""
+    lease = _leases.pop(id(driver), None)
+    if lease:
+        lease.release(healthy)
@@ -0,0 +1,143 @@
+"""
+Concurrency Control
+An additive-increase/multiplicative-decrease (AIMD) controller per site that decides how many
+of the site's workers parallel_scraper may run at once. Every CONTROL_INTERVAL it reads what
+the site's workers wrote to metrics/ since the last look:
+
+    errors   retried requests/page loads (403/503, lost sessions, ...) and empty result grids
+    latency  p95 of search / pdp_load / detail, from the phase duration histogram buckets
+
+A window with an error rate above MAX_ERROR_RATE, or a p95 more than LATENCY_TOLERANCE times
+the best p95 seen so far, halves the site's limit. A healthy window adds one worker, up to
+what resource_sizing says the machine can hold. Windows with too few requests leave the
+limit alone. Lowering the limit never kills a worker; fewer start as running ones finish.
+
+Decisions are written to metrics/orchestrator.prom (scraper_concurrency_limit,
+scraper_concurrency_decisions_total, scraper_observed_error_rate, scraper_observed_p95_seconds).
+"""
+
+import glob
+import math
+import os
+from typing import Dict, Optional, Tuple
+
+import metrics
+
+MAX_ERROR_RATE = 0.1
+LATENCY_TOLERANCE = 2.0
+DECREASE_FACTOR = 0.5
+MIN_REQUESTS = 5            # fewer requests than this in a window is not a signal
+CONTROL_INTERVAL = 60       # seconds
+LATENCY_PHASES = ("search", "pdp_load", "detail")
+
+CONCURRENCY_LIMIT = metrics.Gauge("scraper_concurrency_limit", "Workers the AIMD controller lets a site run at once")
+CONCURRENCY_DECISIONS = metrics.Counter("scraper_concurrency_decisions_total", "AIMD decisions by site, decision and reason")
+ERROR_RATE = metrics.Gauge("scraper_observed_error_rate", "Share of requests retried or empty in the last control window")
+P95_SECONDS = metrics.Gauge("scraper_observed_p95_seconds", "p95 request latency in the last control window")
+
+
+def p95_from_buckets(buckets: Dict[float, float]) -> Optional[float]:
+    """Upper bound of the histogram bucket holding the 95th percentile ({le: cumulative count})"""
+    if not buckets:
+        return None
+    total = buckets.get(math.inf, max(buckets.values()))
+    if total <= 0:
+        return None
+    for bound in sorted(buckets):
+        if buckets[bound] >= 0.95 * total:
+            return bound
+    return None
+
+
+class SiteSignals:
+    """Per-window deltas of a site's request, error and latency counters across its metrics files.
+
+    Totals are tracked per file, so a worker that is restarted (and starts counting from zero)
+    or a finished worker whose file stays put does not distort the window.
+    """
+
+    def __init__(self, site_key: str, metrics_dir: str):
+        self.site_key = site_key
+        self.metrics_dir = metrics_dir
+        self._last: Dict[str, Dict[Tuple, float]] = {}
+
+    def _read_totals(self, filepath: str) -> Optional[Dict[Tuple, float]]:
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                samples = metrics.parse_metrics_text(f.read())
+        except (OSError, ValueError):
+            return None
+        totals: Dict[Tuple, float] = {}
+        for (name, labels), value in samples.items():
+            labels = dict(labels)
+            if labels.get("site") != self.site_key:
+                continue
+            if name in ("scraper_retries_total", "scraper_empty_results_total"):
+                key = ("errors",)
+            elif name == "scraper_phase_duration_seconds_bucket" and labels.get("phase") in LATENCY_PHASES:
+                key = ("le", float(labels["le"]))
+            else:
+                continue
+            totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def window(self) -> Tuple[float, float, Optional[float]]:
+        """(requests, errors, p95 seconds) since the previous call"""
+        errors = 0.0
+        buckets: Dict[float, float] = {}
+        for filepath in glob.glob(os.path.join(self.metrics_dir, "*.prom")):
+            totals = self._read_totals(filepath)
+            if totals is None:
+                continue
+            last = self._last.get(filepath, {})
+            # A counter that went down belongs to a restarted worker; all of it is new
+            reset = any(value < last.get(key, 0) for key, value in totals.items())
+            for key, value in totals.items():
+                delta = value if reset else value - last.get(key, 0)
+                if key == ("errors",):
+                    errors += delta
+                else:
+                    buckets[key[1]] = buckets.get(key[1], 0) + delta
+            self._last[filepath] = totals
+        requests = buckets.get(math.inf, 0) + errors
+        return requests, errors, p95_from_buckets(buckets)
+
+
+class AIMDController:
+    """Worker limit for one site, raised by one per healthy window and halved on trouble"""
+
+    def __init__(self, site_key: str, limit: int = 1):
+        self.site_key = site_key
+        self.limit = max(1, limit)
+        self.best_p95: Optional[float] = None
+
+    def update(self, requests: float, errors: float, p95: Optional[float], ceiling: int) -> Tuple[int, str, str]:
+        """New limit for a window's signals, capped at ceiling; returns (limit, decision, reason)"""
+        if requests < MIN_REQUESTS:
+            decision, reason = "hold", "too_few_requests"
+        else:
+            error_rate = errors / requests
+            ERROR_RATE.set(round(error_rate, 4), site=self.site_key)
+            if p95 is not None:
+                P95_SECONDS.set(p95, site=self.site_key)
+            if error_rate > MAX_ERROR_RATE:
+                decision, reason = "decrease", "errors"
+            elif p95 is not None and self.best_p95 is not None and p95 > self.best_p95 * LATENCY_TOLERANCE:
+                decision, reason = "decrease", "latency"
+            else:
+                decision, reason = "increase", "healthy"
+            if p95 is not None and (self.best_p95 is None or p95 < self.best_p95):
+                self.best_p95 = p95
+
+        if decision == "decrease":
+            self.limit = max(1, int(self.limit * DECREASE_FACTOR))
+        elif decision == "increase":
+            if self.limit >= ceiling:
+                decision, reason = "hold", "at_ceiling"
+            else:
+                self.limit += 1
+        self.limit = min(self.limit, max(1, ceiling))
+
+        CONCURRENCY_LIMIT.set(self.limit, site=self.site_key)
+        CONCURRENCY_DECISIONS.inc(site=self.site_key, decision=decision, reason=reason)
+        return self.limit, decision, reason
@@ -33,6 +33,11 @@ OUTPUT_CONFIG = {
 
 LOGGING_CONFIG = {
     "level": "INFO", 
-    "format": "%(asctime)s - %(levelname)s - %(message)s",
-    "log_file": "scraper.log"
+    "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    "log_file": "scraper.log",
+    "modules": {  # per-module levels, overridable with SCRAPER_LOG_LEVELS
+        "selenium": "WARNING",
+        "urllib3": "WARNING",
+        "WDM": "WARNING",
+    }
 }
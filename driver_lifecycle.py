@@ -0,0 +1,264 @@
+"""
+Driver Lifecycle
+Replaces a long-running scraper's Chrome before it wears out. Renderer memory grows with every
+page, and a browser that has served hours of product pages gets steadily slower. The driver
+is recycled between products once it has served SCRAPER_RECYCLE_PAGES pages or Chrome's
+resident memory (browser plus renderer and GPU processes) passes SCRAPER_RECYCLE_RSS_MB.
+
+RSS comes from psutil when installed and from /proc otherwise; where neither is available,
+or the browser belongs to browser_daemon.py, only the page count applies.
+
+It also respawns the browser when Chrome or chromedriver dies. run_keyword() tells a lost
+session apart from page errors and retries the keyword on a fresh browser a bounded number
+of times, so one renderer crash costs one keyword retry instead of the rest of the run.
+"""
+
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+import heartbeat
+import metrics
+import tracing
+from browser_setup import AttachedChrome, release_profile
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MAX_PAGES = 150
+MAX_RSS_MB = 2048
+MAX_KEYWORD_ATTEMPTS = 3
+RESPAWN_ATTEMPTS = 3
+RESPAWN_BACKOFF = 5         # seconds, multiplied by the attempt number
+
+# WebDriverException messages that mean the browser or chromedriver is gone, not the page
+DEAD_SESSION_MESSAGES = (
+    "invalid session id", "no such session", "session deleted", "chrome not reachable",
+    "tab crashed", "target crashed", "disconnected", "target window already closed",
+    "unable to receive message from renderer", "failed to establish a new connection",
+)
+
+BROWSER_RSS = metrics.Gauge("scraper_browser_rss_bytes", "Resident memory of the worker's Chrome process tree")
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r") as f:
+                # The command name is in parentheses and may itself contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(name))
+    return children
+
+
+def _proc_rss(pid: int) -> int:
+    with open(f"/proc/{pid}/statm", "r") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def process_tree_pids(pid: int) -> List[int]:
+    """pid followed by all its descendants"""
+    if psutil is not None:
+        try:
+            return [pid] + [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return [pid]
+    if not os.path.isdir("/proc"):
+        return [pid]
+    children = _proc_children()
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        pending.extend(children.get(current, []))
+    return pids
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Resident bytes of pid and all its descendants, or None when it cannot be measured"""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    if not os.path.isdir("/proc"):
+        return None
+    total = 0
+    for current in process_tree_pids(pid):
+        try:
+            total += _proc_rss(current)
+        except (OSError, ValueError, IndexError):
+            if current == pid:
+                return None
+    return total
+
+
+class SessionLost(Exception):
+    """The browser session died; the current keyword has to be retried on a new driver"""
+
+
+def is_session_error(error: BaseException) -> bool:
+    """True when error means the browser/chromedriver is gone rather than a page problem"""
+    if isinstance(error, (SessionLost, InvalidSessionIdException, NoSuchWindowException,
+                          ConnectionError, Urllib3HTTPError)):
+        return True
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        return any(text in message for text in DEAD_SESSION_MESSAGES)
+    return False
+
+
+def retire_driver(driver, healthy: bool = True) -> None:
+    """Quit a driver and give its profile (or daemon browser) back, e.g. after a failed start"""
+    if isinstance(driver, AttachedChrome):
+        # Only a restart gives a daemon browser's memory back
+        try:
+            driver.service.stop()
+        finally:
+            driver.release_lease(healthy=False)
+        return
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning("⚠️ Error closing the old browser: %s", e)
+    release_profile(driver, healthy)
+
+
+class DriverLifecycle:
+    """Owns the worker's driver and swaps it for a fresh one when a threshold is crossed.
+
+    start_driver() must return a driver that is ready to scrape (e.g. on the home page with
+    the search bar loaded), since a recycle can happen at any point between two products.
+    """
+
+    def __init__(self, site: str, start_driver: Callable, max_pages: int = None, max_rss_mb: int = None):
+        self.site = site
+        self.start_driver = start_driver
+        self.max_pages = max_pages if max_pages is not None else int(os.environ.get("SCRAPER_RECYCLE_PAGES", MAX_PAGES))
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else int(os.environ.get("SCRAPER_RECYCLE_RSS_MB", MAX_RSS_MB))
+        self.driver = None
+        self.pages = 0
+        self.recycles = 0
+
+    def start(self):
+        heartbeat.beat("startup")
+        self.driver = self.start_driver()
+        self.pages = 0
+        return self.driver
+
+    def page_served(self, count: int = 1) -> None:
+        self.pages += count
+
+    def rss_bytes(self) -> Optional[int]:
+        service = getattr(self.driver, "service", None)
+        process = getattr(service, "process", None)
+        if process is None or isinstance(self.driver, AttachedChrome):
+            return None
+        # chromedriver is the parent of Chrome, which is the parent of the renderers
+        rss = process_tree_rss(process.pid)
+        if rss is not None:
+            BROWSER_RSS.set(rss)
+        return rss
+
+    def recycle_reason(self) -> Optional[str]:
+        if self.max_pages and self.pages >= self.max_pages:
+            return "pages"
+        if self.max_rss_mb:
+            rss = self.rss_bytes()
+            if rss is not None and rss >= self.max_rss_mb * 1024 * 1024:
+                return "rss"
+        return None
+
+    def maybe_recycle(self) -> bool:
+        """Recycle the driver if it is due; call only between products"""
+        reason = self.recycle_reason()
+        if not reason:
+            return False
+        rss = self.rss_bytes() if reason == "rss" else None
+        detail = f"{rss / 1024 / 1024:.0f} MB RSS" if rss else f"{self.pages} pages"
+        logger.info("♻️ Recycling %s browser (%s)", self.site, detail)
+        started = time.time()
+        with tracing.span("driver_recycle", reason=reason, pages=self.pages):
+            retire_driver(self.driver)
+            self.start()
+        self.recycles += 1
+        metrics.record_driver_restart(f"recycle_{reason}")
+        logger.info("🆕 Fresh browser ready in %.1fs", time.time() - started)
+        return True
+
+    def alive(self) -> bool:
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            if is_session_error(e):
+                return False
+            # A page that is busy or showing an alert still has a live session
+            return True
+
+    def ensure_alive(self) -> None:
+        """Raise SessionLost if the browser died, e.g. before keeping a product whose fields
+        all failed because the session was gone"""
+        if not self.alive():
+            raise SessionLost("browser session is no longer reachable")
+
+    def respawn(self) -> None:
+        """Replace a dead browser, retrying the launch with backoff"""
+        retire_driver(self.driver, healthy=False)
+        self.driver = None
+        for attempt in range(1, RESPAWN_ATTEMPTS + 1):
+            try:
+                with tracing.span("driver_respawn", attempt=attempt):
+                    self.start()
+                metrics.record_driver_restart("session_lost")
+                logger.info("🆕 New %s browser started", self.site)
+                return
+            except Exception as e:
+                if attempt == RESPAWN_ATTEMPTS:
+                    raise
+                logger.warning("⚠️ Browser launch failed (%s), retrying in %ss", e, RESPAWN_BACKOFF * attempt)
+                time.sleep(RESPAWN_BACKOFF * attempt)
+
+    def run_keyword(self, label: str, scrape: Callable, *args, attempts: int = MAX_KEYWORD_ATTEMPTS) -> List:
+        """scrape(*args) for one keyword, retried on a fresh browser when the session dies.
+        Page errors are left to scrape(); it must let session errors propagate."""
+        for attempt in range(1, attempts + 1):
+            try:
+                return scrape(*args)
+            except Exception as e:
+                if not is_session_error(e):
+                    raise
+                logger.error("💥 Browser session lost during '%s' (%s), respawning", label, type(e).__name__)
+                self.respawn()
+                if attempt < attempts:
+                    metrics.record_retry("session_lost")
+                    logger.info("🔁 Retrying '%s' (attempt %s/%s)", label, attempt + 1, attempts)
+        logger.error("❌ Giving up on '%s' after %s lost sessions", label, attempts)
+        return []
+
+    def quit(self) -> None:
+        if self.driver is not None:
+            retire_driver(self.driver)
+            self.driver = None
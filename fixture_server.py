@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Offline Fixture Server
+Serves stand-in home, search and product pages for Nykaa, Myntra, Zara and H&M using the
+same selectors the scrapers look for, so scraper throughput can be measured without the
+network. Product data is generated deterministically from the keyword and product ID.
+
+Point a scraper at it with SCRAPER_BASE_URL, e.g.:
+    python fixture_server.py --port 8765 --latency 0.3 --lazy
+    SCRAPER_BASE_URL=http://127.0.0.1:8765/zara/in/ SCRAPER_KEYWORD_IDS=421 python zara.py
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Tunables, changed through start_fixture_server() / the CLI
+FIXTURE_CONFIG = {
+    "latency": 0.0,          # seconds added to every HTML response
+    "jitter": 0.0,           # extra random latency (0..jitter seconds)
+    "image_latency": 0.0,    # seconds added to every image response
+    "lazy": False,           # serve placeholders and swap in real image URLs on scroll
+    "lazy_delay_ms": 300,    # how long a lazy image takes to swap once visible
+    "products_per_search": 12,
+    "images_per_product": 5,
+}
+
+# Home page path of every site, relative to the server root (used for SCRAPER_BASE_URL)
+FIXTURE_SITES = {
+    "nykaa": "nykaa/",
+    "myntra": "myntra/",
+    "zara": "zara/in/",
+    "hm": "hm/en_in",
+}
+
+# 1x1 transparent GIF served for every image request
+PIXEL = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+COLORS = ["Black", "White", "Ecru", "Navy", "Olive", "Pink", "Sky Blue"]
+BRANDS = ["Twenty Dresses", "Berrylush", "Roadster", "HERE&NOW", "Mango", "Vero Moda"]
+
+
+def get_base_url(site: str, host: str = "127.0.0.1", port: int = 8765) -> str:
+    """SCRAPER_BASE_URL value that points a site's scraper at the fixture server"""
+    return f"http://{host}:{port}/{FIXTURE_SITES[site]}"
+
+
+def _product_ids(site: str, keyword: str):
+    """Stable product IDs for a search so repeated runs visit the same pages"""
+    ids = []
+    for index in range(FIXTURE_CONFIG["products_per_search"]):
+        digest = hashlib.md5(f"{site}:{keyword}:{index}".encode()).hexdigest()
+        ids.append(10_000_000 + int(digest[:8], 16) % 90_000_000)
+    return ids
+
+
+def _product(site: str, product_id: int):
+    rng = random.Random(f"{site}:{product_id}")
+    price = rng.randrange(499, 4999, 10)
+    return {
+        "brand": rng.choice(BRANDS),
+        "name": f"Fixture {rng.choice(['Ribbed', 'Linen', 'Cropped', 'Relaxed', 'Printed'])} "
+                f"{rng.choice(['Top', 'Shirt', 'Dress', 'Jeans', 'Skirt'])} {product_id}",
+        "price": price,
+        "mrp": price + rng.randrange(100, 2000, 50),
+        "rating": round(rng.uniform(3.0, 5.0), 1),
+        "rating_count": rng.randrange(5, 5000),
+        "color": rng.choice(COLORS),
+        "sizes": [(size, rng.choice(["size-in-stock", "size-in-stock", "size-back-soon", "size-out-of-stock"]))
+                  for size in SIZES[:rng.randint(3, len(SIZES))]],
+        "description": "Stand-in product description served by fixture_server.py.",
+    }
+
+
+def _page(title: str, body: str, script: str = "") -> str:
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"<style>body{{font-family:sans-serif}} .grid>*{{display:inline-block;width:220px;height:320px;margin:8px}}"
+            f" img,.img{{width:200px;height:260px;display:block;background:#eee}}</style></head>"
+            f"<body>{body}<script>{script}</script></body></html>")
+
+
+def _lazy_script() -> str:
+    """Swap data-src into src (or data-bg into background-image) a little after an element scrolls into view"""
+    if not FIXTURE_CONFIG["lazy"]:
+        return ""
+    return """
+        const lazyObserver = new IntersectionObserver((entries) => {
+            for (const entry of entries) {
+                if (!entry.isIntersecting) continue;
+                const el = entry.target;
+                lazyObserver.unobserve(el);
+                setTimeout(() => {
+                    if (el.dataset.src) el.src = el.dataset.src;
+                    if (el.dataset.bg) el.style.backgroundImage = `url("${el.dataset.bg}")`;
+                }, %d);
+            }
+        });
+        document.querySelectorAll('[data-src],[data-bg]').forEach((el) => lazyObserver.observe(el));
+    """ % FIXTURE_CONFIG["lazy_delay_ms"]
+
+
+def _img(css_class: str, url: str, placeholder: str) -> str:
+    if FIXTURE_CONFIG["lazy"]:
+        return f"<img class='{css_class}' src='{placeholder}' data-src='{url}'>"
+    return f"<img class='{css_class}' src='{url}'>"
+
+
+# ---------------------------------------------------------------- Nykaa
+
+def nykaa_page(path, query):
+    if path.startswith("/nykaa/p/"):
+        product_id = int(path.rsplit("/", 1)[-1])
+        p = _product("nykaa", product_id)
+        images = "".join(_img("pdp-selector-img", f"/img/nykaa/{product_id}_{n}.jpg", "/img/placeholder.gif")
+                         for n in range(FIXTURE_CONFIG["images_per_product"]))
+        sizes = "".join(f"<button data-at='size-btn'>{size}</button>" for size, _ in p["sizes"])
+        return _page(p["name"], f"""
+            <h1 class='css-6mpq2k'>{p['brand']}</h1><h2 class='css-cmh3n9'>{p['name']}</h2>
+            <span data-at='product-rating'>{p['rating']}</span><div class='css-gb84zx'><span>{p['rating_count']}</span></div>
+            <span data-at='sp-pdp'>₹{p['price']}</span><span data-at='mrp-pdp'>₹{p['mrp']}</span>
+            <div>{sizes}</div><div>{images}</div>""", _lazy_script())
+
+    search = "<form action='/nykaa/search' method='get'><input data-at='search-input' name='q' autocomplete='off'></form>"
+    if path.startswith("/nykaa/search"):
+        keyword = query.get("q", [""])[0]
+        tiles = "".join(f"<div class='css-384pms'><a href='/nykaa/p/{product_id}'><div class='img'></div>Product {product_id}</a></div>"
+                        for product_id in _product_ids("nykaa", keyword))
+        return _page(f"{keyword} - Nykaa", f"""{search}
+            <div class='css-y9u3nm'>Gender</div><div title='Women'>Women</div>
+            <div class='grid'>{tiles}</div>""")
+    return _page("Nykaa Fashion", search)
+
+
+# ---------------------------------------------------------------- Myntra
+
+def myntra_page(path, query):
+    search = "<form action='/myntra/search' method='get'><input class='desktop-searchBar' name='q' autocomplete='off'></form>"
+    if path.startswith("/myntra/p/"):
+        product_id = int(path.rsplit("/", 1)[-1])
+        p = _product("myntra", product_id)
+        cells = []
+        for n in range(FIXTURE_CONFIG["images_per_product"]):
+            url = f"/img/myntra/{product_id}_{n}.jpg"
+            style = "" if FIXTURE_CONFIG["lazy"] else f" style='background-image: url(\"{url}\");'"
+            lazy = f" data-bg='{url}'" if FIXTURE_CONFIG["lazy"] else ""
+            cells.append(f"<div class='image-grid-col50'><div class='image-grid-imageContainer'>"
+                         f"<div class='image-grid-image img'{style}{lazy}></div></div></div>")
+        sizes = "".join(f"<button><p class='size-buttons-unified-size'>{size}</p></button>" for size, _ in p["sizes"])
+        # The live PDP also embeds its image list as URL templates
+        payload = {"pdpData": {"id": product_id, "media": {"albums": [{"name": "default", "images": [
+            {"src": f"/img/myntra/h_($height),q_($qualityPercentage),w_($width)/{product_id}_{n}.jpg"}
+            for n in range(FIXTURE_CONFIG["images_per_product"])]}]}}}
+        # Like the live site, the header search bar is on product pages too
+        return _page(p["name"], f"""{search}
+            <h1 class='pdp-title'>{p['brand']}</h1><h1 class='pdp-name'>{p['name']}</h1>
+            <div class='index-overallRating'><div>{p['rating']}</div><div class='index-ratingsCount'>{p['rating_count']} Ratings</div></div>
+            <span class='pdp-price'><strong>₹{p['price']}</strong></span><span class='pdp-mrp'><s>₹{p['mrp']}</s></span>
+            <div>{sizes}</div><p class='pdp-product-description-content'>{p['description']}</p>
+            <div style='height:800px'></div><div class='image-grid-container'>{''.join(cells)}</div>
+            <script>window.__myx = {json.dumps(payload)};</script>""", _lazy_script())
+
+    if path.startswith("/myntra/search"):
+        keyword = query.get("q", [""])[0]
+        tiles = "".join(f"<li class='product-base'><a href='/myntra/p/{product_id}' target='_blank'><div class='img'></div>Product {product_id}</a></li>"
+                        for product_id in _product_ids("myntra", keyword))
+        return _page(f"{keyword} - Myntra", f"""{search}
+            <label class='gender-label'>Men</label><label class='gender-label'>Women</label>
+            <ul class='grid'>{tiles}</ul>""")
+    return _page("Myntra", search)
+
+
+# ---------------------------------------------------------------- Zara
+
+def zara_image_url(host: str, product_id: int, view: str) -> str:
+    """Image URL shaped like Zara's CDN paths so zara_images.is_valid_product_image accepts it"""
+    digest = hashlib.md5(str(product_id).encode()).hexdigest()
+    return (f"http://{host}/zara/static.zara.net/assets/public/{digest[:4]}/{digest[4:8]}/"
+            f"{product_id:011d}-{view}.jpg?ts=1700000000000&w=1920")
+
+
+def zara_page(path, query, host):
+    search_form = ("<form action='/zara/in/search' method='get'>"
+                   "<input id='search-home-form-combo-input' name='searchTerm' autocomplete='off'></form>")
+    if path.endswith(".html") and "-p" in path:
+        product_id = int(query.get("v1", ["0"])[0])
+        p = _product("zara", product_id)
+        placeholder = f"http://{host}/zara/static.zara.net/stdstatic/transparent-background.png"
+        views = ["p"] + [f"a{n}" for n in range(1, 5)] + [f"e{n}" for n in range(1, 5)]
+        pictures = "".join(
+            f"<picture class='media-image'>{_img('media-image__image', zara_image_url(host, product_id, view), placeholder)}</picture>"
+            for view in views[:FIXTURE_CONFIG["images_per_product"]])
+        # Like the live site, sizes ship in the embedded product payload and the size selector
+        # markup is only rendered once add-to-bag is clicked
+        availability = {"size-in-stock": "in_stock", "size-back-soon": "back_soon", "size-out-of-stock": "out_of_stock"}
+        payload = {"product": {"id": product_id, "detail": {"colors": [{
+            "productId": product_id, "name": p["color"],
+            "sizes": [{"name": size, "availability": availability[state]} for size, state in p["sizes"]]}]}}}
+        render_sizes = """
+            function renderSizes() {
+                const states = {in_stock: 'size-in-stock', back_soon: 'size-back-soon', out_of_stock: 'size-out-of-stock'};
+                const selector = document.getElementById('size-selector');
+                selector.innerHTML = window.__PRELOADED_STATE__.product.detail.colors[0].sizes.map((s) =>
+                    `<button class='size-selector-sizes-size__button' data-qa-action='${states[s.availability]}'>` +
+                    `<div class='size-selector-sizes-size__label'>${s.name}</div></button>`).join('');
+                selector.style.display = 'block';
+            }"""
+        return _page(p["name"], f"""
+            <h1 class='product-detail-info__header-name'>{p['name']}</h1>
+            <span class='price-old__amount'><div class='money-amount'><span class='money-amount__main'>₹ {p['mrp']}.00</span></div></span>
+            <span class='price-current__amount'><div class='money-amount'><span class='money-amount__main'>₹ {p['price']}.00</span></div></span>
+            <p class='product-color-extended-name'>{p['color']} | {product_id}</p>
+            <div class='expandable-text__inner-content'><p>{p['description']}</p></div>
+            <div class='product-detail-composition'><span>100% cotton</span></div>
+            <div class='product-detail-cart-buttons__main-action'>
+              <button class='product-detail-cart-buttons__button'
+                      onclick="renderSizes()">Add</button></div>
+            <div id='size-selector' style='display:none'></div>
+            <div>{pictures}</div>
+            <script>window.__PRELOADED_STATE__ = {json.dumps(payload)};</script>""", _lazy_script() + render_sizes)
+
+    if path.startswith("/zara/in/search"):
+        keyword = query.get("searchTerm", [""])[0]
+        tiles = "".join(
+            f"<div><a class='product-grid-product__link' href='/zara/in/fixture-{product_id}-p{product_id:08d}.html?v1={product_id}'>"
+            f"<div class='img'></div>Product {product_id}</a></div>"
+            for product_id in _product_ids("zara", keyword)) if keyword else ""
+        return _page(f"{keyword} - Zara", f"{search_form}<div class='grid'>{tiles}</div>")
+    return _page("ZARA India", "<a class='layout-header-action__link' href='/zara/in/search'>Search</a>")
+
+
+# ---------------------------------------------------------------- H&M
+
+def hm_page(path, query):
+    if "/productpage." in path:
+        product_id = int(path.split("/productpage.", 1)[1].split(".")[0])
+        p = _product("hm", product_id)
+        images = "".join(_img("", f"/img/hm/{product_id}_{n}.jpg", "/img/placeholder.gif")
+                         for n in range(FIXTURE_CONFIG["images_per_product"]))
+        sizes = "".join(f"<li><div class='af6b46'>{size}</div></li>" for size, _ in p["sizes"])
+        return _page(p["name"], f"""
+            <div class='a0c9d8'><h1 class='be6471'>{p['name']}</h1></div>
+            <div class='f4e18c'><span class='a15559'>Rs. {p['price']}.00</span></div>
+            <div data-testid='color-selector'><p class='b136ca'>{p['color']}</p></div>
+            <ul class='c3421a'>{sizes}</ul><div class='product-detail-main-image'>{images}</div>""", _lazy_script())
+
+    header = ("<button data-elid='header-search-button' "
+              "onclick=\"document.getElementById('drawer').style.display='block'\">Search</button>"
+              "<form id='drawer' style='display:none' action='/hm/en_in/search' method='get'>"
+              "<input data-elid='search-drawer-input' name='q' autocomplete='off'></form>")
+    if path.startswith("/hm/en_in/search"):
+        keyword = query.get("q", [""])[0]
+        tiles = "".join(f"<article class='product-item' data-articlecode='{product_id}'>"
+                        f"<a href='/hm/en_in/productpage.{product_id}.html'><div class='img'></div>Product {product_id}</a></article>"
+                        for product_id in _product_ids("hm", keyword))
+        return _page(f"{keyword} - H&M", f"{header}<div class='grid'>{tiles}</div>")
+    return _page("H&M India", header)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path, query = parsed.path, parse_qs(parsed.query)
+
+        if path.endswith((".jpg", ".jpeg", ".png", ".webp", ".gif")):
+            if FIXTURE_CONFIG["image_latency"]:
+                time.sleep(FIXTURE_CONFIG["image_latency"])
+            self._send(200, PIXEL, "image/gif")
+            return
+
+        if path.startswith("/nykaa"):
+            body = nykaa_page(path, query)
+        elif path.startswith("/myntra"):
+            body = myntra_page(path, query)
+        elif path.startswith("/zara"):
+            body = zara_page(path, query, self.headers.get("Host", "127.0.0.1"))
+        elif path.startswith("/hm"):
+            body = hm_page(path, query)
+        else:
+            links = "".join(f"<li><a href='/{home}'>{site}</a></li>" for site, home in FIXTURE_SITES.items())
+            body = _page("Fixture sites", f"<ul>{links}</ul>")
+
+        time.sleep(FIXTURE_CONFIG["latency"] + random.uniform(0, FIXTURE_CONFIG["jitter"]))
+        self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(port: int = 8765, host: str = "127.0.0.1", **config) -> ThreadingHTTPServer:
+    """Start the fixture server in a daemon thread, applying any FIXTURE_CONFIG overrides"""
+    unknown = set(config) - set(FIXTURE_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown fixture options: {', '.join(sorted(unknown))}")
+    FIXTURE_CONFIG.update(config)
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve offline stand-in pages for the scrapers')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every page response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency of up to this many seconds')
+    parser.add_argument('--image-latency', type=float, default=0.0, help='Seconds added to every image response')
+    parser.add_argument('--lazy', action='store_true', help='Lazy-load product images when they scroll into view')
+    parser.add_argument('--lazy-delay-ms', type=int, default=300)
+    parser.add_argument('--products', type=int, default=12, help='Products per search result page')
+    parser.add_argument('--images', type=int, default=5, help='Images per product page')
+    args = parser.parse_args()
+
+    server = start_fixture_server(
+        args.port, args.host, latency=args.latency, jitter=args.jitter, image_latency=args.image_latency,
+        lazy=args.lazy, lazy_delay_ms=args.lazy_delay_ms, products_per_search=args.products,
+        images_per_product=args.images,
+    )
+    print(f"🧪 Fixture server running on http://{args.host}:{args.port}/")
+    for site in FIXTURE_SITES:
+        print(f"   {site:<7} SCRAPER_BASE_URL={get_base_url(site, args.host, args.port)}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n🛑 Fixture server stopped")
+
+
+if __name__ == "__main__":
+    main()
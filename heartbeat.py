@@ -0,0 +1,71 @@
+"""
+Heartbeats and Checkpoints
+A scraper worker reports what it is doing (phase, keyword, product) by rewriting a small JSON
+heartbeat file, and saves its finished keywords and products to a checkpoint after every
+keyword. parallel_scraper's watchdog reads the heartbeat: a worker that stays in one phase
+longer than that phase's budget is killed and started again, and the new process skips the
+keywords its checkpoint already covers.
+
+Both are off unless the orchestrator sets SCRAPER_HEARTBEAT_FILE / SCRAPER_CHECKPOINT_FILE.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_state: Dict[str, Any] = {}
+
+
+def _write_json(path: str, data) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def beat(phase: str, **fields) -> None:
+    """Record entering a phase; keyword/product fields persist until they are replaced"""
+    path = os.environ.get("SCRAPER_HEARTBEAT_FILE")
+    if not path:
+        return
+    if "keyword" in fields:
+        _state.pop("product", None)
+    _state.update(fields, phase=phase, pid=os.getpid(), ts=time.time())
+    try:
+        _write_json(path, _state)
+    except OSError:
+        pass
+
+
+def read_heartbeat(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_checkpoint(path: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Set[str]]:
+    """Products and finished keyword IDs saved by an earlier run of this worker (or at path).
+
+    Products of keywords that never finished are dropped; the resumed run scrapes them again.
+    """
+    path = path or os.environ.get("SCRAPER_CHECKPOINT_FILE")
+    if not path or not os.path.exists(path):
+        return [], set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return [], set()
+    done_keyword_ids = {str(keyword_id) for keyword_id in data.get("done_keyword_ids", [])}
+    products = [product for product in data.get("products", []) if str(product.get("keyword_id")) in done_keyword_ids]
+    return products, done_keyword_ids
+
+
+def save_checkpoint(products: List[Dict[str, Any]], done_keyword_ids: Set[str]) -> None:
+    path = os.environ.get("SCRAPER_CHECKPOINT_FILE")
+    if not path:
+        return
+    _write_json(path, {"saved_at": time.time(), "done_keyword_ids": sorted(done_keyword_ids), "products": products})
@@ -1,33 +1,61 @@
 #!/usr/bin/env python3
 """
 H&M Fashion Search Script
-Navigates to H&M.com, searches for keywords from zara_keywords.json, waits 3 seconds between searches
+Navigates to H&M.com, searches for keywords from keywords.json, waits 3 seconds between searches
 """
 
 import time
 import json
 import random
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+import heartbeat
+import metrics
+import snapshot_recorder
+from utils import filter_keywords, get_output_file, get_base_url
+from site_registry import get_site
+from selector_cache import SelectorResolver
+from browser_setup import create_driver
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Product tile selectors, tried in order until one matches (the matching one is remembered)
+PRODUCT_SELECTORS = [".product-item", "[data-articlecode]", ".hm-product-item"]
 
 def main():
     try:
-        with open('zara_keywords.json', 'r') as f:
+        with open('keywords.json', 'r') as f:
             keywords_data = json.load(f)
-        print(f"Loaded {len(keywords_data)} keywords from zara_keywords.json")
+        logger.info("Loaded %s keywords from keywords.json", len(keywords_data))
     except Exception as e:
-        print(f"Error loading keywords file: {e}")
+        logger.error("Error loading keywords file: %s", e)
+        return
+    
+    start_id, end_id = get_site("hm")["keyword_range"]
+    
+    filtered_keywords = filter_keywords(keywords_data, start_id, end_id)
+    
+    logger.info("Scraping keywords with IDs %s to %s", start_id, end_id)
+    logger.info("Total keywords to scrape: %s", len(filtered_keywords))
+    
+    if not filtered_keywords:
+        logger.warning("No keywords found in range %s-%s", start_id, end_id)
         return
     
-    all_scraped_data = []
+    metrics.start_metrics("hm")
+    selectors = SelectorResolver("hm")
+    # A watchdog restart resumes after the keywords the checkpoint already covers
+    all_scraped_data, done_keyword_ids = heartbeat.load_checkpoint()
+    if done_keyword_ids:
+        logger.info("⏩ Resuming from checkpoint: %s keywords and %s products already done", len(done_keyword_ids), len(all_scraped_data))
+    output_file = get_output_file('h&m_scraped_data.json')
+    base_url = get_base_url("https://www2.hm.com/en_in")
     
     chrome_options = Options()
     
@@ -107,8 +135,8 @@ def main():
     })
     
    
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    heartbeat.beat("startup")
+    driver = create_driver(chrome_options, "hm")
     
    
     stealth_scripts = [
@@ -145,8 +173,8 @@ def main():
         wait = WebDriverWait(driver, 10)
         
        
-        print("Navigating to H&M...")
-        driver.get("https://www2.hm.com/en_in")
+        logger.debug("Navigating to H&M...")
+        driver.get(base_url)
         
        
         time.sleep(random.uniform(3, 6))
@@ -169,35 +197,39 @@ def main():
             time.sleep(random.uniform(0.5, 1.5))
         
        
-        print("Waiting for page to load...")
+        logger.debug("Waiting for page to load...")
         try:
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "[data-elid='header-search-button']")))
-            print("✅ Page loaded successfully - search button found")
+            logger.info("✅ Page loaded successfully - search button found")
         except TimeoutException:
-            print("❌ Page load timeout - search button not found within 10 seconds")
+            logger.error("❌ Page load timeout - search button not found within 10 seconds")
             return
         
        
-        for i, keyword_obj in enumerate(keywords_data):
+        for i, keyword_obj in enumerate(filtered_keywords):
             keyword_id = keyword_obj["id"]
             keyword = keyword_obj["keyword"]
-            print(f"\nSearching for keyword {i+1}/{len(keywords_data)}: '{keyword}' (ID: {keyword_id})")
+            if str(keyword_id) in done_keyword_ids:
+                continue
+            logger.info("Searching for keyword %s/%s: '%s' (ID: %s)", i+1, len(filtered_keywords), keyword, keyword_id)
+            heartbeat.beat("search", keyword_id=keyword_id, keyword=keyword)
             
             try:
                
                 if i > 0:
-                    print("Navigating back to main page...")
-                    driver.get("https://www2.hm.com/en_in")
+                    logger.debug("Navigating back to main page...")
+                    driver.get(base_url)
                    
                     time.sleep(random.uniform(3, 7))
                     
                    
                     if i > 0:
-                        print(f"Waiting {random.uniform(5, 10):.1f} seconds between keyword searches...")
-                        time.sleep(random.uniform(5, 10))
+                        pause = random.uniform(5, 10)
+                        logger.debug("Waiting %.1f seconds between keyword searches...", pause)
+                        time.sleep(pause)
                 
                
-                print(f"Looking for search button for keyword: '{keyword}'")
+                logger.debug("Looking for search button for keyword: '%s'", keyword)
                 search_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-elid='header-search-button']")))
                 
                
@@ -209,15 +241,15 @@ def main():
                 actions.pause(random.uniform(0.1, 0.5))
                 actions.click(search_button)
                 actions.perform()
-                print("Clicked search button")
+                logger.debug("Clicked search button")
                 
                
                 wait_time = random.uniform(2, 4)
-                print(f"Waiting {wait_time:.1f} seconds...")
+                logger.debug("Waiting %.1f seconds...", wait_time)
                 time.sleep(wait_time)
                 
                
-                print(f"Looking for search input for keyword: '{keyword}'")
+                logger.debug("Looking for search input for keyword: '%s'", keyword)
                 search_input = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-elid='search-drawer-input']")))
                 
                
@@ -228,24 +260,24 @@ def main():
                
                 search_input.send_keys(Keys.CONTROL + "a")
                 search_input.send_keys(Keys.DELETE)
-                print(f"Cleared search input for keyword: '{keyword}'")
+                logger.debug("Cleared search input for keyword: '%s'", keyword)
                 
                
                 for char in keyword:
                     search_input.send_keys(char)
                     time.sleep(random.uniform(0.05, 0.15))  
-                print(f"Typed: {keyword}")
+                logger.debug("Typed: %s", keyword)
                 
 
                 time.sleep(random.uniform(0.5, 1.5))
                 
                
                 search_input.send_keys(Keys.RETURN)
-                print("Pressed Enter")
+                logger.debug("Pressed Enter")
                 
                 
                 wait_time = random.uniform(4, 7)
-                print(f"Waiting {wait_time:.1f} seconds for search results to load...")
+                logger.debug("Waiting %.1f seconds for search results to load...", wait_time)
                 time.sleep(wait_time)
                 
                 
@@ -253,32 +285,26 @@ def main():
                     scroll_amount = random.randint(200, 800)
                     driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
                     time.sleep(random.uniform(0.5, 1.5))
-                
+                snapshot_recorder.capture(driver, "hm", "search", keyword_id=keyword_id, keyword=keyword)
 
                 try:
-                    found_products = driver.find_elements(By.CSS_SELECTOR, ".product-item")
-                    if not found_products:
-                        found_products = driver.find_elements(By.CSS_SELECTOR, "[data-articlecode]")
-                    if not found_products:
-                        found_products = driver.find_elements(By.CSS_SELECTOR, ".hm-product-item")
+                    found_products = selectors.find_elements(driver, "search_results", PRODUCT_SELECTORS)
                     
-                    print(f"Found {len(found_products)} products")
+                    logger.info("Found %s products", len(found_products))
+                    if not found_products:
+                        metrics.record_empty_results()
                     
                     products_to_visit = min(3, len(found_products))
-                    print(f"Visiting first {products_to_visit} product pages...")
+                    logger.info("Visiting first %s product pages...", products_to_visit)
                     
                     for j in range(products_to_visit):
                         try:
-                            print(f"\nVisiting product {j+1}/{products_to_visit}")
+                            logger.debug("Visiting product %s/%s", j+1, products_to_visit)
                             
-                            found_products = driver.find_elements(By.CSS_SELECTOR, ".product-item")
-                            if not found_products:
-                                found_products = driver.find_elements(By.CSS_SELECTOR, "[data-articlecode]")
-                            if not found_products:
-                                found_products = driver.find_elements(By.CSS_SELECTOR, ".hm-product-item")
+                            found_products = selectors.find_elements(driver, "search_results", PRODUCT_SELECTORS)
                             
                             if j >= len(found_products):
-                                print(f"No more product elements available (tried to access index {j})")
+                                logger.warning("No more product elements available (tried to access index %s)", j)
                                 break
                             
                             product = found_products[j]
@@ -292,20 +318,24 @@ def main():
                                     if article_code:
                                         product_url = f"https://www2.hm.com/en_in/productpage.{article_code}.html"
                                     else:
-                                        print("No product URL found, skipping...")
+                                        logger.debug("No product URL found, skipping...")
                                         continue
                                 except:
-                                    print("No product URL found, skipping...")
+                                    logger.debug("No product URL found, skipping...")
                                     continue
                             
-                            print(f"Product URL: {product_url}")
+                            logger.debug("Product URL: %s", product_url)
                             
-                            print(f"Navigating directly to: {product_url}")
+                            logger.debug("Navigating directly to: %s", product_url)
+                            pdp_started = time.time()
+                            heartbeat.beat("pdp_load", product=product_url)
                             driver.get(product_url)
                             
                             wait_time = random.uniform(4, 8)
-                            print(f"Waiting {wait_time:.1f} seconds for product page to load...")
+                            logger.debug("Waiting %.1f seconds for product page to load...", wait_time)
                             time.sleep(wait_time)
+                            metrics.observe_phase("pdp_load", pdp_started)
+                            heartbeat.beat("extraction")
                             
                             for _ in range(random.randint(2, 4)):
                                 scroll_amount = random.randint(100, 400)
@@ -342,31 +372,31 @@ def main():
                                 product_id_match = re.search(r'productpage\.(\d+)\.html', current_url)
                                 if product_id_match:
                                     product_data["product_id"] = product_id_match.group(1)
-                                    print(f"Product ID: {product_data['product_id']}")
+                                    logger.debug("Product ID: %s", product_data['product_id'])
                             except Exception as e:
-                                print(f"Product ID not found: {e}")
+                                logger.debug("Product ID not found: %s", e)
                             
                             try:
                                 product_name = driver.find_element(By.CSS_SELECTOR, "div.a0c9d8>h1.be6471").text
                                 product_data["product_name"] = product_name
-                                print(f"Product name: {product_name}")
+                                logger.debug("Product name: %s", product_name)
                             except Exception as e:
-                                print(f"Product name not found: {e}")
+                                logger.debug("Product name not found: %s", e)
                             
                             try:
                                 price_element = driver.find_element(By.CSS_SELECTOR, "div.f4e18c>span.a15559")
                                 product_data["current_product_price"] = price_element.text
-                                print(f"Product price: {price_element.text}")
+                                logger.debug("Product price: %s", price_element.text)
                             except Exception as e:
-                                print(f"Product price not found: {e}")
+                                logger.debug("Product price not found: %s", e)
 
                             try:
                                 color_element = driver.find_element(By.CSS_SELECTOR, "[data-testid='color-selector']")
                                 color_name = color_element.find_element(By.CSS_SELECTOR, "p.b136ca").text
                                 product_data["color_name"] = color_name
-                                print(f"Color name: {color_name}")
+                                logger.debug("Color name: %s", color_name)
                             except Exception as e:
-                                print(f"Color name not found: {e}")
+                                logger.debug("Color name not found: %s", e)
                             
                             try:
                                 size_elements = driver.find_elements(By.CSS_SELECTOR, "ul.c3421a>li>div.af6b46")
@@ -374,9 +404,9 @@ def main():
                                     size_text = size_element.text.strip()
                                     if size_text:
                                         product_data["product_sizes"].append(size_text)
-                                print(f"Product sizes: {product_data['product_sizes']}")
+                                logger.debug("Product sizes: %s", product_data['product_sizes'])
                             except Exception as e:
-                                print(f"Product sizes not found: {e}")
+                                logger.debug("Product sizes not found: %s", e)
                             
                             try:
                                 image_elements = driver.find_elements(By.CSS_SELECTOR, ".product-detail-main-image img")
@@ -384,19 +414,21 @@ def main():
                                     image_url = image_element.get_attribute("src")
                                     if image_url:
                                         product_data["product_image_urls"].append(image_url)
-                                print(f"Product images: {len(product_data['product_image_urls'])} found")
+                                logger.debug("Product images: %s found", len(product_data['product_image_urls']))
                             except Exception as e:
-                                print(f"Product images not found: {e}")
+                                logger.debug("Product images not found: %s", e)
+                            snapshot_recorder.capture(driver, "hm", "pdp", product_url, keyword_id, keyword)
                             
                             all_scraped_data.append(product_data)
-                            print(f"Added product data for: {product_data['product_name']}")
+                            metrics.record_product(product_data)
+                            logger.info("Added product data for: %s", product_data['product_name'])
                             
-                            print("Going back to search results...")
+                            logger.debug("Going back to search results...")
                             driver.back()
                             time.sleep(random.uniform(2, 4))
                             
                         except Exception as e:
-                            print(f"Error visiting product {j+1}: {e}")
+                            logger.warning("Error visiting product %s: %s", j+1, e)
                             try:
                                 driver.back()
                                 time.sleep(random.uniform(2, 4))
@@ -405,38 +437,41 @@ def main():
                             continue
                     
                 except Exception as e:
-                    print(f"Error finding products: {e}")
+                    logger.warning("Error finding products: %s", e)
                     continue
                 
                 wait_time = random.uniform(5, 10)
-                print(f"Waiting {wait_time:.1f} seconds before next keyword...")
+                logger.debug("Waiting %.1f seconds before next keyword...", wait_time)
                 time.sleep(wait_time)
                 
-                print(f"Completed search for keyword: '{keyword}'")
+                logger.info("Completed search for keyword: '%s'", keyword)
+                metrics.keyword_done()
+                done_keyword_ids.add(str(keyword_id))
+                heartbeat.save_checkpoint(all_scraped_data, done_keyword_ids)
                 
             except TimeoutException as e:
-                print(f"Timeout error searching for keyword '{keyword}': {e}")
+                logger.error("Timeout error searching for keyword '%s': %s", keyword, e)
                 continue
             except Exception as e:
-                print(f"Error searching for keyword '{keyword}': {e}")
+                logger.error("Error searching for keyword '%s': %s", keyword, e)
                 continue
         
-        print(f"\nSaving {len(all_scraped_data)} products to h&m_scraped_data.json...")
+        logger.info("Saving %s products to %s...", len(all_scraped_data), output_file)
         try:
-            with open('h&m_scraped_data.json', 'w', encoding='utf-8') as f:
+            with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
-            print("Data saved successfully to h&m_scraped_data.json")
+            logger.info("Data saved successfully to %s", output_file)
         except Exception as e:
-            print(f"Error saving data: {e}")
+            logger.error("Error saving data: %s", e)
         
-        print("\nAll keyword searches completed!")
+        logger.info("All keyword searches completed!")
         
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
     
     finally:
         driver.quit()
-        print("Browser closed")
+        logger.info("Browser closed")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,87 @@
+"""
+Bulk Product Image Harvesting (Myntra, Nykaa)
+One execute_script per product page returns every image URL the page knows about, read from
+the embedded product payload or from element attributes, so images that were never scrolled
+into view still count and no per-element WebDriver calls are needed. CDN URLs are then
+rewritten from thumbnail/grid sizes to full resolution.
+"""
+
+import re
+from typing import List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Myntra serves h_<height>,q_<quality>,w_<width> transforms; the payload carries them as
+# ($height)/($qualityPercentage)/($width) placeholders. These are the zoom-view values.
+MYNTRA_FULL_SIZE = {"height": 1440, "qualityPercentage": 100, "width": 1080}
+MYNTRA_TRANSFORM_PATTERN = re.compile(r'/h_[^,/]+,q_[^,/]+,w_[^,/]+/')
+MYNTRA_TEMPLATE_PATTERN = re.compile(r'\(\$(\w+)\)')
+
+# Nykaa's image CDN resizes with tr=w-<width>; without it the original upload is served
+NYKAA_RESIZE_PARAMS = {"tr"}
+
+MYNTRA_IMAGES_JS = """
+    const urls = [];
+    const pdp = window.__myx && window.__myx.pdpData;
+    const albums = (pdp && pdp.media && pdp.media.albums) || [];
+    const photos = albums.filter((album) => album.name === 'default');
+    (photos.length ? photos : albums).forEach((album) =>
+        (album.images || []).forEach((image) => urls.push(image.src || image.imageURL)));
+    if (!urls.length) {
+        // Grid markup: background-image once loaded, data-bg while still lazy
+        const divs = document.querySelectorAll('div.image-grid-col50>div.image-grid-imageContainer>div.image-grid-image');
+        divs.forEach((div) => {
+            const match = /url\\(["']?([^"']+)["']?\\)/.exec(div.getAttribute('style') || '');
+            urls.push(match ? match[1] : div.dataset.bg);
+        });
+    }
+    return urls.filter(Boolean);
+"""
+
+NYKAA_IMAGES_JS = """
+    const widest = (srcset) => (srcset || '').split(',')
+        .map((entry) => entry.trim().split(/\\s+/))
+        .filter((parts) => parts[0])
+        .sort((a, b) => (parseInt(b[1]) || 0) - (parseInt(a[1]) || 0))
+        .map((parts) => parts[0])[0];
+    return Array.from(document.querySelectorAll('img.pdp-selector-img')).map((img) => {
+        const url = widest(img.getAttribute('srcset')) || img.dataset.src;
+        return url ? new URL(url, location.href).href : img.src;
+    }).filter(Boolean);
+"""
+
+
+def rewrite_myntra_url(url: str) -> str:
+    """Full-resolution Myntra image URL from a payload template or a grid-sized URL"""
+    url = MYNTRA_TEMPLATE_PATTERN.sub(lambda m: str(MYNTRA_FULL_SIZE.get(m.group(1), m.group(0))), url)
+    url = MYNTRA_TRANSFORM_PATTERN.sub(
+        "/h_{height},q_{qualityPercentage},w_{width}/".format(**MYNTRA_FULL_SIZE), url, count=1)
+    if url.startswith("http://assets.myntassets.com"):
+        url = "https://" + url[len("http://"):]
+    return url
+
+
+def rewrite_nykaa_url(url: str) -> str:
+    """Original-size Nykaa image URL (drops the CDN resize parameter)"""
+    parts = urlsplit(url)
+    if not parts.query or "nykaa" not in parts.netloc:
+        return url
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key not in NYKAA_RESIZE_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query, safe="/")))
+
+
+HARVESTERS = {
+    "myntra": (MYNTRA_IMAGES_JS, rewrite_myntra_url),
+    "nykaa": (NYKAA_IMAGES_JS, rewrite_nykaa_url),
+}
+
+
+def rewrite_image_urls(site: str, urls: List[str]) -> List[str]:
+    """Full-resolution, deduplicated URLs in page order"""
+    rewrite = HARVESTERS[site][1]
+    return list(dict.fromkeys(rewrite(url) for url in urls if url))
+
+
+def harvest_images(driver, site: str) -> List[str]:
+    """All full-resolution product image URLs on the current page, in one script call"""
+    script = HARVESTERS[site][0]
+    return rewrite_image_urls(site, driver.execute_script(script) or [])
@@ -21,11 +21,16 @@ Usage:
 """
 
 import json
+import logging
 import os
 import sys
 from typing import List, Dict, Any, Set
 from pathlib import Path
 
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
 # =============================================================================
 # CONFIGURATION: Edit this list to specify which files to merge by default
 # =============================================================================
@@ -61,14 +66,14 @@ def load_json_file(file_path: str) -> List[Dict[str, Any]]:
         with open(file_path, 'r', encoding='utf-8') as file:
             data = json.load(file)
             if not isinstance(data, list):
-                print(f"Warning: {file_path} doesn't contain a JSON array. Skipping...")
+                logger.warning("%s doesn't contain a JSON array. Skipping...", file_path)
                 return []
             return data
     except FileNotFoundError:
-        print(f"Error: File {file_path} not found.")
+        logger.error("File %s not found.", file_path)
         return []
     except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in {file_path}: {e}")
+        logger.error("Invalid JSON in %s: %s", file_path, e)
         return []
 
 
@@ -111,27 +116,28 @@ def merge_json_files(input_files: List[str], output_file: str, verbose: bool = T
     seen_keys: Set[str] = set()
     duplicates_removed = 0
     files_processed = 0
+    # Evaluated once: a large merge can have millions of duplicates
+    log_duplicates = verbose and logger.isEnabledFor(logging.DEBUG)
     
     if verbose:
-        print(f"Starting merge process...")
-        print(f"Input files: {len(input_files)}")
-        print(f"Output file: {output_file}")
-        print("-" * 50)
+        logger.info("Starting merge process...")
+        logger.info("Input files: %s", len(input_files))
+        logger.info("Output file: %s", output_file)
     
     # Process each input file
     for file_path in input_files:
         if not os.path.exists(file_path):
             if verbose:
-                print(f"Warning: File {file_path} does not exist. Skipping...")
+                logger.warning("File %s does not exist. Skipping...", file_path)
             continue
             
         if verbose:
-            print(f"Processing: {file_path}")
+            logger.info("Processing: %s", file_path)
             
         data = load_json_file(file_path)
         if not data:
             if verbose:
-                print(f"  No data loaded from {file_path}")
+                logger.warning("No data loaded from %s", file_path)
             continue
             
         files_processed += 1
@@ -144,29 +150,28 @@ def merge_json_files(input_files: List[str], output_file: str, verbose: bool = T
             if duplicate_key in seen_keys:
                 duplicates_removed += 1
                 file_duplicates += 1
-                if verbose:
-                    print(f"  Duplicate found: {item.get('product_name', 'Unknown')[:50]}...")
+                if log_duplicates:
+                    logger.debug("Duplicate found: %s...", item.get('product_name', 'Unknown')[:50])
             else:
                 seen_keys.add(duplicate_key)
                 all_data.append(item)
         
         if verbose:
-            print(f"  Loaded: {len(data)} items, Duplicates removed: {file_duplicates}")
+            logger.info("Loaded: %s items, Duplicates removed: %s", len(data), file_duplicates)
     
     # Save merged data
     if verbose:
-        print("-" * 50)
-        print(f"Saving merged data to {output_file}...")
+        logger.info("Saving merged data to %s...", output_file)
     
     try:
         with open(output_file, 'w', encoding='utf-8') as file:
             json.dump(all_data, file, indent=2, ensure_ascii=False)
         
         if verbose:
-            print(f"Successfully saved {len(all_data)} unique items to {output_file}")
+            logger.info("Successfully saved %s unique items to %s", len(all_data), output_file)
             
     except Exception as e:
-        print(f"Error saving merged data: {e}")
+        logger.error("Error saving merged data: %s", e)
         return {}
     
     # Return statistics
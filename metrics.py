@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Scraper Metrics
+Counters and histograms for a running scraper worker, exposed in Prometheus text format
+through a small local HTTP endpoint and/or a periodically rewritten metrics file.
+
+Scrapers call start_metrics(site) once; the orchestrator decides where metrics go through
+SCRAPER_METRICS_PORT (serve http://127.0.0.1:<port>/metrics) and SCRAPER_METRICS_FILE
+(rewrite the file every few seconds). With neither set, metrics are only kept in memory.
+
+Usage:
+    # Summarize the metrics files written by a run, per site and worker
+    python metrics.py metrics/
+"""
+
+import atexit
+import glob
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+import tracing
+
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+THROUGHPUT_WINDOW_SECONDS = 300
+FILE_WRITE_INTERVAL = 5
+
+_lock = threading.Lock()
+_metrics = []
+_base_labels: Dict[str, str] = {"site": "unknown", "worker": f"{socket.gethostname()}:{os.getpid()}"}
+_product_times = deque()
+_started = False
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        _metrics.append(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels({**_base_labels, **dict(key)})} {value}")
+        return lines
+
+
+class Gauge:
+    """Value that can go up and down, optionally split by labels"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        _metrics.append(self)
+
+    def set(self, value: float, **labels) -> None:
+        with _lock:
+            self.values[_label_key(labels)] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels({**_base_labels, **dict(key)})} {value}")
+        return lines
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.values = {}
+        _metrics.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with _lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.values.items()):
+            labels = {**_base_labels, **dict(key)}
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+PRODUCTS = Counter("scraper_products_total", "Products scraped")
+KEYWORDS_DONE = Counter("scraper_keywords_done_total", "Keywords fully processed")
+PHASE_SECONDS = Histogram("scraper_phase_duration_seconds", "Time spent per pipeline phase")
+RETRIES = Counter("scraper_retries_total", "Retried requests or page loads")
+FIELDS_MISSING = Counter("scraper_fields_missing_total", "Product fields that could not be extracted")
+EMPTY_RESULTS = Counter("scraper_empty_results_total", "Searches whose result grid came back empty")
+DRIVER_RESTARTS = Counter("scraper_driver_restarts_total", "Browser driver restarts")
+PRODUCTS_PER_MINUTE = Gauge("scraper_products_per_minute", f"Products per minute over the last {THROUGHPUT_WINDOW_SECONDS}s")
+SELECTOR_LOOKUPS = Counter("scraper_selector_lookups_total", "Fallback selector chain lookups by result (hit = learned selector matched first)")
+SELECTOR_ROUND_TRIPS = Counter("scraper_selector_round_trips_total", "find_elements calls made by fallback selector chains")
+UPTIME = Gauge("scraper_uptime_seconds", "Seconds since the worker started")
+
+_start_time = time.time()
+
+
+def render() -> str:
+    """Current metrics in Prometheus text exposition format"""
+    now = time.time()
+    with _lock:
+        while _product_times and _product_times[0] < now - THROUGHPUT_WINDOW_SECONDS:
+            _product_times.popleft()
+        window = min(THROUGHPUT_WINDOW_SECONDS, max(now - _start_time, 1))
+        recent_products = len(_product_times)
+    PRODUCTS_PER_MINUTE.set(round(recent_products * 60 / window, 3))
+    UPTIME.set(round(now - _start_time, 1))
+
+    with _lock:
+        lines = []
+        for metric in _metrics:
+            lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def record_product(product_data: Dict) -> None:
+    """Count a scraped product and every field it is missing"""
+    PRODUCTS.inc()
+    with _lock:
+        _product_times.append(time.time())
+    for field, value in product_data.items():
+        if value == "Not found" or (field in ("product_image_urls", "product_sizes_available") and not value):
+            FIELDS_MISSING.inc(field=field)
+
+
+def keyword_done() -> None:
+    KEYWORDS_DONE.inc()
+
+
+def record_retry(reason: str = "error") -> None:
+    RETRIES.inc(reason=str(reason))
+
+
+def record_empty_results() -> None:
+    EMPTY_RESULTS.inc()
+
+
+def record_driver_restart(reason: str = "error") -> None:
+    DRIVER_RESTARTS.inc(reason=str(reason))
+    tracing.instant("driver_restart", reason=reason)
+
+
+def record_selector_lookup(page_type: str, result: str, round_trips: int = 1) -> None:
+    SELECTOR_LOOKUPS.inc(page_type=page_type, result=result)
+    SELECTOR_ROUND_TRIPS.inc(round_trips, page_type=page_type)
+
+
+def observe_phase(phase: str, started_at: float) -> float:
+    """Record the time since started_at (a time.time() value) against a pipeline phase"""
+    ended_at = time.time()
+    elapsed = ended_at - started_at
+    PHASE_SECONDS.observe(elapsed, phase=phase)
+    tracing.add_span(phase, started_at, ended_at, category="phase")
+    return elapsed
+
+
+@contextmanager
+def time_phase(phase: str):
+    """Context manager form of observe_phase"""
+    started_at = time.time()
+    try:
+        yield
+    finally:
+        observe_phase(phase, started_at)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_metrics_file(filepath: str) -> None:
+    """Atomically replace filepath with the current metrics"""
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(render())
+    os.replace(temp_path, filepath)
+
+
+def _file_writer_loop(filepath: str, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            write_metrics_file(filepath)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics file {filepath}: {e}")
+
+
+def start_metrics(site: str, worker: str = None) -> None:
+    """Label this process's metrics and start whichever exporters the environment asks for"""
+    global _started
+    _base_labels["site"] = site
+    tracing.start_tracing(site)
+    _base_labels["worker"] = worker or os.environ.get("SCRAPER_WORKER_ID") or _base_labels["worker"]
+    if _started:
+        return
+    _started = True
+
+    port = os.environ.get("SCRAPER_METRICS_PORT")
+    if port:
+        try:
+            start_http_server(int(port))
+            print(f"📈 Metrics available at http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            print(f"⚠️ Could not start metrics endpoint on port {port}: {e}")
+
+    filepath = os.environ.get("SCRAPER_METRICS_FILE")
+    if filepath:
+        interval = float(os.environ.get("SCRAPER_METRICS_INTERVAL", FILE_WRITE_INTERVAL))
+        threading.Thread(target=_file_writer_loop, args=(filepath, interval), daemon=True).start()
+        atexit.register(write_metrics_file, filepath)
+
+
+def parse_metrics_text(text: str) -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+    """Parse Prometheus text into {(metric_name, sorted_labels): value}"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name_part, _, value = line.rpartition(' ')
+        labels = {}
+        if '{' in name_part:
+            name, _, label_text = name_part.partition('{')
+            for pair in label_text.rstrip('}').split('",'):
+                if '=' in pair:
+                    key, _, label_value = pair.partition('=')
+                    labels[key] = label_value.strip('"')
+        else:
+            name = name_part
+        samples[(name, _label_key(labels))] = float(value)
+    return samples
+
+
+def summarize_metrics_files(directory: str) -> None:
+    """Print throughput and phase latency per site and worker from metrics files"""
+    files = sorted(glob.glob(os.path.join(directory, '*.prom')))
+    if not files:
+        print(f"No metrics files found in {directory}")
+        return
+
+    print(f"{'site':<10} {'worker':<28} {'products':>9} {'/min':>7} {'keywords':>9} {'retries':>8} {'restarts':>9}")
+    phase_lines = []
+    limit_lines = []
+    for filepath in files:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            samples = parse_metrics_text(f.read())
+
+        # parallel_scraper's own file holds the concurrency controller, not a worker
+        limits = {dict(labels).get("site"): value for (name, labels), value in samples.items()
+                  if name == "scraper_concurrency_limit"}
+        if limits:
+            for site, limit in sorted(limits.items()):
+                decisions = ", ".join(
+                    f"{dict(labels)['decision']}/{dict(labels)['reason']} {int(value)}"
+                    for (name, labels), value in sorted(samples.items())
+                    if name == "scraper_concurrency_decisions_total" and dict(labels).get("site") == site
+                )
+                limit_lines.append(f"  {site:<10} limit {int(limit):>3}  ({decisions})")
+            continue
+
+        def total(metric_name):
+            return sum(value for (name, _), value in samples.items() if name == metric_name)
+
+        site = worker = "?"
+        phases = {}
+        for (name, labels), value in samples.items():
+            label_dict = dict(labels)
+            site = label_dict.get("site", site)
+            worker = label_dict.get("worker", worker)
+            if name in ("scraper_phase_duration_seconds_sum", "scraper_phase_duration_seconds_count"):
+                entry = phases.setdefault(label_dict.get("phase"), [0.0, 0])
+                entry[0 if name.endswith("_sum") else 1] += value
+
+        print(f"{site:<10} {worker[:28]:<28} {int(total('scraper_products_total')):>9} "
+              f"{total('scraper_products_per_minute'):>7.2f} {int(total('scraper_keywords_done_total')):>9} "
+              f"{int(total('scraper_retries_total')):>8} {int(total('scraper_driver_restarts_total')):>9}")
+        for phase, (phase_sum, phase_count) in sorted(phases.items()):
+            if phase_count:
+                phase_lines.append(f"  {site:<10} {phase:<12} avg {phase_sum / phase_count:6.2f}s over {int(phase_count)}")
+
+    if phase_lines:
+        print("\nPhase latency:")
+        print('\n'.join(phase_lines))
+    if limit_lines:
+        print("\nConcurrency limits:")
+        print('\n'.join(limit_lines))
+
+
+if __name__ == "__main__":
+    summarize_metrics_files(sys.argv[1] if len(sys.argv) > 1 else "metrics")
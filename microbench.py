@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the Pure-Python Hot Paths
+Generates synthetic unified-schema datasets (10k to 5M rows) and times the code that
+runs over large data: Zara image URL filtering, duplicate keys and merge_json_files,
+the XLSX converter and the utils helpers. Results can be stored as a baseline and later
+runs are flagged when a benchmark gets slower than the baseline allows.
+
+merged_data.json holds ~2.4k rows today, so the 250k size is roughly 100x that.
+
+Usage:
+    python microbench.py                                  # 10k and 100k rows
+    python microbench.py --sizes 10000 250000 1000000 --save-baseline
+    python microbench.py --sizes 5000000 --only create_duplicate_key zara_image_filter
+    python microbench.py --threshold 0.25                 # fail on >25% slowdowns
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from utils import write_json_array, iter_json_array, filter_data, sort_data, get_unique_values, count_by_field, filter_keywords
+
+DATA_DIR = "bench_data"
+BASELINE_FILE = "microbench_baseline.json"
+DEFAULT_SIZES = [10_000, 100_000]
+ALL_SIZES = [10_000, 100_000, 250_000, 1_000_000, 5_000_000]
+EXCEL_MAX_ROWS = 1_048_575  # one row is taken by the header
+CHUNK_SIZE = 50_000
+REGRESSION_THRESHOLD = 0.20
+
+SITES = ["nykaa_fashion", "myntra", "zara"]
+SIZE_SETS = [["XS", "S", "M", "L", "XL"], ["S", "M", "L"], ["28", "30", "32", "34", "36"], ["Free Size"]]
+ZARA_IMAGE_VIEWS = ["p", "a1", "a2", "e1", "e2"]
+
+
+def make_record(index: int):
+    """Deterministic unified record; every 20th one repeats an earlier product URL"""
+    product_number = index - 6 if index % 20 == 19 else index
+    site = SITES[product_number % len(SITES)]
+    product_id = f"{10_000_000 + product_number}"
+    if site == "zara":
+        images = [f"https://static.zara.net/assets/public/{product_number % 9973:04x}/{product_number % 65521:04x}/"
+                  f"{product_number:011d}-{view}.jpg?ts=1718000000000&w={{width}}" for view in ZARA_IMAGE_VIEWS]
+        images.append("https://static.zara.net/stdstatic/6.4.0/images/transparent-background.png")
+        product_url = f"https://www.zara.com/in/en/product-p{product_id}.html?v1={product_id}"
+    else:
+        images = [f"https://assets.example-cdn.com/{site}/{product_id}_{n}.jpg?tr=w-128" for n in range(1, 6)]
+        product_url = f"https://www.{site}.com/product/p/{product_id}"
+    price = 499 + (index * 37) % 4500
+    return {
+        "site": site,
+        "product_url": product_url,
+        "keyword_id": str(1 + index % 525),
+        "keyword": f"keyword {index % 525}",
+        "product_id": product_id,
+        "brand_name": f"Brand {index % 311}",
+        "product_name": f"Women Printed Cotton Straight Kurta {product_number}",
+        "product_rating": f"{3 + (index % 20) / 10:.1f}",
+        "product_rating_count": str(index % 4000),
+        "current_product_price": f"₹{price:,}",
+        "original_product_price": f"₹{price * 2:,}",
+        "product_color": "Ecru" if site == "zara" else "Not applicable",
+        "product_description": "Straight kurta in printed cotton with a round neck and three-quarter sleeves. " * 2,
+        "product_sizes_available": SIZE_SETS[index % len(SIZE_SETS)],
+        "product_sizes_coming_soon": ["XL"] if index % 9 == 0 else [],
+        "product_sizes_out_of_stock": ["XS"] if index % 7 == 0 else [],
+        "product_image_urls": images,
+        "additional_information": "100% cotton" if site == "zara" else "Not applicable",
+    }
+
+
+def iter_records(start: int, stop: int):
+    for index in range(start, stop):
+        yield make_record(index)
+
+
+def iter_chunks(rows: int, chunk_size: int = CHUNK_SIZE):
+    for start in range(0, rows, chunk_size):
+        yield [make_record(index) for index in range(start, min(start + chunk_size, rows))]
+
+
+def dataset_files(rows: int):
+    """Two overlapping halves of a dataset on disk (10% of rows appear in both), generated once"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    split_a, split_b = int(rows * 0.55), int(rows * 0.45)
+    files = [os.path.join(DATA_DIR, f"rows_{rows}_a.json"), os.path.join(DATA_DIR, f"rows_{rows}_b.json")]
+    ranges = [(0, split_a), (split_b, rows)]
+    for filepath, (start, stop) in zip(files, ranges):
+        if not os.path.exists(filepath):
+            print(f"   generating {filepath}...")
+            write_json_array(iter_records(start, stop), filepath)
+    return files
+
+
+def available_memory_bytes():
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def estimate_record_bytes(sample: int = 2000) -> int:
+    """Python heap bytes per loaded record (json.load builds a fresh object per record)"""
+    text = json.dumps([make_record(index) for index in range(sample)])
+    tracemalloc.start()
+    records = json.loads(text)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return used // sample
+
+
+# ---------------------------------------------------------------- benchmarks
+# Each takes the row count and returns the seconds spent in the code under test.
+
+def bench_zara_image_filter(rows):
+    from zara_images import unique_product_images
+    elapsed = 0.0
+    for chunk in iter_chunks(rows):
+        urls = [url for record in chunk for url in record["product_image_urls"]]
+        started = time.perf_counter()
+        unique_product_images(urls)
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def bench_zara_json_state(rows):
+    from page_source import extract_embedded_json
+    filler = '<div class="product-grid-product"><img src="/placeholder.png" alt=""></div>' * 400
+    elapsed = 0.0
+    for chunk in iter_chunks(rows):
+        pages = [f'<html><body>{filler}<script>window.__INITIAL_STATE__ = {json.dumps({"product": record})};</script>'
+                 f'{filler}</body></html>' for record in chunk]
+        started = time.perf_counter()
+        for html in pages:
+            extract_embedded_json(html)
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def bench_create_duplicate_key(rows):
+    from merge_json_files import create_duplicate_key
+    elapsed = 0.0
+    seen = set()
+    for chunk in iter_chunks(rows):
+        started = time.perf_counter()
+        for record in chunk:
+            seen.add(create_duplicate_key(record))
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def bench_merge_json_files(rows):
+    from merge_json_files import merge_json_files
+    files = dataset_files(rows)
+    output_file = os.path.join(DATA_DIR, f"merged_{rows}.json")
+    started = time.perf_counter()
+    merge_json_files(files, output_file, verbose=False)
+    elapsed = time.perf_counter() - started
+    os.remove(output_file)
+    return elapsed
+
+
+def bench_process_array_fields(rows):
+    from json_to_xlsx_converter import process_array_fields
+    elapsed = 0.0
+    for chunk in iter_chunks(rows):
+        started = time.perf_counter()
+        for record in chunk:
+            process_array_fields(record)
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def bench_convert_json_to_xlsx(rows):
+    from json_to_xlsx_converter import convert_json_to_xlsx
+    rows = min(rows, EXCEL_MAX_ROWS)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    input_file = os.path.join(DATA_DIR, f"xlsx_input_{rows}.json")
+    if not os.path.exists(input_file):
+        write_json_array(iter_records(0, rows), input_file)
+    output_file = os.path.join(DATA_DIR, f"xlsx_output_{rows}.xlsx")
+    started = time.perf_counter()
+    convert_json_to_xlsx(input_file, output_file)
+    elapsed = time.perf_counter() - started
+    os.remove(output_file)
+    return elapsed
+
+
+def bench_write_json_array(rows):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    output_file = os.path.join(DATA_DIR, f"write_{rows}.json")
+    started = time.perf_counter()
+    write_json_array(iter_records(0, rows), output_file)
+    elapsed = time.perf_counter() - started
+    os.remove(output_file)
+    return elapsed
+
+
+def bench_iter_json_array(rows):
+    filepath = dataset_files(rows)[0]
+    started = time.perf_counter()
+    for _ in iter_json_array(filepath):
+        pass
+    return time.perf_counter() - started
+
+
+def bench_utils_filter_sort_count(rows):
+    records = list(iter_records(0, rows))
+    started = time.perf_counter()
+    filter_data(records, site="zara")
+    sort_data(records, "product_rating_count")
+    get_unique_values(records, "brand_name")
+    count_by_field(records, "keyword_id")
+    return time.perf_counter() - started
+
+
+def bench_filter_keywords(rows):
+    keywords = [{"id": str(index), "keyword": f"keyword {index}"} for index in range(rows)]
+    started = time.perf_counter()
+    filter_keywords(keywords, rows // 4, rows // 2)
+    return time.perf_counter() - started
+
+
+# name -> (function, needs every record in memory at once)
+BENCHMARKS = {
+    "zara_image_filter": (bench_zara_image_filter, False),
+    "zara_json_state": (bench_zara_json_state, False),
+    "create_duplicate_key": (bench_create_duplicate_key, False),
+    "merge_json_files": (bench_merge_json_files, True),
+    "process_array_fields": (bench_process_array_fields, False),
+    "convert_json_to_xlsx": (bench_convert_json_to_xlsx, True),
+    "write_json_array": (bench_write_json_array, False),
+    "iter_json_array": (bench_iter_json_array, False),
+    "utils_filter_sort_count": (bench_utils_filter_sort_count, True),
+    "filter_keywords": (bench_filter_keywords, False),
+}
+
+
+def run_benchmark(name, rows, repeat):
+    function, _ = BENCHMARKS[name]
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        timings.append(function(rows))
+    return min(timings)
+
+
+def load_baseline(filepath):
+    if not os.path.exists(filepath):
+        return {}
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f).get("results", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pure-Python data paths on synthetic datasets')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help=f'Row counts (e.g. {" ".join(map(str, ALL_SIZES))})')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='Run only these benchmarks')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark below 1M rows (best is kept)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help=f'Baseline file (default: {BASELINE_FILE})')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='Allowed slowdown vs baseline (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    baseline = load_baseline(args.baseline)
+    record_bytes = estimate_record_bytes()
+    memory = available_memory_bytes()
+    print(f"🧮 ~{record_bytes} bytes per loaded record; {memory / 2**30:.1f} GiB available" if memory else
+          f"🧮 ~{record_bytes} bytes per loaded record")
+
+    results = {}
+    regressions = []
+    print(f"\n{'benchmark':<26} {'rows':>10} {'seconds':>9} {'rows/s':>12} {'baseline':>9} {'change':>8}")
+    print("-" * 80)
+    for rows in args.sizes:
+        for name in names:
+            _, in_memory = BENCHMARKS[name]
+            # merge_json_files holds both inputs plus its output list; leave headroom for that
+            if in_memory and memory and rows * record_bytes * 3 > memory:
+                print(f"{name:<26} {rows:>10}  skipped: needs ~{rows * record_bytes * 3 / 2**30:.1f} GiB")
+                continue
+            try:
+                seconds = run_benchmark(name, rows, args.repeat if rows < 1_000_000 else 1)
+            except ImportError as e:
+                print(f"{name:<26} {rows:>10}  skipped: {e}")
+                continue
+
+            key = f"{name}@{rows}"
+            results[key] = round(seconds, 4)
+            previous = baseline.get(key)
+            change = ""
+            if previous:
+                ratio = (seconds - previous) / previous
+                change = f"{ratio * 100:+.1f}%"
+                if ratio > args.threshold:
+                    regressions.append((key, previous, seconds))
+                    change += " ⚠️"
+            print(f"{name:<26} {rows:>10} {seconds:>9.3f} {rows / seconds if seconds else 0:>12,.0f} "
+                  f"{previous if previous else '-':>9} {change:>8}")
+            sys.stdout.flush()
+
+    if args.save_baseline:
+        merged = {**baseline, **results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+                "saved_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "results": dict(sorted(merged.items())),
+            }, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%:")
+        for key, previous, seconds in regressions:
+            print(f"   {key}: {previous:.3f}s -> {seconds:.3f}s")
+        sys.exit(1)
+    print("\n✅ No regressions against the baseline" if baseline else "\nℹ️ No baseline to compare against (use --save-baseline)")
+
+
+if __name__ == "__main__":
+    main()
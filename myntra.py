@@ -1,48 +1,57 @@
 #!/usr/bin/env python3
 """
 Myntra Search Script
-Navigates to Myntra.com, searches for keywords from zara_keywords.json, waits 10 seconds between searches
+Navigates to Myntra.com, searches for keywords from keywords.json, waits 10 seconds between searches
 """
 
 import time
 import json
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+from utils import filter_keywords, get_output_file, get_base_url
+from site_registry import get_site
+import heartbeat
+import metrics
+import snapshot_recorder
+from image_harvest import harvest_images
+from browser_setup import create_driver
+from driver_lifecycle import DriverLifecycle, is_session_error, retire_driver
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
 
 def main():
     # Load keywords from JSON file
     try:
         with open('keywords.json', 'r') as f:
             keywords_data = json.load(f)
-        print(f"Loaded {len(keywords_data)} keywords from keywords.json")
+        logger.info("Loaded %s keywords from keywords.json", len(keywords_data))
     except Exception as e:
-        print(f"Error loading keywords file: {e}")
+        logger.error("Error loading keywords file: %s", e)
         return
     
-    start_id = 421
-    end_id = 525
+    start_id, end_id = get_site("myntra")["keyword_range"]
     
-    filtered_keywords = []
-    for keyword_obj in keywords_data:
-        keyword_id = int(keyword_obj["id"])
-        if start_id <= keyword_id <= end_id:
-            filtered_keywords.append(keyword_obj)
+    filtered_keywords = filter_keywords(keywords_data, start_id, end_id)
     
-    print(f"Scraping keywords with IDs {start_id} to {end_id}")
-    print(f"Total keywords to scrape: {len(filtered_keywords)}")
+    logger.info("Scraping keywords with IDs %s to %s", start_id, end_id)
+    logger.info("Total keywords to scrape: %s", len(filtered_keywords))
     
     if not filtered_keywords:
-        print(f"No keywords found in range {start_id}-{end_id}")
+        logger.warning("No keywords found in range %s-%s", start_id, end_id)
         return
     
-    all_scraped_data = []
+    metrics.start_metrics("myntra")
+    # A watchdog restart resumes after the keywords the checkpoint already covers
+    all_scraped_data, done_keyword_ids = heartbeat.load_checkpoint()
+    if done_keyword_ids:
+        logger.info("⏩ Resuming from checkpoint: %s keywords and %s products already done", len(done_keyword_ids), len(all_scraped_data))
+    output_file = get_output_file('myntra_scraped_data.json')
+    base_url = get_base_url("https://www.myntra.com/")
     
     chrome_options = Options()
     chrome_options.add_argument("--no-sandbox")
@@ -67,287 +76,311 @@ def main():
     chrome_options.add_argument("--force-device-scale-factor=1")
     chrome_options.add_argument("--disable-features=TranslateUI")
     
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    except Exception as e:
-        print(f"Error initializing Chrome driver: {e}")
-        print("Trying alternative Chrome path...")
-        chrome_options.binary_location = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+    def start_browser():
+        driver = create_driver(chrome_options, "myntra")
+        try:
+            logger.debug("Navigating to Myntra.com...")
+            driver.get(base_url)
+            
+            logger.debug("Waiting for page to load...")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "desktop-searchBar")))
+            logger.info("✅ Page loaded successfully - search bar found")
+        except TimeoutException:
+            logger.error("❌ Page load timeout - search bar not found within 10 seconds")
+            retire_driver(driver, healthy=False)
+            raise
+        except Exception:
+            retire_driver(driver, healthy=False)
+            raise
+        return driver
     
-    try:
+    def scrape_keyword(i, keyword_obj):
+        """Products for one keyword; a lost browser session propagates so the keyword is retried"""
+        products = []
+        driver = lifecycle.driver
         wait = WebDriverWait(driver, 10)
+        keyword_id = keyword_obj["id"]
+        keyword = keyword_obj["keyword"]
+        logger.info("Searching for keyword %s/%s: '%s' (ID: %s)", i+1, len(filtered_keywords), keyword, keyword_id)
+        search_started = time.time()
+        heartbeat.beat("search", keyword_id=keyword_id, keyword=keyword)
         
-        print("Navigating to Myntra.com...")
-        driver.get("https://www.myntra.com/")
-        
-        print("Waiting for page to load...")
         try:
-            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "desktop-searchBar")))
-            print("✅ Page loaded successfully - search bar found")
-        except TimeoutException:
-            print("❌ Page load timeout - search bar not found within 10 seconds")
-            return
-        
-        for i, keyword_obj in enumerate(filtered_keywords):
-            keyword_id = keyword_obj["id"]
-            keyword = keyword_obj["keyword"]
-            print(f"\nSearching for keyword {i+1}/{len(filtered_keywords)}: '{keyword}' (ID: {keyword_id})")
+            logger.debug("Looking for search bar for keyword: '%s'", keyword)
+            search_input = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "desktop-searchBar")))
+            
+            search_input.clear()
+            
+            search_input.send_keys(keyword)
+            logger.debug("Typed: %s", keyword)
             
+            search_input.send_keys(Keys.RETURN)
+            logger.debug("Pressed Enter")
+            
+            logger.debug("Waiting for search results to load...")
             try:
-                print(f"Looking for search bar for keyword: '{keyword}'")
-                search_input = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "desktop-searchBar")))
-                
-                search_input.clear()
-                
-                search_input.send_keys(keyword)
-                print(f"Typed: {keyword}")
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "li.product-base")))
+                logger.info("✅ Search results loaded successfully")
+            except TimeoutException:
+                logger.warning("⚠️ Search results may not have loaded properly, but continuing...")
                 
-                search_input.send_keys(Keys.RETURN)
-                print("Pressed Enter")
-                
-                print("Waiting for search results to load...")
-                try:
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "li.product-base")))
-                    print("✅ Search results loaded successfully")
-                except TimeoutException:
-                    print("⚠️ Search results may not have loaded properly, but continuing...")
-                    
+            try:
+              gender_category = driver.find_elements(By.CSS_SELECTOR, "label.gender-label")
+              for gender_category in gender_category:
+                if gender_category.text == "Women":
+                  gender_category.click()
+                  logger.debug("Clicked on women category")
+                  break
+              else:
+                logger.debug("Gender category not found")
+            except Exception as e:
+                if is_session_error(e):
+                    raise
+                logger.warning("Error clicking on gender category: %s", e)
+                return products
+
+            time.sleep(3)
+            lifecycle.page_served()
+            metrics.observe_phase("search", search_started)
+            snapshot_recorder.capture(driver, "myntra", "search", keyword_id=keyword_id, keyword=keyword)
+            
+            logger.debug("Looking for product links...")
+            product_elements = driver.find_elements(By.CSS_SELECTOR, "li.product-base")
+            logger.info("Found %s product elements", len(product_elements))
+            if not product_elements:
+                metrics.record_empty_results()
+            
+            # Collected up front so a browser recycle between products keeps our place
+            product_urls = []
+            for product_element in product_elements[:10]:
                 try:
-                  gender_category = driver.find_elements(By.CSS_SELECTOR, "label.gender-label")
-                  for gender_category in gender_category:
-                    if gender_category.text == "Women":
-                      gender_category.click()
-                      print("Clicked on women category")
-                      break
-                  else:
-                    print("Gender category not found")
+                    product_urls.append(product_element.find_element(By.CSS_SELECTOR, "a").get_attribute("href"))
                 except Exception as e:
-                    print(f"Error clicking on gender category: {e}")
-                    continue
+                    if is_session_error(e):
+                        raise
+                    logger.debug("Product link not found: %s", e)
+            
+            products_to_visit = len(product_urls)
+            logger.info("Visiting first %s product pages...", products_to_visit)
+            
+            for j, product_url in enumerate(product_urls):
+                try:
+                    lifecycle.maybe_recycle()
+                    driver = lifecycle.driver
+                    logger.debug("Visiting product %s/%s", j+1, products_to_visit)
+                    logger.debug("Product URL: %s", product_url)
+                    
+                    pdp_started = time.time()
+                    heartbeat.beat("pdp_load", product=product_url)
+                    driver.get(product_url)
+                    
+                    logger.debug("Waiting for product page to load...")
 
-                time.sleep(3)
-                
-                print("Looking for product links...")
-                product_elements = driver.find_elements(By.CSS_SELECTOR, "li.product-base")
-                print(f"Found {len(product_elements)} product elements")
-                
-                products_to_visit = min(10, len(product_elements))
-                print(f"Visiting first {products_to_visit} product pages...")
-                
-                for j in range(products_to_visit):
+
+                    time.sleep(3)
+                    lifecycle.page_served()
+                    metrics.observe_phase("pdp_load", pdp_started)
+                    extraction_started = time.time()
+                    heartbeat.beat("extraction")
+                    
+                    product_data = {
+                        "site": "myntra",
+                        "product_url": product_url,
+                        "keyword_id": keyword_id,
+                        "keyword": keyword,
+                        "product_id": "Not found",
+                        "brand_name": "Not found",
+                        "product_name": "Not found",
+                        "product_rating": "Not found",
+                        "product_rating_count": "Not found",
+                        "current_product_price": "Not found",
+                        "original_product_price": "Not found",
+                        "product_color": "Not applicable",
+                        "product_description": "Not found",
+                        "product_sizes_available": [],
+                        "product_sizes_coming_soon": [],
+                        "product_sizes_out_of_stock": [],
+                        "product_image_urls": [],
+                        "additional_information": "Not applicable"
+                    }
+
+                    
                     try:
-                        print(f"\nVisiting product {j+1}/{products_to_visit}")
-                        
-                        product_elements = driver.find_elements(By.CSS_SELECTOR, "li.product-base")
-                        
-                        if j >= len(product_elements):
-                            print(f"No more product elements available (tried to access index {j})")
-                            break
-                        
-                        product_element = product_elements[j]
-                        product_link = product_element.find_element(By.CSS_SELECTOR, "a")
-                        product_url = product_link.get_attribute("href")
-                        print(f"Product URL: {product_url}")
-                        
-                        original_window = driver.current_window_handle
-                        
-                        
-                        driver.execute_script("arguments[0].setAttribute('target', '_self');", product_link)
-                        product_link.click()
-                        print("Clicked on product link")
-                        
-                        
-                        print("Waiting for product page to load...")
+                        current_url = driver.current_url
+                        import re
+                        product_id_match = re.search(r'/p/(\d+)', current_url)
+                        if product_id_match:
+                            product_data["product_id"] = product_id_match.group(1)
+                            logger.debug("Product ID: %s", product_data['product_id'])
+                    except Exception as e:
+                        logger.debug("Product ID not found: %s", e)
 
+                    
+                    try:
+                        product_title = driver.find_element(By.CLASS_NAME, "pdp-title").text
+                        product_data["brand_name"] = product_title
+                        logger.debug("Product title: %s", product_title)
+                    except Exception as e:
+                        logger.debug("Product title not found: %s", e)
 
-                        time.sleep(3)
+                    
+                    try:
+                        product_name = driver.find_element(By.CLASS_NAME, "pdp-name").text
+                        product_data["product_name"] = product_name
+                        logger.debug("Product name: %s", product_name)
+                    except Exception as e:
+                        logger.debug("Product name not found: %s", e)
 
-                        
-                        product_data = {
-                            "site": "myntra",
-                            "product_url": product_url,
-                            "keyword_id": keyword_id,
-                            "keyword": keyword,
-                            "product_id": "Not found",
-                            "brand_name": "Not found",
-                            "product_name": "Not found",
-                            "product_rating": "Not found",
-                            "product_rating_count": "Not found",
-                            "current_product_price": "Not found",
-                            "original_product_price": "Not found",
-                            "product_color": "Not applicable",
-                            "product_description": "Not found",
-                            "product_sizes_available": [],
-                            "product_sizes_coming_soon": [],
-                            "product_sizes_out_of_stock": [],
-                            "product_image_urls": [],
-                            "additional_information": "Not applicable"
-                        }
+                    
+                    try:
+                        product_current_price = driver.find_element(By.CLASS_NAME, "pdp-price").text
+                        product_data["current_product_price"] = product_current_price
+                        logger.debug("Product price: %s", product_current_price)
+                    except Exception as e:
+                        logger.debug("Product price not found: %s", e)
 
-                        
-                        try:
-                            current_url = driver.current_url
-                            import re
-                            product_id_match = re.search(r'/p/(\d+)', current_url)
-                            if product_id_match:
-                                product_data["product_id"] = product_id_match.group(1)
-                                print(f"Product ID: {product_data['product_id']}")
-                        except Exception as e:
-                            print(f"Product ID not found: {e}")
+                    
+                    try:
+                        product_original_price = driver.find_element(By.CSS_SELECTOR, "span.pdp-mrp>s").text
+                        product_data["original_product_price"] = product_original_price
+                        logger.debug("Product original price: %s", product_original_price)
+                    except Exception as e:
+                        logger.debug("Product original price not found: %s", e)
 
-                        
-                        try:
-                            product_title = driver.find_element(By.CLASS_NAME, "pdp-title").text
-                            product_data["brand_name"] = product_title
-                            print(f"Product title: {product_title}")
-                        except Exception as e:
-                            print(f"Product title not found: {e}")
+                    
+                    try:
+                        product_description = driver.find_element(By.CLASS_NAME, "pdp-product-description-content").text
+                        product_data["product_description"] = product_description
+                        logger.debug("Product description: %s", product_description)
+                    except Exception as e:
+                        logger.debug("Product description not found: %s", e)
 
-                        
-                        try:
-                            product_name = driver.find_element(By.CLASS_NAME, "pdp-name").text
-                            product_data["product_name"] = product_name
-                            print(f"Product name: {product_name}")
-                        except Exception as e:
-                            print(f"Product name not found: {e}")
 
+                    try:
+                        rating_container = driver.find_element(By.CSS_SELECTOR, "div.index-overallRating")
                         
-                        try:
-                            product_current_price = driver.find_element(By.CLASS_NAME, "pdp-price").text
-                            product_data["current_product_price"] = product_current_price
-                            print(f"Product price: {product_current_price}")
-                        except Exception as e:
-                            print(f"Product price not found: {e}")
-
+                        rating_text = rating_container.find_element(By.CSS_SELECTOR, "div").text
+                        product_data["product_rating"] = rating_text
+                        logger.debug("Product rating: %s", product_data['product_rating'])
                         
-                        try:
-                            product_original_price = driver.find_element(By.CSS_SELECTOR, "span.pdp-mrp>s").text
-                            product_data["original_product_price"] = product_original_price
-                            print(f"Product original price: {product_original_price}")
-                        except Exception as e:
-                            print(f"Product original price not found: {e}")
-
+                        ratings_count_element = rating_container.find_element(By.CSS_SELECTOR, "div.index-ratingsCount")
+                        ratings_text = ratings_count_element.text
+                        import re
+                        ratings_match = re.search(r'(\d+)', ratings_text)
+                        if ratings_match:
+                            product_data["product_rating_count"] = ratings_match.group(1)
+                            logger.debug("Total ratings: %s", product_data['product_rating_count'])
                         
-                        try:
-                            product_description = driver.find_element(By.CLASS_NAME, "pdp-product-description-content").text
-                            product_data["product_description"] = product_description
-                            print(f"Product description: {product_description}")
-                        except Exception as e:
-                            print(f"Product description not found: {e}")
-
-
-                        try:
-                            rating_container = driver.find_element(By.CSS_SELECTOR, "div.index-overallRating")
-                            
-                            rating_text = rating_container.find_element(By.CSS_SELECTOR, "div").text
-                            product_data["product_rating"] = rating_text
-                            print(f"Product rating: {product_data['product_rating']}")
-                            
-                            ratings_count_element = rating_container.find_element(By.CSS_SELECTOR, "div.index-ratingsCount")
-                            ratings_text = ratings_count_element.text
-                            import re
-                            ratings_match = re.search(r'(\d+)', ratings_text)
-                            if ratings_match:
-                                product_data["product_rating_count"] = ratings_match.group(1)
-                                print(f"Total ratings: {product_data['product_rating_count']}")
-                            
-                        except Exception as e:
-                            print(f"Error extracting rating/ratings count: {e}")
-
-                        try:
-                            product_sizes_available = driver.find_elements(By.CSS_SELECTOR, "p.size-buttons-unified-size")
-                            product_data["product_sizes_available"] = []
-                            for size_element in product_sizes_available:
-                                if size_element.text:
-                                    size_text = size_element.text
-                                    product_data["product_sizes_available"].append(size_text)
-                            print(f"Product sizes available: {product_data['product_sizes_available']}")
-                        except Exception as e:
-                            print(f"Error extracting product sizes available: {e}")
+                    except Exception as e:
+                        logger.debug("Error extracting rating/ratings count: %s", e)
 
-                        try:
-                            try:
-                                image_container = driver.find_element(By.CSS_SELECTOR, ".image-grid-container")
-                                driver.execute_script("arguments[0].scrollIntoView(true);", image_container)
-                                print("Scrolled to image container")
-                                time.sleep(2)
-                            except:
-                                print("Image container not found, continuing...")
-                            
-                            image_divs = driver.find_elements(By.CSS_SELECTOR, "div.image-grid-col50>div.image-grid-imageContainer>div.image-grid-image")
-                            print(f"Found {len(image_divs)} image-grid-image divs")
-                            
-                            for img_div in image_divs:
-                                style_attr = img_div.get_attribute("style")
-                                if style_attr and "background-image" in style_attr:
-                                    import re
-                                    url_match = re.search(r'url\(["\']?([^"\']+)["\']?\)', style_attr)
-                                    if url_match:
-                                        image_url = url_match.group(1)
-                                        product_data["product_image_urls"].append(image_url)
-                                        print(f"Extracted image URL: {image_url}")
-                            
-                            print(f"Total product images found: {len(product_data['product_image_urls'])}")
-                            print(f"Product images: {product_data['product_image_urls']}")
-                            
-                        except Exception as e:
-                            print(f"Error extracting product images: {e}")
+                    try:
+                        product_sizes_available = driver.find_elements(By.CSS_SELECTOR, "p.size-buttons-unified-size")
+                        product_data["product_sizes_available"] = []
+                        for size_element in product_sizes_available:
+                            if size_element.text:
+                                size_text = size_element.text
+                                product_data["product_sizes_available"].append(size_text)
+                        logger.debug("Product sizes available: %s", product_data['product_sizes_available'])
+                    except Exception as e:
+                        logger.debug("Error extracting product sizes available: %s", e)
+                    metrics.observe_phase("extraction", extraction_started)
 
-                        all_scraped_data.append(product_data)
-                        print(f"Added product data for: {product_data['product_name']}")
+                    images_started = time.time()
+                    heartbeat.beat("images")
+                    try:
+                        # Payload/attribute read in one call, so no scrolling the grid into view
+                        product_data["product_image_urls"] = harvest_images(driver, "myntra")
                         
-                        print("Going back to search results...")
-                        driver.back()
-                        time.sleep(2)
+                        logger.debug("Total product images found: %s", len(product_data['product_image_urls']))
+                        logger.debug("Product images: %s", product_data['product_image_urls'])
                         
                     except Exception as e:
-                        print(f"Error visiting product {j+1}: {e}")
-                        continue
-                
-                print(f"Completed visiting {products_to_visit} product pages for keyword: '{keyword}'")
-                
-                print(f"Completed search for keyword: '{keyword}'")
-                
-            except TimeoutException as e:
-                print(f"Timeout error searching for keyword '{keyword}': {e}")
-                continue
-            except Exception as e:
-                print(f"Error searching for keyword '{keyword}': {e}")
+                        logger.debug("Error extracting product images: %s", e)
+                    metrics.observe_phase("images", images_started)
+                    snapshot_recorder.capture(driver, "myntra", "pdp", product_url, keyword_id, keyword)
+
+                    # Fields fail fast once Chrome is gone; do not keep such an empty product
+                    lifecycle.ensure_alive()
+                    products.append(product_data)
+                    metrics.record_product(product_data)
+                    logger.info("Added product data for: %s", product_data['product_name'])
+                    
+                except Exception as e:
+                    if is_session_error(e):
+                        raise
+                    logger.warning("Error visiting product %s: %s", j+1, e)
+                    continue
+            
+            logger.info("Completed visiting %s product pages for keyword: '%s'", products_to_visit, keyword)
+            
+            logger.info("Completed search for keyword: '%s'", keyword)
+            metrics.keyword_done()
+            # Only finished keywords count as done; a queue worker hands the rest back
+            done_keyword_ids.add(str(keyword_id))
+            
+        except TimeoutException as e:
+            logger.error("Timeout error searching for keyword '%s': %s", keyword, e)
+            return products
+        except Exception as e:
+            if is_session_error(e):
+                raise
+            logger.error("Error searching for keyword '%s': %s", keyword, e)
+            return products
+        return products
+
+    lifecycle = DriverLifecycle("myntra", start_browser)
+    try:
+        lifecycle.start()
+    except TimeoutException:
+        return
+    
+    try:
+        for i, keyword_obj in enumerate(filtered_keywords):
+            if str(keyword_obj["id"]) in done_keyword_ids:
                 continue
-        
-        print(f"\nSaving {len(all_scraped_data)} products to myntra_scraped_data.json...")
+            lifecycle.maybe_recycle()
+            all_scraped_data.extend(lifecycle.run_keyword(keyword_obj["keyword"], scrape_keyword, i, keyword_obj))
+            heartbeat.save_checkpoint(all_scraped_data, done_keyword_ids)
+
+        logger.info("Saving %s products to %s...", len(all_scraped_data), output_file)
         try:
-            with open('myntra_scraped_data.json', 'w', encoding='utf-8') as f:
+            with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
-            print("Data saved successfully to myntra_scraped_data.json")
+            logger.info("Data saved successfully to %s", output_file)
         except Exception as e:
-            print(f"Error saving data: {e}")
+            logger.error("Error saving data: %s", e)
         
-        print("\nAll keyword searches completed!")
+        logger.info("All keyword searches completed!")
         
     except KeyboardInterrupt:
-        print("\n🛑 Scraping interrupted by user (Ctrl+C)")
-        print("💾 Saving all collected data before shutdown...")
+        logger.warning("🛑 Scraping interrupted by user (Ctrl+C)")
+        logger.info("💾 Saving all collected data before shutdown...")
         
         try:
-            with open('myntra_scraped_data.json', 'w', encoding='utf-8') as f:
+            with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
-            print(f"✅ Saved {len(all_scraped_data)} products to myntra_scraped_data.json")
+            logger.info("✅ Saved %s products to %s", len(all_scraped_data), output_file)
         except Exception as e:
-            print(f"❌ Error saving data during shutdown: {e}")
+            logger.error("❌ Error saving data during shutdown: %s", e)
         
-        print("🔚 Graceful shutdown completed")
+        logger.info("🔚 Graceful shutdown completed")
         
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
+        # e.g. the browser could not be restarted; keep what the finished keywords produced
+        logger.info("💾 Saving the %s products collected so far...", len(all_scraped_data))
+        try:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
+            logger.info("✅ Saved %s products to %s", len(all_scraped_data), output_file)
+        except Exception as save_error:
+            logger.error("❌ Error saving data: %s", save_error)
     
     finally:
 
-        driver.quit()
-        print("Browser closed")
+        lifecycle.quit()
+        logger.info("Browser closed")
 
 if __name__ == "__main__":
     main()
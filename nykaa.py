@@ -1,47 +1,56 @@
 #!/usr/bin/env python3
 """
 Nykaa Fashion Search Script
-Navigates to NykaaFashion.com, searches for keywords from zara_keywords.json, waits 3 seconds between searches
+Navigates to NykaaFashion.com, searches for keywords from keywords.json, waits 3 seconds between searches
 """
 
 import time
 import json
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+from utils import filter_keywords, get_output_file, get_base_url
+from site_registry import get_site
+import heartbeat
+import metrics
+import snapshot_recorder
+from image_harvest import harvest_images
+from browser_setup import create_driver
+from driver_lifecycle import DriverLifecycle, is_session_error, retire_driver
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
 
 def main():
     try:
         with open('keywords.json', 'r') as f:
             keywords_data = json.load(f)
-        print(f"Loaded {len(keywords_data)} keywords from keywords.json")
+        logger.info("Loaded %s keywords from keywords.json", len(keywords_data))
     except Exception as e:
-        print(f"Error loading keywords file: {e}")
+        logger.error("Error loading keywords file: %s", e)
         return
     
-    start_id = 421
-    end_id = 525
+    start_id, end_id = get_site("nykaa")["keyword_range"]
     
-    filtered_keywords = []
-    for keyword_obj in keywords_data:
-        keyword_id = int(keyword_obj["id"])
-        if start_id <= keyword_id <= end_id:
-            filtered_keywords.append(keyword_obj)
+    filtered_keywords = filter_keywords(keywords_data, start_id, end_id)
     
-    print(f"Scraping keywords with IDs {start_id} to {end_id}")
-    print(f"Total keywords to scrape: {len(filtered_keywords)}")
+    logger.info("Scraping keywords with IDs %s to %s", start_id, end_id)
+    logger.info("Total keywords to scrape: %s", len(filtered_keywords))
     
     if not filtered_keywords:
-        print(f"No keywords found in range {start_id}-{end_id}")
+        logger.warning("No keywords found in range %s-%s", start_id, end_id)
         return
     
-    all_scraped_data = []
+    metrics.start_metrics("nykaa")
+    # A watchdog restart resumes after the keywords the checkpoint already covers
+    all_scraped_data, done_keyword_ids = heartbeat.load_checkpoint()
+    if done_keyword_ids:
+        logger.info("⏩ Resuming from checkpoint: %s keywords and %s products already done", len(done_keyword_ids), len(all_scraped_data))
+    output_file = get_output_file('nykaa_scraped_data.json')
+    base_url = get_base_url("https://www.nykaafashion.com/")
     
     chrome_options = Options()
     chrome_options.add_argument("--no-sandbox")
@@ -66,259 +75,301 @@ def main():
     chrome_options.add_argument("--force-device-scale-factor=1")
     chrome_options.add_argument("--disable-features=TranslateUI")
     
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    except Exception as e:
-        print(f"Error initializing Chrome driver: {e}")
-        print("Trying alternative Chrome path...")
-        chrome_options.binary_location = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+    def start_browser():
+        driver = create_driver(chrome_options, "nykaa")
+        try:
+            logger.debug("Navigating to Nykaa Fashion...")
+            driver.get(base_url)
+            
+            logger.debug("Waiting for page to load...")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "[data-at='search-input']")))
+            logger.info("✅ Page loaded successfully - search input found")
+        except TimeoutException:
+            logger.error("❌ Page load timeout - search input not found within 10 seconds")
+            retire_driver(driver, healthy=False)
+            raise
+        except Exception:
+            retire_driver(driver, healthy=False)
+            raise
+        return driver
     
-    try:
+    def scrape_keyword(i, keyword_obj):
+        """Products for one keyword; a lost browser session propagates so the keyword is retried"""
+        products = []
+        driver = lifecycle.driver
         wait = WebDriverWait(driver, 10)
+        keyword_id = keyword_obj["id"]
+        keyword = keyword_obj["keyword"]
+        logger.info("Searching for keyword %s/%s: '%s' (ID: %s)", i+1, len(filtered_keywords), keyword, keyword_id)
+        search_started = time.time()
+        heartbeat.beat("search", keyword_id=keyword_id, keyword=keyword)
         
-        print("Navigating to Nykaa Fashion...")
-        driver.get("https://www.nykaafashion.com/")
-        
-        print("Waiting for page to load...")
         try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "[data-at='search-input']")))
-            print("✅ Page loaded successfully - search input found")
-        except TimeoutException:
-            print("❌ Page load timeout - search input not found within 10 seconds")
-            return
-        
-        for i, keyword_obj in enumerate(filtered_keywords):
-            keyword_id = keyword_obj["id"]
-            keyword = keyword_obj["keyword"]
-            print(f"\nSearching for keyword {i+1}/{len(filtered_keywords)}: '{keyword}' (ID: {keyword_id})")
+            if i > 0:
+                logger.debug("Navigating back to main page...")
+                driver.get(base_url)
+                time.sleep(2)
             
-            try:
-                if i > 0:
-                    print("Navigating back to main page...")
-                    driver.get("https://www.nykaafashion.com/")
-                    time.sleep(2)
-                
-                print(f"Looking for search input for keyword: '{keyword}'")
-                search_input = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-at='search-input']")))
-                
-                search_input.clear()
-                search_input.send_keys(Keys.CONTROL + "a")
-                search_input.send_keys(Keys.DELETE)
-                print(f"Cleared search input for keyword: '{keyword}'")
-                
-                search_input.send_keys(keyword)
-                print(f"Typed: {keyword}")
-                
-                search_input.send_keys(Keys.RETURN)
-                print("Pressed Enter")
-                
-                print("Waiting for search results to load...")
-
-                time.sleep(3)
-                
-                gender_div = driver.find_element(By.CSS_SELECTOR, "div.css-y9u3nm")
-                if gender_div:
-                    gender_div.click()
-                    print("Clicked on gender div")
-                else:
-                    print("Gender div not found")
-
-                try:
-                    women_filter_div = driver.find_element(By.CSS_SELECTOR, "[title='Women']")
-                    if women_filter_div:
-                        women_filter_div.click()
-                        print("Clicked on women filter div")
-                        time.sleep(3)
-                    else:
-                        print("Women filter div not found")
-                except Exception as e:
-                    print(f"Error clicking on women filter div: {e}")
-                    continue
-
-                try:
-                    found_products = driver.find_elements(By.CSS_SELECTOR,"div.css-384pms")
-                    print(f"Found {len(found_products)} products")
+            logger.debug("Looking for search input for keyword: '%s'", keyword)
+            search_input = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-at='search-input']")))
+            
+            search_input.clear()
+            search_input.send_keys(Keys.CONTROL + "a")
+            search_input.send_keys(Keys.DELETE)
+            logger.debug("Cleared search input for keyword: '%s'", keyword)
+            
+            search_input.send_keys(keyword)
+            logger.debug("Typed: %s", keyword)
+            
+            search_input.send_keys(Keys.RETURN)
+            logger.debug("Pressed Enter")
+            
+            logger.debug("Waiting for search results to load...")
 
-                    products_to_visit = min(10, len(found_products))
-                    print(f"Visiting first {products_to_visit} product pages...")
+            time.sleep(3)
+            
+            gender_div = driver.find_element(By.CSS_SELECTOR, "div.css-y9u3nm")
+            if gender_div:
+                gender_div.click()
+                logger.debug("Clicked on gender div")
+            else:
+                logger.debug("Gender div not found")
 
-                    for j in range(products_to_visit):
-                        try:
-                            print(f"\nVisiting product {j+1}/{products_to_visit}")
+            try:
+                women_filter_div = driver.find_element(By.CSS_SELECTOR, "[title='Women']")
+                if women_filter_div:
+                    women_filter_div.click()
+                    logger.debug("Clicked on women filter div")
+                    time.sleep(3)
+                else:
+                    logger.debug("Women filter div not found")
+            except Exception as e:
+                if is_session_error(e):
+                    raise
+                logger.warning("Error clicking on women filter div: %s", e)
+                return products
 
-                            found_products = driver.find_elements(By.CSS_SELECTOR,"div.css-384pms")
-                            
-                            if j >= len(found_products):
-                                print(f"No more product elements available (tried to access index {j})")
-                                break
+            try:
+                lifecycle.page_served()
+                metrics.observe_phase("search", search_started)
+                snapshot_recorder.capture(driver, "nykaa", "search", keyword_id=keyword_id, keyword=keyword)
+                found_products = driver.find_elements(By.CSS_SELECTOR,"div.css-384pms")
+                logger.info("Found %s products", len(found_products))
+                if not found_products:
+                    metrics.record_empty_results()
 
-                            product = found_products[j]
-                            product_link = product.find_element(By.CSS_SELECTOR, "a")
-                            product_url = product_link.get_attribute("href")
-                            print(f"Product URL: {product_url}")
+                # Collected up front so a browser recycle between products keeps our place
+                product_urls = []
+                for product in found_products[:10]:
+                    try:
+                        product_urls.append(product.find_element(By.CSS_SELECTOR, "a").get_attribute("href"))
+                    except Exception as e:
+                        if is_session_error(e):
+                            raise
+                        logger.debug("Product link not found: %s", e)
 
-                            print(f"Navigating directly to: {product_url}")
-                            driver.get(product_url)
+                products_to_visit = len(product_urls)
+                logger.info("Visiting first %s product pages...", products_to_visit)
 
-                            print("Waiting for product page to load...")
-                            time.sleep(3)
-                        
-                            product_data = {
-                                "site": "nykaa_fashion",
-                                "product_url": product_url,
-                                "keyword_id": keyword_id,
-                                "keyword": keyword,
-                                "product_id": "Not found",
-                                "brand_name": "Not found",
-                                "product_name": "Not found",
-                                "product_rating": "Not found",
-                                "product_rating_count": "Not found",
-                                "current_product_price": "Not found",
-                                "original_product_price": "Not found",
-                                "product_color": "Not applicable",
-                                "product_description": "Not applicable",
-                                "product_sizes_available": [],
-                                "product_sizes_coming_soon": [],
-                                "product_sizes_out_of_stock": [],
-                                "product_image_urls": [],
-                                "additional_information": "Not applicable"
-                            }
+                for j, product_url in enumerate(product_urls):
+                    try:
+                        lifecycle.maybe_recycle()
+                        driver = lifecycle.driver
+                        logger.debug("Visiting product %s/%s", j+1, products_to_visit)
+                        logger.debug("Product URL: %s", product_url)
 
-                            try:
-                                current_url = driver.current_url
-                                import re
-                                product_id_match = re.search(r'/p/(\d+)', current_url)
-                                if product_id_match:
-                                    product_data["product_id"] = product_id_match.group(1)
-                                    print(f"Product ID: {product_data['product_id']}")
-                            except Exception as e:
-                                print(f"Product ID not found: {e}")
+                        logger.debug("Navigating directly to: %s", product_url)
+                        pdp_started = time.time()
+                        heartbeat.beat("pdp_load", product=product_url)
+                        driver.get(product_url)
 
-                            try:    
-                                brand_name = driver.find_element(By.CLASS_NAME, "css-6mpq2k").text
-                                product_data["brand_name"] = brand_name
-                                print(f"Brand name: {brand_name}")
-                            except Exception as e:
-                                print(f"Brand name not found: {e}")
+                        logger.debug("Waiting for product page to load...")
+                        time.sleep(3)
+                        lifecycle.page_served()
+                        metrics.observe_phase("pdp_load", pdp_started)
+                        extraction_started = time.time()
+                        heartbeat.beat("extraction")
+                    
+                        product_data = {
+                            "site": "nykaa_fashion",
+                            "product_url": product_url,
+                            "keyword_id": keyword_id,
+                            "keyword": keyword,
+                            "product_id": "Not found",
+                            "brand_name": "Not found",
+                            "product_name": "Not found",
+                            "product_rating": "Not found",
+                            "product_rating_count": "Not found",
+                            "current_product_price": "Not found",
+                            "original_product_price": "Not found",
+                            "product_color": "Not applicable",
+                            "product_description": "Not applicable",
+                            "product_sizes_available": [],
+                            "product_sizes_coming_soon": [],
+                            "product_sizes_out_of_stock": [],
+                            "product_image_urls": [],
+                            "additional_information": "Not applicable"
+                        }
 
-                            try:
-                                product_name = driver.find_element(By.CLASS_NAME, "css-cmh3n9").text
-                                product_data["product_name"] = product_name
-                                print(f"Product name: {product_name}")
-                            except Exception as e:
-                                print(f"Product name not found: {e}")
+                        try:
+                            current_url = driver.current_url
+                            import re
+                            product_id_match = re.search(r'/p/(\d+)', current_url)
+                            if product_id_match:
+                                product_data["product_id"] = product_id_match.group(1)
+                                logger.debug("Product ID: %s", product_data['product_id'])
+                        except Exception as e:
+                            logger.debug("Product ID not found: %s", e)
 
-                            try:
-                                product_rating = driver.find_element(By.CSS_SELECTOR, "[data-at='product-rating']").text
-                                product_data["product_rating"] = product_rating
-                                print(f"Product rating: {product_rating}")
-                            except Exception as e:
-                                print(f"Product rating not found: {e}")
+                        try:    
+                            brand_name = driver.find_element(By.CLASS_NAME, "css-6mpq2k").text
+                            product_data["brand_name"] = brand_name
+                            logger.debug("Brand name: %s", brand_name)
+                        except Exception as e:
+                            logger.debug("Brand name not found: %s", e)
 
-                            try:
-                                product_rating_count = driver.find_element(By.CSS_SELECTOR, "div.css-gb84zx>span").text
-                                product_data["product_rating_count"] = product_rating_count
-                                print(f"Product rating count: {product_rating_count}")
-                            except Exception as e:
-                                print(f"Product rating count not found: {e}")
+                        try:
+                            product_name = driver.find_element(By.CLASS_NAME, "css-cmh3n9").text
+                            product_data["product_name"] = product_name
+                            logger.debug("Product name: %s", product_name)
+                        except Exception as e:
+                            logger.debug("Product name not found: %s", e)
 
-                            try:
-                                product_current_price = driver.find_element(By.CSS_SELECTOR, "[data-at='sp-pdp']").text
-                                product_data["current_product_price"] = product_current_price
-                                print(f"Product current price: {product_current_price}")
-                            except Exception as e:
-                                print(f"Product current price not found: {e}")
+                        try:
+                            product_rating = driver.find_element(By.CSS_SELECTOR, "[data-at='product-rating']").text
+                            product_data["product_rating"] = product_rating
+                            logger.debug("Product rating: %s", product_rating)
+                        except Exception as e:
+                            logger.debug("Product rating not found: %s", e)
 
-                            try:
-                                product_original_price = driver.find_element(By.CSS_SELECTOR, "[data-at='mrp-pdp']").text
-                                product_data["original_product_price"] = product_original_price
-                                print(f"Product original price: {product_original_price}")
-                            except Exception as e:
-                                print(f"Product original price not found: {e}")
+                        try:
+                            product_rating_count = driver.find_element(By.CSS_SELECTOR, "div.css-gb84zx>span").text
+                            product_data["product_rating_count"] = product_rating_count
+                            logger.debug("Product rating count: %s", product_rating_count)
+                        except Exception as e:
+                            logger.debug("Product rating count not found: %s", e)
 
-                            try:
-                                product_sizes_elements = driver.find_elements(By.CSS_SELECTOR, "[data-at='size-btn']")
-                                for size_element in product_sizes_elements:
-                                    size_text = size_element.text
-                                    product_data["product_sizes_available"].append(size_text)
-                                print(f"Product sizes: {product_data['product_sizes_available']}")
-                            except Exception as e:
-                                print(f"Product sizes not found: {e}")
-                            
-                            try:
-                                product_images_elements = driver.find_elements(By.CSS_SELECTOR, "img.pdp-selector-img")
-                                for image_element in product_images_elements:
-                                    image_url = image_element.get_attribute("src")
-                                    product_data["product_image_urls"].append(image_url)
-                                print(f"Product images: {product_data['product_image_urls']}")
-                            except Exception as e:
-                                print(f"Product images not found: {e}")
+                        try:
+                            product_current_price = driver.find_element(By.CSS_SELECTOR, "[data-at='sp-pdp']").text
+                            product_data["current_product_price"] = product_current_price
+                            logger.debug("Product current price: %s", product_current_price)
+                        except Exception as e:
+                            logger.debug("Product current price not found: %s", e)
 
+                        try:
+                            product_original_price = driver.find_element(By.CSS_SELECTOR, "[data-at='mrp-pdp']").text
+                            product_data["original_product_price"] = product_original_price
+                            logger.debug("Product original price: %s", product_original_price)
+                        except Exception as e:
+                            logger.debug("Product original price not found: %s", e)
 
-                            all_scraped_data.append(product_data)
-                            print(f"Added product data for: {product_data['product_name']}")
-                            
-                            print("Going back to search results...")
-                            driver.back()
-                            time.sleep(2)
-                            
+                        try:
+                            product_sizes_elements = driver.find_elements(By.CSS_SELECTOR, "[data-at='size-btn']")
+                            for size_element in product_sizes_elements:
+                                size_text = size_element.text
+                                product_data["product_sizes_available"].append(size_text)
+                            logger.debug("Product sizes: %s", product_data['product_sizes_available'])
                         except Exception as e:
-                            print(f"Error visiting product {j+1}: {e}")
-                            try:
-                                driver.back()
-                                time.sleep(2)
-                            except:
-                                pass
-                            continue
+                            logger.debug("Product sizes not found: %s", e)
+                        metrics.observe_phase("extraction", extraction_started)
                         
-                except Exception as e:
-                    print(f"Error finding found products: {e}")
-                    continue
-                
-                print("Waiting 3 seconds...")
-                time.sleep(3)
-                
-                print(f"Completed search for keyword: '{keyword}'")
-                
-            except TimeoutException as e:
-                print(f"Timeout error searching for keyword '{keyword}': {e}")
-                continue
+                        images_started = time.time()
+                        heartbeat.beat("images")
+                        try:
+                            product_data["product_image_urls"] = harvest_images(driver, "nykaa")
+                            logger.debug("Product images: %s", product_data['product_image_urls'])
+                        except Exception as e:
+                            logger.debug("Product images not found: %s", e)
+                        metrics.observe_phase("images", images_started)
+                        snapshot_recorder.capture(driver, "nykaa", "pdp", product_url, keyword_id, keyword)
+
+                        # Fields fail fast once Chrome is gone; do not keep such an empty product
+                        lifecycle.ensure_alive()
+                        products.append(product_data)
+                        metrics.record_product(product_data)
+                        logger.info("Added product data for: %s", product_data['product_name'])
+                        
+                    except Exception as e:
+                        if is_session_error(e):
+                            raise
+                        logger.warning("Error visiting product %s: %s", j+1, e)
+                        continue
+                    
             except Exception as e:
-                print(f"Error searching for keyword '{keyword}': {e}")
+                if is_session_error(e):
+                    raise
+                logger.warning("Error finding found products: %s", e)
+                return products
+            
+            logger.debug("Waiting 3 seconds...")
+            time.sleep(3)
+            
+            logger.info("Completed search for keyword: '%s'", keyword)
+            metrics.keyword_done()
+            # Only finished keywords count as done; a queue worker hands the rest back
+            done_keyword_ids.add(str(keyword_id))
+            
+        except TimeoutException as e:
+            logger.error("Timeout error searching for keyword '%s': %s", keyword, e)
+            return products
+        except Exception as e:
+            if is_session_error(e):
+                raise
+            logger.error("Error searching for keyword '%s': %s", keyword, e)
+            return products
+        return products
+
+    lifecycle = DriverLifecycle("nykaa", start_browser)
+    try:
+        lifecycle.start()
+    except TimeoutException:
+        return
+    
+    try:
+        for i, keyword_obj in enumerate(filtered_keywords):
+            if str(keyword_obj["id"]) in done_keyword_ids:
                 continue
-        
-        print(f"\nSaving {len(all_scraped_data)} products to nykaa_scraped_data.json...")
+            lifecycle.maybe_recycle()
+            all_scraped_data.extend(lifecycle.run_keyword(keyword_obj["keyword"], scrape_keyword, i, keyword_obj))
+            heartbeat.save_checkpoint(all_scraped_data, done_keyword_ids)
+
+        logger.info("Saving %s products to %s...", len(all_scraped_data), output_file)
         try:
-            with open('nykaa_scraped_data.json', 'w', encoding='utf-8') as f:
+            with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
-            print("Data saved successfully to nykaa_scraped_data.json")
+            logger.info("Data saved successfully to %s", output_file)
         except Exception as e:
-            print(f"Error saving data: {e}")
+            logger.error("Error saving data: %s", e)
         
-        print("\nAll keyword searches completed!")
+        logger.info("All keyword searches completed!")
         
     except KeyboardInterrupt:
-        print("\n🛑 Scraping interrupted by user (Ctrl+C)")
-        print("💾 Saving all collected data before shutdown...")
+        logger.warning("🛑 Scraping interrupted by user (Ctrl+C)")
+        logger.info("💾 Saving all collected data before shutdown...")
         
         try:
-            with open('nykaa_scraped_data.json', 'w', encoding='utf-8') as f:
+            with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
-            print(f"✅ Saved {len(all_scraped_data)} products to nykaa_scraped_data.json")
+            logger.info("✅ Saved %s products to %s", len(all_scraped_data), output_file)
         except Exception as e:
-            print(f"❌ Error saving data during shutdown: {e}")
+            logger.error("❌ Error saving data during shutdown: %s", e)
         
-        print("🔚 Graceful shutdown completed")
+        logger.info("🔚 Graceful shutdown completed")
         
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
+        # e.g. the browser could not be restarted; keep what the finished keywords produced
+        logger.info("💾 Saving the %s products collected so far...", len(all_scraped_data))
+        try:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
+            logger.info("✅ Saved %s products to %s", len(all_scraped_data), output_file)
+        except Exception as save_error:
+            logger.error("❌ Error saving data: %s", save_error)
     
     finally:
-        driver.quit()
-        print("Browser closed")
+        lifecycle.quit()
+        logger.info("Browser closed")
 
 if __name__ == "__main__":
     main()
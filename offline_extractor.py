@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Offline Extractor
+Re-runs each site scraper's product-page field logic against saved HTML instead of a live
+browser. The selectors below mirror the find_element calls in nykaa.py, myntra.py, zara.py
+and hm.py; pages are parsed with BeautifulSoup + lxml across a process pool and written out
+as unified records.
+
+Input is the snapshot store written by snapshot_recorder.py (latest PDP per product URL by
+default) or a folder of plain .html files for one site.
+
+Usage:
+    python offline_extractor.py --snapshots snapshots -o offline_extracted.json
+    python offline_extractor.py --snapshots snapshots --site zara --all-versions
+    python offline_extractor.py --html-dir saved_pages/ --site myntra -o myntra_offline.json
+"""
+
+import argparse
+import glob
+import gzip
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse, parse_qs, urljoin
+
+from bs4 import BeautifulSoup
+
+from site_registry import UNIFIED_FIELDS
+from image_harvest import rewrite_image_urls
+from page_source import ASSIGNMENT, extract_embedded_json, iter_embedded_json
+from snapshot_recorder import DEFAULT_SNAPSHOT_DIR, find_snapshots
+from utils import write_json_array
+from zara_images import is_valid_product_image, clean_image_url, unique_product_images
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+OUTPUT_FILE = "offline_extracted.json"
+
+# Field rules per site. Each field maps to (css selector, how to read it):
+#   "text"          text of the first match       (driver.find_element(...).text)
+#   "texts"         non-empty text of every match (driver.find_elements(...) loop)
+#   "attr:<name>"   attribute of every match
+# Fields without a rule keep the value the live scraper starts from.
+SITE_RULES: Dict[str, Dict[str, Any]] = {
+    "nykaa": {
+        "site": "nykaa_fashion",
+        "product_id": r'/p/(\d+)',
+        "not_applicable": ["product_color", "product_description", "additional_information"],
+        "fields": {
+            "brand_name": (".css-6mpq2k", "text"),
+            "product_name": (".css-cmh3n9", "text"),
+            "product_rating": ("[data-at='product-rating']", "text"),
+            "product_rating_count": ("div.css-gb84zx>span", "text"),
+            "current_product_price": ("[data-at='sp-pdp']", "text"),
+            "original_product_price": ("[data-at='mrp-pdp']", "text"),
+            "product_sizes_available": ("[data-at='size-btn']", "texts"),
+            "product_image_urls": ("img.pdp-selector-img", "attr:src"),
+        },
+    },
+    "myntra": {
+        "site": "myntra",
+        "product_id": r'/p/(\d+)',
+        "not_applicable": ["product_color", "additional_information"],
+        "fields": {
+            "brand_name": (".pdp-title", "text"),
+            "product_name": (".pdp-name", "text"),
+            "current_product_price": (".pdp-price", "text"),
+            "original_product_price": ("span.pdp-mrp>s", "text"),
+            "product_description": (".pdp-product-description-content", "text"),
+            "product_rating": ("div.index-overallRating>div", "text"),
+            "product_rating_count": ("div.index-overallRating div.index-ratingsCount", "text"),
+            "product_sizes_available": ("p.size-buttons-unified-size", "texts"),
+            "product_image_urls": ("div.image-grid-col50>div.image-grid-imageContainer>div.image-grid-image", "attr:style"),
+        },
+    },
+    "zara": {
+        "site": "zara",
+        "not_applicable": ["brand_name", "product_rating", "product_rating_count"],
+        "fields": {
+            "product_name": (".product-detail-info__header-name", "text"),
+            "original_product_price": ("span.price-old__amount>div.money-amount>span.money-amount__main", "text"),
+            "current_product_price": ("span.price-current__amount>div.money-amount>span.money-amount__main", "text"),
+            "product_color": ("p.product-color-extended-name", "text"),
+            "product_description": ("div.expandable-text__inner-content>p", "text"),
+            "additional_information": ("div.product-detail-composition>span", "text"),
+        },
+    },
+    "hm": {
+        "site": "h&m",
+        "product_id": r'productpage\.(\d+)\.html',
+        "not_applicable": ["product_color", "product_description", "product_sizes_coming_soon",
+                           "product_sizes_out_of_stock", "additional_information"],
+        "defaults": {"brand_name": "H&M"},
+        "fields": {
+            "product_name": ("div.a0c9d8>h1.be6471", "text"),
+            "current_product_price": ("div.f4e18c>span.a15559", "text"),
+            "product_color": ("[data-testid='color-selector'] p.b136ca", "text"),
+            "product_sizes_available": ("ul.c3421a>li>div.af6b46", "texts"),
+            "product_image_urls": (".product-detail-main-image img", "attr:src"),
+        },
+    },
+}
+
+ZARA_SIZE_STATES = {
+    "size-in-stock": "product_sizes_available",
+    "size-back-soon": "product_sizes_coming_soon",
+    "size-out-of-stock": "product_sizes_out_of_stock",
+}
+ZARA_AVAILABILITY = {
+    "in_stock": "size-in-stock",
+    "low_on_stock": "size-in-stock",
+    "back_soon": "size-back-soon",
+    "coming_soon": "size-back-soon",
+    "out_of_stock": "size-out-of-stock",
+}
+BACKGROUND_URL_PATTERN = re.compile(r'url\(["\']?([^"\']+)["\']?\)')
+ZARA_PAGE_IMAGE_PATTERN = re.compile(r'https://static\.zara\.net/assets/public/[^"\s]*?\.(?:jpg|jpeg|png|webp)[^"\s]*')
+
+
+def _text(element) -> str:
+    """Approximates Selenium's .text: rendered text with whitespace collapsed"""
+    return " ".join(element.get_text("").split())
+
+
+def empty_record(site_key: str) -> Dict[str, Any]:
+    rules = SITE_RULES[site_key]
+    record = {}
+    for field in UNIFIED_FIELDS:
+        if field.startswith("product_sizes") or field == "product_image_urls":
+            record[field] = []
+        elif field in rules.get("not_applicable", []):
+            record[field] = "Not applicable"
+        else:
+            record[field] = "Not found"
+    record.update(rules.get("defaults", {}))
+    record["site"] = rules["site"]
+    return record
+
+
+def apply_rules(soup, site_key: str, record: Dict[str, Any], url: str = "") -> None:
+    for field, (selector, mode) in SITE_RULES[site_key]["fields"].items():
+        if mode == "text":
+            element = soup.select_one(selector)
+            if element is not None:
+                record[field] = _text(element)
+        elif mode == "texts":
+            record[field] = [text for text in (_text(element) for element in soup.select(selector)) if text]
+        elif mode.startswith("attr:"):
+            attribute = mode.split(":", 1)[1]
+            values = [element[attribute] for element in soup.select(selector) if element.get(attribute)]
+            # Selenium's get_attribute("src") returns the resolved URL
+            record[field] = [urljoin(url, value) for value in values] if attribute == "src" else values
+
+
+def _myntra_fixups(html: str, record: Dict[str, Any]) -> None:
+    # Images come from the embedded payload like image_harvest.MYNTRA_IMAGES_JS, else the grid's
+    # CSS background-image urls; the ratings count keeps only its digits
+    images = []
+    payload = extract_embedded_json(html, {"window.__myx": ASSIGNMENT}) or {}
+    albums = ((payload.get("pdpData") or {}).get("media") or {}).get("albums") or []
+    photos = [album for album in albums if album.get("name") == "default"] or albums
+    for album in photos:
+        images.extend(image.get("src") or image.get("imageURL") for image in album.get("images") or [])
+    if not any(images):
+        images = []
+        for style in record["product_image_urls"]:
+            if "background-image" in style:
+                match = BACKGROUND_URL_PATTERN.search(style)
+                if match:
+                    images.append(match.group(1))
+    record["product_image_urls"] = rewrite_image_urls("myntra", images)
+    count_match = re.search(r'(\d+)', record["product_rating_count"])
+    record["product_rating_count"] = count_match.group(1) if count_match else "Not found"
+
+
+def _find_size_lists(obj, found: List[Dict[str, Any]]) -> None:
+    """Objects holding a sizes list of {name, availability}, i.e. one per colour"""
+    if isinstance(obj, dict):
+        sizes = obj.get("sizes")
+        if isinstance(sizes, list) and sizes and all(isinstance(s, dict) and s.get("name") and s.get("availability") for s in sizes):
+            found.append(obj)
+        for value in obj.values():
+            _find_size_lists(value, found)
+    elif isinstance(obj, list):
+        for item in obj:
+            _find_size_lists(item, found)
+
+
+def _zara_payload_sizes(html: str, record: Dict[str, Any]) -> None:
+    # Same lookup as zara.COLLECT_SIZES_JS: the colour matching the product id, else the first one
+    colours = []
+    for _, data in iter_embedded_json(html):
+        _find_size_lists(data, colours)
+    if not colours:
+        return
+    product_id = record["product_id"]
+    colour = next((c for c in colours if str(c.get("productId", c.get("id"))) == product_id), colours[0])
+    for size in colour["sizes"]:
+        field = ZARA_SIZE_STATES.get(ZARA_AVAILABILITY.get(size["availability"], "size-out-of-stock"))
+        record[field].append(size["name"])
+
+
+def _zara_fixups(soup, html: str, url: str, record: Dict[str, Any]) -> None:
+    record["product_id"] = parse_qs(urlparse(url).query).get('v1', ['Not found'])[0]
+
+    for button in soup.select("button.size-selector-sizes-size__button"):
+        label = button.select_one("div.size-selector-sizes-size__label")
+        field = ZARA_SIZE_STATES.get(button.get("data-qa-action"))
+        if label is not None and field:
+            record[field].append(_text(label))
+    if not any(record[field] for field in ZARA_SIZE_STATES.values()):
+        _zara_payload_sizes(html, record)
+
+    # Same preference as the live scraper: media images first, then any product image in the page
+    image_urls = {}
+    for img in soup.select("picture.media-image img.media-image__image"):
+        for candidate in (img.get("src"), img.get("data-src"), img.get("data-lazy"), img.get("data-original")):
+            if candidate and 'transparent-background' not in candidate and is_valid_product_image(candidate):
+                clean_url = clean_image_url(candidate)
+                if clean_url:
+                    image_urls[clean_url] = None
+                break
+    record["product_image_urls"] = list(image_urls) or unique_product_images(ZARA_PAGE_IMAGE_PATTERN.findall(html))
+
+
+def extract_product(html: str, site_key: str, url: str, keyword_id=None, keyword=None) -> Dict[str, Any]:
+    """Unified record for one saved product page"""
+    soup = BeautifulSoup(html, PARSER)
+    record = empty_record(site_key)
+    record.update({"product_url": url, "keyword_id": keyword_id or "Not found", "keyword": keyword or ""})
+
+    id_pattern = SITE_RULES[site_key].get("product_id")
+    if id_pattern:
+        match = re.search(id_pattern, url or "")
+        if match:
+            record["product_id"] = match.group(1)
+
+    apply_rules(soup, site_key, record, url or "")
+    if site_key == "myntra":
+        _myntra_fixups(html, record)
+    elif site_key == "nykaa":
+        record["product_image_urls"] = rewrite_image_urls("nykaa", record["product_image_urls"])
+    elif site_key == "zara":
+        _zara_fixups(soup, html, url, record)
+    return record
+
+
+def _extract_job(job) -> Optional[Dict[str, Any]]:
+    """Worker entry point: read one page from disk and extract it"""
+    path, site_key, url, keyword_id, keyword = job
+    try:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            html = f.read()
+        return extract_product(html, site_key, url, keyword_id, keyword)
+    except Exception as e:
+        print(f"⚠️ Could not extract {path}: {e}")
+        return None
+
+
+def snapshot_jobs(snapshot_dir: str, site: str = None, all_versions: bool = False) -> List[tuple]:
+    entries = [entry for entry in find_snapshots(snapshot_dir, site=site, page_type="pdp") if entry["site"] in SITE_RULES]
+    if not all_versions:
+        latest = {}
+        for entry in entries:
+            latest[(entry["site"], entry["product_url"])] = entry
+        entries = list(latest.values())
+    return [(os.path.join(snapshot_dir, "objects", entry["hash"][:2], f"{entry['hash']}.html.gz"),
+             entry["site"], entry["product_url"], entry.get("keyword_id"), entry.get("keyword"))
+            for entry in entries]
+
+
+def html_dir_jobs(html_dir: str, site: str) -> List[tuple]:
+    paths = sorted(glob.glob(os.path.join(html_dir, "*.html")) + glob.glob(os.path.join(html_dir, "*.html.gz")))
+    return [(path, site, os.path.basename(path), None, None) for path in paths]
+
+
+def run_extraction(jobs: List[tuple], output_file: str, workers: int = None) -> int:
+    """Extract every job across a process pool, streaming records to output_file"""
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(256, len(jobs) // (workers * 4) or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        records = (record for record in executor.map(_extract_job, jobs, chunksize=chunksize) if record)
+        return write_json_array(records, output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-extract product records from saved HTML without a browser')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--snapshots', default=DEFAULT_SNAPSHOT_DIR, help='snapshot_recorder.py directory')
+    source.add_argument('--html-dir', help='Folder of saved .html / .html.gz product pages (needs --site)')
+    parser.add_argument('--site', choices=list(SITE_RULES))
+    parser.add_argument('--all-versions', action='store_true', help='Extract every snapshot, not only the latest per product')
+    parser.add_argument('-w', '--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    if args.html_dir:
+        if not args.site:
+            parser.error("--html-dir needs --site")
+        jobs = html_dir_jobs(args.html_dir, args.site)
+    else:
+        jobs = snapshot_jobs(args.snapshots, args.site, args.all_versions)
+
+    if not jobs:
+        print("❌ No saved product pages found")
+        return
+
+    print(f"🔍 Extracting {len(jobs)} pages with {args.workers or os.cpu_count()} workers...")
+    start_time = time.time()
+    count = run_extraction(jobs, args.output, args.workers)
+    elapsed = time.time() - start_time
+    print(f"✅ {count} records written to {args.output} in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} pages/s)")
+
+
+if __name__ == "__main__":
+    main()
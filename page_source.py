@@ -0,0 +1,82 @@
+"""
+Page Source Cache and Embedded JSON Extraction
+driver.page_source serializes the whole DOM over WebDriver, which is several MB on a product
+page. get_page_source() fetches it once per navigation and hands the same string to every
+caller until the URL changes (or invalidate() is called after the DOM was changed in place).
+
+extract_embedded_json() pulls the state objects sites embed in their pages (window.__X__ = {...},
+<script id="__NEXT_DATA__">, "productDetail": {...}) by locating the marker with str.find and
+parsing only that object with json.JSONDecoder.raw_decode, instead of DOTALL regex scans.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Marker -> what may sit between it and the opening '{', tried in this order
+ASSIGNMENT = r'\s*=\s*'
+PROPERTY = r'["\']?\s*:\s*'
+SCRIPT_BODY = r'[^>]*>\s*'
+DEFAULT_JSON_MARKERS = {
+    'window.__INITIAL_STATE__': ASSIGNMENT,
+    'window.__PRELOADED_STATE__': ASSIGNMENT,
+    'window.zara': ASSIGNMENT,
+    'id="__NEXT_DATA__"': SCRIPT_BODY,
+    '"productDetail': PROPERTY,
+    "'productDetail": PROPERTY,
+}
+
+_SCRIPT_RE = re.compile(r'<script\b[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+_decoder = json.JSONDecoder()
+_suffix_patterns = {}
+
+# id(driver) -> (url, page source)
+_cache = {}
+
+
+def get_page_source(driver, refresh: bool = False) -> str:
+    """driver.page_source, fetched at most once per URL"""
+    key = id(driver)
+    url = driver.current_url
+    cached = _cache.get(key)
+    if not refresh and cached and cached[0] == url:
+        return cached[1]
+    html = driver.page_source
+    _cache[key] = (url, html)
+    return html
+
+
+def invalidate(driver) -> None:
+    """Forget the cached source, e.g. after lazy images were loaded without a URL change"""
+    _cache.pop(id(driver), None)
+
+
+def iter_embedded_json(html: str, markers: Dict[str, str] = None) -> Iterator[Tuple[str, Any]]:
+    """(marker, parsed object) for each occurrence of each marker that is followed by valid JSON"""
+    for marker, suffix in (markers or DEFAULT_JSON_MARKERS).items():
+        if suffix not in _suffix_patterns:
+            _suffix_patterns[suffix] = re.compile(suffix + r'(?=\{)')
+        suffix_re = _suffix_patterns[suffix]
+        position = html.find(marker)
+        while position != -1:
+            # Anchored match, so nothing is scanned beyond the marker itself
+            match = suffix_re.match(html, position + len(marker))
+            if match:
+                try:
+                    data, _ = _decoder.raw_decode(html, match.end())
+                    yield marker, data
+                except ValueError:
+                    pass
+            position = html.find(marker, position + len(marker))
+
+
+def extract_embedded_json(html: str, markers: Dict[str, str] = None) -> Optional[Any]:
+    """The first embedded JSON object found, trying markers in order"""
+    for _, data in iter_embedded_json(html, markers):
+        return data
+    return None
+
+
+def script_contents(html: str) -> List[str]:
+    """Text of every inline <script> in the page"""
+    return [content for content in _SCRIPT_RE.findall(html) if content.strip()]
@@ -1,178 +1,633 @@
 #!/usr/bin/env python3
 """
 Parallel Scraper Runner
-Runs Nykaa and Myntra scrapers simultaneously in separate processes
-and combines all results into a single scraped_data.json file
+Runs every registered scraper (site_registry.SITES) at the same time in separate processes,
+as many as fit a global CPU/RAM budget, and combines all results into a single file.
+Sites with many keywords are split into several workers; how many run at once is sized
+from the machine's cores, free memory and measured Chrome footprint (resource_sizing.py).
+
+Pass --queue tasks.db to run this machine as one node of a multi-node run
+instead (see task_queue.py): every site gets a worker that claims leased
+keyword tasks from the shared database.
 """
 
+import argparse
+import glob
+import logging
+import signal
 import subprocess
 import json
 import time
 import os
 import threading
+from collections import deque
+from itertools import zip_longest
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging.handlers import RotatingFileHandler
 import sys
 
-def run_scraper(scraper_name, scraper_file):
-    """Run a single scraper and return its results"""
+import heartbeat
+import resource_sizing
+import concurrency_control
+import metrics
+from driver_lifecycle import process_tree_pids
+from site_registry import SITES, get_output_sites, iter_site_records
+from utils import filter_keywords, iter_json_array, write_json_array
+
+METRICS_DIR = "metrics"
+TRACES_DIR = "traces"
+LOGS_DIR = "logs"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+ERROR_TAIL_LINES = 20
+HEARTBEATS_DIR = "heartbeats"
+CHECKPOINTS_DIR = "checkpoints"
+ORCHESTRATOR_METRICS_FILE = os.path.join(METRICS_DIR, "orchestrator.prom")
+
+# Longest a worker may stay in one heartbeat phase before the watchdog restarts it (seconds)
+PHASE_BUDGETS = {
+    "startup": 180,
+    "search": 120,
+    "pdp_load": 120,
+    "extraction": 120,
+    "images": 180,
+    "detail": 120,
+}
+DEFAULT_PHASE_BUDGET = 300
+WATCHDOG_INTERVAL = 10
+STOP_GRACE_PERIOD = 30
+MAX_RESTARTS = 3
+
+# Share of the machine the scrapers may use together; a worker starts once its cost
+# (resource_sizing.worker_cost) fits in what the running workers have left
+CPU_BUDGET_SHARE = 1.0
+RAM_BUDGET_SHARE = 0.8
+SHARD_KEYWORDS = 15         # keywords per worker process when a site is split across workers
+SHARDS_DIR = "shards"
+MEMORY_RECHECK_INTERVAL = 5 # seconds a waiting worker sleeps before reading free memory again
+
+class ResourceBudget:
+    """CPUs and MB of RAM shared by the running scrapers, plus how many workers each site may run.
+
+    acquire() blocks until the cost fits, the site is under its worker cap and the machine
+    has the memory free right now. A worker that is bigger than the whole budget still runs,
+    but only once nothing else is running, so it can never wait forever. After cancel(),
+    acquire() returns False at once instead, so no further workers start.
+    """
+    
+    def __init__(self, cpus, ram_mb, site_caps=None):
+        self.cpus = cpus
+        self.ram_mb = ram_mb
+        self.site_caps = dict(site_caps or {})
+        self.used_cpus = 0.0
+        self.used_ram_mb = 0
+        self.running = 0
+        self.site_running = {}
+        self.cancelled = threading.Event()
+        self._condition = threading.Condition()
+    
+    def _fits(self, cost, site):
+        if not self.running:
+            return True
+        if self.site_running.get(site, 0) >= self.site_caps.get(site, float("inf")):
+            return False
+        if self.used_cpus + cost["cpus"] > self.cpus:
+            return False
+        if self.ram_mb is not None and self.used_ram_mb + cost["ram_mb"] > self.ram_mb:
+            return False
+        return resource_sizing.memory_allows(cost["ram_mb"])
+    
+    def acquire(self, cost, site=None):
+        """Reserve cost for a worker of site; False when the run was cancelled meanwhile"""
+        with self._condition:
+            # Free memory changes without anyone calling release(), so look again now and then
+            while not self._condition.wait_for(lambda: self.cancelled.is_set() or self._fits(cost, site),
+                                               timeout=MEMORY_RECHECK_INTERVAL):
+                pass
+            if self.cancelled.is_set():
+                return False
+            self.used_cpus += cost["cpus"]
+            self.used_ram_mb += cost["ram_mb"]
+            self.running += 1
+            self.site_running[site] = self.site_running.get(site, 0) + 1
+            return True
+    
+    def cancel(self):
+        """Stop admitting workers; the ones waiting in acquire() give up"""
+        with self._condition:
+            self.cancelled.set()
+            self._condition.notify_all()
+    
+    def release(self, cost, site=None):
+        with self._condition:
+            self.used_cpus -= cost["cpus"]
+            self.used_ram_mb -= cost["ram_mb"]
+            self.running -= 1
+            self.site_running[site] -= 1
+            self._condition.notify_all()
+    
+    def set_site_caps(self, site_caps):
+        with self._condition:
+            self.site_caps.update(site_caps)
+            self._condition.notify_all()
+    
+    @classmethod
+    def for_machine(cls, cpus=None, ram_mb=None):
+        """Budget from this machine's cores and memory unless given explicitly"""
+        if cpus is None:
+            cpus = float(os.environ.get("SCRAPER_CPU_BUDGET") or (os.cpu_count() or 1) * CPU_BUDGET_SHARE)
+        if ram_mb is None:
+            ram_mb = os.environ.get("SCRAPER_RAM_BUDGET_MB")
+            if ram_mb:
+                ram_mb = int(ram_mb)
+            elif resource_sizing.total_ram_mb():
+                ram_mb = int(resource_sizing.total_ram_mb() * RAM_BUDGET_SHARE)
+        return cls(cpus, ram_mb)
+
+def scraper_env(site_key, metrics_port=None, trace_dir=None):
+    """Environment for a scraper child: where to export its live metrics and trace spans"""
+    env = os.environ.copy()
+    env["SCRAPER_METRICS_FILE"] = os.path.join(METRICS_DIR, f"{site_key}.prom")
+    # Children log to stdout only; run_scraper already files it under logs/<site>.log
+    env["SCRAPER_LOG_FILE"] = ""
+    if metrics_port:
+        env["SCRAPER_METRICS_PORT"] = str(metrics_port)
+    if trace_dir:
+        env["SCRAPER_TRACE_FILE"] = os.path.join(trace_dir, f"{site_key}.json")
+    env["SCRAPER_HEARTBEAT_FILE"] = os.path.join(HEARTBEATS_DIR, f"{site_key}.json")
+    env["SCRAPER_CHECKPOINT_FILE"] = os.path.join(CHECKPOINTS_DIR, f"{site_key}.json")
+    return env
+
+def reset_worker_state(site_key):
+    """Start a fresh run: drop the heartbeat and checkpoint a previous run left behind"""
+    for directory in (HEARTBEATS_DIR, CHECKPOINTS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{site_key}.json")
+        if os.path.exists(path):
+            os.remove(path)
+
+def stop_process_tree(process, grace=STOP_GRACE_PERIOD):
+    """Ctrl+C a scraper so it saves and closes Chrome; kill it and its browsers if it does not exit"""
+    if os.name == "nt":
+        process.terminate()
+    else:
+        process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=grace)
+        return
+    except subprocess.TimeoutExpired:
+        pass
+    for pid in reversed(process_tree_pids(process.pid)):
+        try:
+            os.kill(pid, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+        except OSError:
+            pass
+    process.wait()
+
+def watch_heartbeat(process, heartbeat_file, scraper_name, done, stalled):
+    """Stop process once its heartbeat has stayed in one phase longer than that phase's budget.
+
+    A worker is only watched once it has written a heartbeat under its own pid, so the file
+    left by a previous attempt never counts against the new one.
+    """
+    while not done.wait(WATCHDOG_INTERVAL):
+        state = heartbeat.read_heartbeat(heartbeat_file)
+        if not state or state.get("pid") != process.pid:
+            continue
+        phase = state.get("phase")
+        idle = time.time() - state.get("ts", time.time())
+        budget = PHASE_BUDGETS.get(phase, DEFAULT_PHASE_BUDGET)
+        if idle <= budget:
+            continue
+        where = f"keyword '{state['keyword']}'" if state.get("keyword") else "no keyword yet"
+        if state.get("product"):
+            where += f", {state['product']}"
+        print(f"🐕 {scraper_name} stuck in {phase} for {idle:.0f}s ({where}) - restarting it")
+        stalled.set()
+        stop_process_tree(process)
+        return
+
+def open_scraper_log(log_file):
+    """Size-rotated log file for one scraper's output"""
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    # Scraper lines carry their own timestamp and level (scraper_logging)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+def run_scraper(scraper_name, scraper_file, env=None, log_file=None, tail=True, max_restarts=MAX_RESTARTS):
+    """Run a single scraper, streaming its output line by line into a rotating log file.
+
+    Only the last few lines are kept in memory (for the failure report), so the parent stays
+    small however much the scraper prints. With tail=True every line is also echoed live.
+
+    When env sets SCRAPER_HEARTBEAT_FILE, a watchdog restarts a scraper that stalls in one
+    phase (see PHASE_BUDGETS); it resumes from its checkpoint, up to max_restarts times.
+    """
     print(f"🚀 Starting {scraper_name} scraper...")
+    log_file = log_file or os.path.join(LOGS_DIR, f"{os.path.splitext(os.path.basename(scraper_file))[0]}.log")
+    env = dict(env if env is not None else os.environ)
+    # Piped stdout is block-buffered in the child; unbuffered, the log is current while it runs
+    env["PYTHONUNBUFFERED"] = "1"
+    heartbeat_file = env.get("SCRAPER_HEARTBEAT_FILE")
+    trace_file = env.get("SCRAPER_TRACE_FILE")
+    last_lines = deque(maxlen=ERROR_TAIL_LINES)
+    handler = open_scraper_log(log_file)
     
     try:
-        result = subprocess.run(
-            [sys.executable, scraper_file],
-            capture_output=True,
-            text=True
-        )
+        for attempt in range(max_restarts + 1):
+            if trace_file and attempt:
+                # The stalled attempt's spans are the evidence; the restart gets its own file
+                root, ext = os.path.splitext(trace_file)
+                env["SCRAPER_TRACE_FILE"] = f"{root}.restart{attempt}{ext}"
+            process = subprocess.Popen(
+                [sys.executable, scraper_file],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+                env=env
+            )
+            if attempt == 0:
+                print(f"📝 {scraper_name} output is logged to {log_file}")
+            
+            done, stalled = threading.Event(), threading.Event()
+            if heartbeat_file:
+                threading.Thread(
+                    target=watch_heartbeat, args=(process, heartbeat_file, scraper_name, done, stalled), daemon=True
+                ).start()
+            
+            try:
+                for line in process.stdout:
+                    line = line.rstrip("\n")
+                    handler.handle(logging.makeLogRecord({"msg": line, "name": scraper_name}))
+                    last_lines.append(line)
+                    if tail:
+                        print(f"[{scraper_name}] {line}")
+                returncode = process.wait()
+            finally:
+                done.set()
+            
+            if not stalled.is_set():
+                break
+            if attempt < max_restarts:
+                print(f"🔁 Restarting {scraper_name} from its checkpoint ({attempt + 1}/{max_restarts})")
+        
+        if stalled.is_set():
+            print(f"❌ {scraper_name} scraper kept stalling, gave up after {max_restarts} restarts (full log: {log_file})")
+            return {"scraper": scraper_name, "status": "stalled", "error": f"stalled {max_restarts + 1} times", "log": log_file}
         
-        if result.returncode == 0:
+        if returncode == 0:
             print(f"✅ {scraper_name} scraper completed successfully")
-            return {"scraper": scraper_name, "status": "success", "output": result.stdout}
+            return {"scraper": scraper_name, "status": "success", "log": log_file, "restarts": attempt}
         else:
-            print(f"❌ {scraper_name} scraper failed with return code {result.returncode}")
-            print(f"Error output: {result.stderr}")
-            return {"scraper": scraper_name, "status": "failed", "error": result.stderr}
+            print(f"❌ {scraper_name} scraper failed with return code {returncode}")
+            print(f"Last output (full log: {log_file}):")
+            for line in last_lines:
+                print(f"   {line}")
+            error = next((line for line in reversed(last_lines) if line.strip()), f"exit code {returncode}")
+            return {"scraper": scraper_name, "status": "failed", "error": error, "log": log_file, "restarts": attempt}
             
-    except subprocess.TimeoutExpired:
-        print(f"⏰ {scraper_name} scraper timed out (this shouldn't happen anymore)")
-        return {"scraper": scraper_name, "status": "timeout", "error": "Scraper timed out"}
     except Exception as e:
         print(f"💥 {scraper_name} scraper encountered an error: {e}")
         return {"scraper": scraper_name, "status": "error", "error": str(e)}
+    finally:
+        handler.close()
+
+COMBINED_OUTPUT_FILE = "scraped_data_4.json"
 
-def combine_scraped_data():
-    """Combine all individual scraped data files into one unified file"""
+def combine_scraped_data(output_file=COMBINED_OUTPUT_FILE):
+    """Stream every registered site's output into one unified file.
+
+    Records are copied one at a time, so memory stays flat whatever the dataset size.
+    The result is written to a temporary file and swapped in atomically, which makes
+    re-running the combine stage safe: the same inputs always produce the same output.
+    """
     print("🔄 Combining scraped data from all sources...")
     
-    all_products = []
-    scrapers = [
-        {"name": "nykaa", "file": "nykaa_scraped_data.json"},
-        {"name": "myntra", "file": "myntra_scraped_data.json"}
-    ]
+    output_sites = get_output_sites()
+    counts = {}
     
-    files_found = 0
-    for scraper in scrapers:
-        file_path = scraper["file"]
-        if os.path.exists(file_path):
-            files_found += 1
+    def iter_all_records():
+        for site_key, site in output_sites.items():
+            file_path = site["output"]
+            if not os.path.exists(file_path):
+                print(f"⚠️ {file_path} not found - {site['name']} may not have completed successfully")
+                continue
+            counts[site_key] = 0
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        all_products.extend(data)
-                        print(f"✅ Added {len(data)} products from {scraper['name']}")
-                    else:
-                        print(f"⚠️ {scraper['name']} data is not in expected list format")
-            except Exception as e:
+                for record in iter_site_records(site_key):
+                    counts[site_key] += 1
+                    yield record
+                print(f"✅ Added {counts[site_key]} products from {site['name']}")
+            except (ValueError, OSError) as e:
                 print(f"❌ Error reading {file_path}: {e}")
-        else:
-            print(f"⚠️ {file_path} not found - {scraper['name']} may not have completed successfully")
     
-    print(f"📊 Found {files_found}/2 individual scraper data files")
+    temp_file = f"{output_file}.tmp"
+    try:
+        total = write_json_array(iter_all_records(), temp_file)
+    except Exception as e:
+        print(f"❌ Error saving combined data: {e}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        return False
     
-    if all_products:
-        try:
-            with open('scraped_data_4.json', 'w', encoding='utf-8') as f:
-                json.dump(all_products, f, indent=2, ensure_ascii=False)
-            print(f"🎉 Successfully combined {len(all_products)} products into scraped_data_4.json")
-            return True
-        except Exception as e:
-            print(f"❌ Error saving combined data: {e}")
-            return False
-    else:
+    print(f"📊 Found {len(counts)}/{len(output_sites)} individual scraper data files")
+    
+    if not total:
+        os.remove(temp_file)
         print("⚠️ No products found to combine")
         return False
+    
+    os.replace(temp_file, output_file)
+    print(f"🎉 Successfully combined {total} products into {output_file}")
+    return True
 
 def cleanup_individual_files():
     """Clean up individual scraper output files after combining"""
     print("\n🧹 Cleaning up individual scraper files...")
     
-    files_to_remove = [
-        "nykaa_scraped_data.json",
-        "myntra_scraped_data.json"
-    ]
+    files_to_remove = [site["output"] for site in get_output_sites().values()]
+    files_to_remove += sorted(glob.glob(os.path.join(SHARDS_DIR, "*.json")))
     
     for file_path in files_to_remove:
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
-                print(f"🗑️ Removed {file_path}_4")
+                print(f"🗑️ Removed {file_path}")
             except Exception as e:
-                print(f"⚠️ Could not remove {file_path}_4: {e}")
+                print(f"⚠️ Could not remove {file_path}: {e}")
 
 def main():
     """Main function to run all scrapers in parallel"""
+    parser = argparse.ArgumentParser(description='Run all scrapers in parallel')
+    parser.add_argument('--queue', help='Shared task_queue database to claim keyword tasks from (multi-node mode)')
+    parser.add_argument('--combine-only', action='store_true', help='Only re-run the combine stage over existing site outputs')
+    parser.add_argument('--metrics-port', type=int, help='Serve each scraper\'s live metrics on consecutive ports starting here')
+    parser.add_argument('--trace', action='store_true', help=f'Record per-phase spans as Chrome trace JSON under {TRACES_DIR}/')
+    parser.add_argument('--quiet', action='store_true', help=f'Do not echo scraper output; it is still written to {LOGS_DIR}/<site>.log')
+    parser.add_argument('--sites', nargs='+', choices=list(SITES), help='Sites to run (default: every site that saves records)')
+    parser.add_argument('--max-cpus', type=float, help='CPUs the scrapers may use together (default: all cores, or SCRAPER_CPU_BUDGET)')
+    parser.add_argument('--max-ram-mb', type=int, help='MB of RAM the scrapers may use together (default: 80%% of memory, or SCRAPER_RAM_BUDGET_MB)')
+    parser.add_argument('-o', '--output', default=COMBINED_OUTPUT_FILE, help=f'Combined output file (default: {COMBINED_OUTPUT_FILE})')
+    args = parser.parse_args()
+    
     print("🌟 Starting Parallel Scraper System")
     print("=" * 50)
     
+    if args.queue:
+        _run_queue_workers(args.queue)
+        return
+    
+    if args.combine_only:
+        combine_scraped_data(args.output)
+        return
+    
+    trace_dir = os.path.join(TRACES_DIR, time.strftime('%Y%m%d_%H%M%S')) if args.trace else None
+    
+    successful_scrapers = []
     try:
-        _run_scrapers()
+        budget = ResourceBudget.for_machine(args.max_cpus, args.max_ram_mb)
+        successful_scrapers = _run_scrapers(args.metrics_port, trace_dir, not args.quiet, args.sites, budget) or []
     except Exception as e:
         print(f"\n💥 Unexpected error in parallel scraper: {e}")
-        print("🔄 Attempting emergency data combination...")
+        raise
+    finally:
+        # The combine stage runs exactly once per session, whatever happened above
+        print("\n🔄 Combining individual scraper data files...")
         try:
-            combine_scraped_data()
+            combine_scraped_data(args.output)
         except Exception as combine_error:
-            print(f"❌ Emergency combination also failed: {combine_error}")
-        raise
+            print(f"❌ Data combination failed: {combine_error}")
+        if trace_dir and os.path.isdir(trace_dir):
+            import tracing
+            merged_trace = f"{trace_dir}.json"
+            tracing.merge_traces(trace_dir, merged_trace)
+            print(f"🧭 Run trace saved to {merged_trace} - open it in chrome://tracing or ui.perfetto.dev")
+    
+    if successful_scrapers:
+        print("\n" + "=" * 50)
+        cleanup_choice = input("🧹 Do you want to remove individual scraper files? (y/n): ").lower().strip()
+        if cleanup_choice in ['y', 'yes']:
+            cleanup_individual_files()
+        else:
+            print("📁 Individual scraper files kept for debugging")
+    else:
+        print("📁 Individual scraper files kept (scrapers were interrupted)")
+    
+    print("\n🎉 Parallel scraping session completed!")
+    print("=" * 50)
 
-def _run_scrapers():
-    """Internal function to run scrapers with proper error handling"""
+def _run_queue_workers(db_path):
+    """Run one leased-task worker per site against a shared task database"""
+    import task_queue
+    
+    if not os.path.exists(db_path):
+        print(f"❌ Task database {db_path} not found - seed it first with: python task_queue.py init --db {db_path}")
+        return
+    
+    sites = [site for site in task_queue.get_status(db_path) if site in task_queue.QUEUE_SITES]
+    print(f"📋 Starting queue workers for: {', '.join(sites)}")
+    
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, len(sites))) as executor:
+        futures = {executor.submit(task_queue.run_worker, db_path, site): site for site in sites}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"💥 Queue worker for {futures[future]} failed: {e}")
+    
+    print(f"\n⏱️ Worker node finished in {time.time() - start_time:.2f} seconds")
+    print("📊 Queue status:")
+    for site, counts in task_queue.get_status(db_path).items():
+        print(f"   {site}: {counts}")
+    print(f"💾 Export results once every node is done: python task_queue.py export --db {db_path}")
+
+def site_keyword_ids(site_key, keywords_data):
+    """IDs of the keywords a site's script scrapes (its keyword_range in site_registry)"""
+    start_id, end_id = SITES[site_key]["keyword_range"]
+    return [str(keyword_obj["id"]) for keyword_obj in filter_keywords(keywords_data, start_id, end_id)]
+
+def plan_shards(site_keys, keywords_data):
+    """Split each site's keywords into SHARD_KEYWORDS-sized worker runs.
+
+    A site that may only run one worker, or has too few keywords to split, runs as a single
+    process exactly as it would by hand. Shards are ordered round-robin across sites.
+    """
+    per_site = []
+    for site_key in site_keys:
+        site = SITES[site_key]
+        keyword_ids = site_keyword_ids(site_key, keywords_data)
+        chunks = [keyword_ids[i:i + SHARD_KEYWORDS] for i in range(0, len(keyword_ids), SHARD_KEYWORDS)]
+        if site["max_workers"] == 1 or len(chunks) < 2:
+            per_site.append([{"site": site_key, "key": site_key, "name": site["name"], "keyword_ids": None}])
+            continue
+        per_site.append([
+            {"site": site_key, "key": f"{site_key}-{number}", "name": f"{site['name']} {number}/{len(chunks)}",
+             "keyword_ids": chunk}
+            for number, chunk in enumerate(chunks, 1)
+        ])
+    return [shard for round_ in zip_longest(*per_site) for shard in round_ if shard]
+
+def shard_env(shard, metrics_port=None, trace_dir=None):
+    env = scraper_env(shard["key"], metrics_port, trace_dir)
+    if shard["keyword_ids"] is not None:
+        env["SCRAPER_KEYWORD_IDS"] = ",".join(shard["keyword_ids"])
+        env["SCRAPER_OUTPUT_FILE"] = os.path.join(SHARDS_DIR, f"{shard['key']}.json")
+        env["SCRAPER_WORKER_ID"] = shard["key"]
+    return env
+
+def merge_shards(site_key, shards):
+    """Concatenate a split site's shard outputs into the site's own output file"""
+    site = SITES[site_key]
+    shard_files = [os.path.join(SHARDS_DIR, f"{shard['key']}.json") for shard in shards]
+    shard_files = [path for path in shard_files if os.path.exists(path)]
+    if not shard_files:
+        return
+    
+    def iter_shard_records():
+        for path in shard_files:
+            try:
+                yield from iter_json_array(path)
+            except (ValueError, OSError) as e:
+                print(f"❌ Error reading {path}: {e}")
+    
+    total = write_json_array(iter_shard_records(), site["output"])
+    print(f"🧩 Merged {len(shard_files)} {site['name']} shards ({total} records) into {site['output']}")
+
+def plan_site_caps(budget, site_keys, max_shards):
+    """Workers per site for the machine as it is right now (see resource_sizing)"""
+    available = resource_sizing.available_ram_mb()
+    ram_mb = budget.ram_mb
+    if available is not None:
+        # Memory our running workers hold is theirs to keep, not lost capacity
+        free_for_workers = available - resource_sizing.RESERVED_RAM_MB + budget.used_ram_mb
+        ram_mb = min(ram_mb, free_for_workers) if ram_mb is not None else free_for_workers
+    return resource_sizing.plan_workers(site_keys, max_shards, budget.cpus, ram_mb, METRICS_DIR)
+
+def control_loop(budget, site_keys, max_shards, done):
+    """Re-plan what the machine can hold as memory pressure and Chrome footprints change, and let
+    each site's AIMD controller pick how many workers it runs within that (concurrency_control)"""
+    signals = {key: concurrency_control.SiteSignals(key, METRICS_DIR) for key in site_keys}
+    controllers = {key: concurrency_control.AIMDController(key, budget.site_caps.get(key, 1)) for key in site_keys}
+    for key in site_keys:
+        # Whatever earlier runs left in metrics/ is the starting point, not the first window
+        signals[key].window()
     
-    scrapers = [
-        {"name": "Nykaa", "file": "nykaa.py"},
-        {"name": "Myntra", "file": "myntra.py"}
-    ]
+    while not done.wait(concurrency_control.CONTROL_INTERVAL):
+        ceilings = plan_site_caps(budget, site_keys, max_shards)
+        caps = {}
+        for key in site_keys:
+            requests, errors, p95 = signals[key].window()
+            caps[key], decision, reason = controllers[key].update(requests, errors, p95, ceilings[key])
+            if decision == "decrease":
+                p95_text = f", p95 {p95:g}s" if p95 is not None else ""
+                print(f"📉 {SITES[key]['name']}: {int(errors)}/{int(requests)} requests failed{p95_text} - "
+                      f"backing off to {caps[key]} worker(s) ({reason})")
+        if caps != {key: budget.site_caps.get(key) for key in site_keys}:
+            print(f"📐 Worker plan now: {', '.join(f'{key} {count}' for key, count in caps.items())}")
+            budget.set_site_caps(caps)
+        try:
+            metrics.write_metrics_file(ORCHESTRATOR_METRICS_FILE)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics file {ORCHESTRATOR_METRICS_FILE}: {e}")
+
+def run_budgeted(budget, site_key, *args):
+    """run_scraper once a worker of the site fits in the shared budget"""
+    cost = resource_sizing.worker_cost(site_key, METRICS_DIR)
+    if not budget.acquire(cost, site_key):
+        return {"scraper": args[0], "status": "cancelled"}
+    try:
+        return run_scraper(*args)
+    finally:
+        budget.release(cost, site_key)
+
+def _run_scrapers(metrics_port=None, trace_dir=None, tail=True, site_keys=None, budget=None):
+    """Internal function to run scrapers with proper error handling"""
     
-    missing_files = []
-    for scraper in scrapers:
-        if not os.path.exists(scraper["file"]):
-            missing_files.append(scraper["file"])
+    # Sites that save no records (ajio.py) only run when asked for by name
+    site_keys = site_keys or list(get_output_sites())
+    budget = budget or ResourceBudget.for_machine()
     
+    missing_files = [SITES[key]["script"] for key in site_keys if not os.path.exists(SITES[key]["script"])]
     if missing_files:
         print(f"❌ Missing scraper files: {missing_files}")
-        return
+        return []
     
     if not os.path.exists("keywords.json"):
         print("❌ keywords.json file not found!")
-        return
+        return []
     
-    print(f"📋 Found {len(scrapers)} scrapers to run in parallel")
+    with open("keywords.json", "r", encoding="utf-8") as f:
+        keywords_data = json.load(f)
+    shards = plan_shards(site_keys, keywords_data)
+    max_shards = {key: sum(1 for shard in shards if shard["site"] == key) for key in site_keys}
+    budget.set_site_caps(plan_site_caps(budget, site_keys, max_shards))
+    
+    print(f"📋 Found {len(site_keys)} scrapers to run in parallel: {', '.join(SITES[key]['name'] for key in site_keys)}")
+    ram_budget = f"{budget.ram_mb} MB RAM" if budget.ram_mb is not None else "unlimited RAM"
+    print(f"🧮 Resource budget: {budget.cpus:g} CPUs, {ram_budget} - workers that do not fit wait for a free slot")
+    for key in site_keys:
+        print(f"   {SITES[key]['name']}: {max_shards[key]} run(s) of up to {SHARD_KEYWORDS} keywords, "
+              f"{budget.site_caps[key]} at a time")
     print("⏱️ Starting parallel execution...")
+    print(f"📈 Live metrics are rewritten under {METRICS_DIR}/ - summarize with: python metrics.py {METRICS_DIR}")
+    print(f"📝 Scraper output is streamed to {LOGS_DIR}/<worker>.log - follow with: tail -f {LOGS_DIR}/{shards[0]['key']}.log")
+    
+    os.makedirs(SHARDS_DIR, exist_ok=True)
+    for shard in shards:
+        reset_worker_state(shard["key"])
+        stale_output = os.path.join(SHARDS_DIR, f"{shard['key']}.json")
+        if os.path.exists(stale_output):
+            os.remove(stale_output)
     
     start_time = time.time()
+    done = threading.Event()
+    threading.Thread(target=control_loop, args=(budget, site_keys, max_shards, done), daemon=True).start()
     
     results = []
     try:
-        with ThreadPoolExecutor(max_workers=2) as executor:
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
             future_to_scraper = {
-                executor.submit(run_scraper, scraper["name"], scraper["file"]): scraper["name"]
-                for scraper in scrapers
+                executor.submit(
+                    run_budgeted, budget, shard["site"], shard["name"], SITES[shard["site"]]["script"],
+                    shard_env(shard, metrics_port + index if metrics_port else None, trace_dir),
+                    os.path.join(LOGS_DIR, f"{shard['key']}.log"), tail
+                ): shard["name"]
+                for index, shard in enumerate(shards)
             }
             
-            for future in as_completed(future_to_scraper):
-                scraper_name = future_to_scraper[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    print(f"💥 Exception in {scraper_name}: {e}")
-                    results.append({
-                        "scraper": scraper_name, 
-                        "status": "exception", 
-                        "error": str(e)
-                    })
+            try:
+                for future in as_completed(future_to_scraper):
+                    scraper_name = future_to_scraper[future]
+                    try:
+                        result = future.result()
+                        results.append(result)
+                    except Exception as e:
+                        print(f"💥 Exception in {scraper_name}: {e}")
+                        results.append({
+                            "scraper": scraper_name, 
+                            "status": "exception", 
+                            "error": str(e)
+                        })
+            except KeyboardInterrupt:
+                # Leaving the with block waits for every thread; queued workers must not start
+                # once the running ones (which got the Ctrl+C too) exit and free the budget
+                budget.cancel()
+                raise
                     
     except KeyboardInterrupt:
         print("\n🛑 Parallel scraper interrupted by user (Ctrl+C)")
-        print("💾 Attempting to save any partial data...")
-        
-        try:
-            combine_scraped_data()
-        except Exception as e:
-            print(f"⚠️ Could not save partial data: {e}")
-        
-        print("🔚 Parallel scraper shutdown completed")
-        return
+        print("💾 Partial data will be combined from whatever the scrapers saved")
+        return []
+    finally:
+        done.set()
+        # Split sites are combined from their shard files, whatever happened above
+        for key in site_keys:
+            merge_shards(key, [shard for shard in shards if shard["site"] == key and shard["keyword_ids"] is not None])
     
     end_time = time.time()
     execution_time = end_time - start_time
@@ -187,7 +642,8 @@ def _run_scrapers():
     for result in results:
         if result["status"] == "success":
             successful_scrapers.append(result["scraper"])
-            print(f"✅ {result['scraper']}: SUCCESS")
+            restarts = f" (after {result['restarts']} watchdog restarts)" if result.get("restarts") else ""
+            print(f"✅ {result['scraper']}: SUCCESS{restarts}")
         else:
             failed_scrapers.append(result["scraper"])
             print(f"❌ {result['scraper']}: {result['status'].upper()}")
@@ -198,27 +654,7 @@ def _run_scrapers():
     print(f"✅ Successful scrapers: {len(successful_scrapers)}")
     print(f"❌ Failed scrapers: {len(failed_scrapers)}")
     
-    print("\n🔄 Checking for individual scraper data files...")
-    combine_scraped_data()
-    
-    if successful_scrapers:
-        print("\n" + "=" * 50)
-        cleanup_choice = input("🧹 Do you want to remove individual scraper files? (y/n): ").lower().strip()
-        if cleanup_choice in ['y', 'yes']:
-            cleanup_individual_files()
-        else:
-            print("📁 Individual scraper files kept for debugging")
-    else:
-        print("📁 Individual scraper files kept (scrapers were interrupted)")
-    
-    print("\n🎉 Parallel scraping session completed!")
-    print("=" * 50)
-    
-    print("\n🔄 Final data combination check...")
-    try:
-        combine_scraped_data()
-    except Exception as e:
-        print(f"⚠️ Final combination failed: {e}")
+    return successful_scrapers
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Chrome Profile Pool
+Persistent --user-data-dir profiles per site, so a scraper starts with warm HTTP/disk caches
+and the cookies that answer consent and locale prompts, instead of a fresh temporary profile.
+
+Profiles live under profiles/<site>/<n>/ (SCRAPER_PROFILE_DIR) and are leased to one worker at
+a time by holding an OS lock (flock, or msvcrt on Windows) on <n>.lock, which also records the
+owner's PID. The OS drops the lock when its holder dies, so nothing stale has to be reclaimed.
+A profile whose SingletonLock still names a live Chrome on this host is skipped, not cleared.
+Each lease is health-checked: a profile whose last Chrome exit crashed counts a failure, and
+profiles that failed too often, were used too many times or are too old are wiped and rebuilt.
+
+Set SCRAPER_PROFILE_DIR to an empty string to launch Chrome with throwaway profiles as before.
+
+Usage:
+    python profile_pool.py              # profiles, leases and health per site
+    python profile_pool.py --reset zara # wipe a site's profiles
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import time
+from typing import Dict, Any, Optional
+
+from scraper_logging import get_logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+DEFAULT_PROFILE_DIR = "profiles"
+POOL_SIZE = 4               # profiles per site, i.e. concurrent workers that get a warm one
+MAX_USES = 200              # launches before a profile is rebuilt
+MAX_AGE_DAYS = 7
+MAX_FAILURES = 3            # crashed/unclean exits before a profile is rebuilt
+
+# Chrome leaves these behind when it is killed; a new Chrome refuses the profile while they exist.
+# They are only cleared once _chrome_running_on says no live Chrome owns them.
+SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+
+def get_profile_root() -> str:
+    return os.environ.get("SCRAPER_PROFILE_DIR", DEFAULT_PROFILE_DIR)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _lock_nonblocking(f) -> bool:
+    """Take an exclusive OS lock on an open file without waiting; False if another process holds it"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _chrome_running_on(profile_path: str) -> bool:
+    """True if the profile's SingletonLock (a "host-pid" symlink) names a live Chrome on this host"""
+    try:
+        target = os.readlink(os.path.join(profile_path, "SingletonLock"))
+    except (OSError, AttributeError, NotImplementedError):
+        return False
+    host, _, pid = target.rpartition("-")
+    return host == socket.gethostname() and pid.isdigit() and _pid_alive(int(pid))
+
+
+class ProfileLease:
+    """Exclusive use of one profile directory until release()"""
+
+    def __init__(self, pool: "ProfilePool", index: int, lock_file):
+        self.pool = pool
+        self.index = index
+        self.path = os.path.abspath(pool.profile_path(index))
+        self.lock_file = lock_file
+        self.released = False
+
+    def release(self, healthy: bool = True) -> None:
+        if self.released:
+            return
+        self.released = True
+        meta = self.pool.read_meta(self.index)
+        meta["last_released"] = time.time()
+        if not healthy:
+            meta["failures"] = meta.get("failures", 0) + 1
+        self.pool.write_meta(self.index, meta)
+        # The lock file stays; closing it drops the lock
+        try:
+            self.lock_file.seek(0)
+            self.lock_file.truncate()
+        except OSError:
+            pass
+        self.lock_file.close()
+
+
+class ProfilePool:
+    """The persistent profiles of one site"""
+
+    def __init__(self, site: str, root: str = None, size: int = POOL_SIZE):
+        self.site = site
+        self.root = os.path.join(root or get_profile_root(), site)
+        self.size = size
+        os.makedirs(self.root, exist_ok=True)
+
+    def profile_path(self, index: int) -> str:
+        return os.path.join(self.root, str(index))
+
+    def lock_path(self, index: int) -> str:
+        return os.path.join(self.root, f"{index}.lock")
+
+    def meta_path(self, index: int) -> str:
+        return os.path.join(self.root, f"{index}.json")
+
+    def read_meta(self, index: int) -> Dict[str, Any]:
+        try:
+            with open(self.meta_path(index), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write_meta(self, index: int, meta: Dict[str, Any]) -> None:
+        with open(self.meta_path(index), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def _try_lock(self, index: int):
+        """The open, locked lock file of a profile, or None when another worker holds it"""
+        f = open(self.lock_path(index), "a+")
+        if not _lock_nonblocking(f):
+            f.close()
+            return None
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        return f
+
+    def _last_exit_crashed(self, index: int) -> bool:
+        preferences = os.path.join(self.profile_path(index), "Default", "Preferences")
+        try:
+            with open(preferences, "r", encoding="utf-8") as f:
+                return json.load(f).get("profile", {}).get("exit_type") == "Crashed"
+        except (OSError, ValueError):
+            return False
+
+    def _check_health(self, index: int) -> Dict[str, Any]:
+        """Rebuild the profile if it is worn out; returns its updated metadata"""
+        meta = self.read_meta(index)
+        if self._last_exit_crashed(index):
+            meta["failures"] = meta.get("failures", 0) + 1
+
+        reason = None
+        if meta.get("failures", 0) >= MAX_FAILURES:
+            reason = f"{meta['failures']} failed runs"
+        elif meta.get("uses", 0) >= MAX_USES:
+            reason = f"{meta['uses']} uses"
+        elif meta.get("created") and time.time() - meta["created"] > MAX_AGE_DAYS * 86400:
+            reason = f"older than {MAX_AGE_DAYS} days"
+
+        path = self.profile_path(index)
+        if reason:
+            logger.info("♻️ Rotating %s profile %s (%s)", self.site, index, reason)
+            shutil.rmtree(path, ignore_errors=True)
+            meta = {}
+        else:
+            for name in SINGLETON_FILES:
+                try:
+                    os.remove(os.path.join(path, name))
+                except OSError:
+                    pass
+
+        if not meta:
+            meta = {"created": time.time(), "uses": 0, "failures": 0}
+        os.makedirs(path, exist_ok=True)
+        return meta
+
+    def lease(self) -> Optional[ProfileLease]:
+        """Lock the first free profile, or None when every profile is in use"""
+        for index in range(self.size):
+            lock_file = self._try_lock(index)
+            if lock_file is None:
+                continue
+            if _chrome_running_on(self.profile_path(index)):
+                # A Chrome outlived the worker that started it; leave the profile to it
+                logger.warning("⚠️ Chrome is still running on %s profile %s, skipping it", self.site, index)
+                lock_file.close()
+                continue
+            try:
+                meta = self._check_health(index)
+                meta["uses"] = meta.get("uses", 0) + 1
+                meta["last_leased"] = time.time()
+                meta["pid"] = os.getpid()
+                self.write_meta(index, meta)
+            except OSError as e:
+                logger.warning("⚠️ Profile %s/%s unusable: %s", self.site, index, e)
+                lock_file.close()
+                continue
+            return ProfileLease(self, index, lock_file)
+        return None
+
+    def status(self):
+        for index in range(self.size):
+            if not os.path.exists(self.profile_path(index)):
+                continue
+            meta = self.read_meta(index)
+            state = "free"
+            with open(self.lock_path(index), "a+") as f:
+                if not _lock_nonblocking(f):
+                    f.seek(0)
+                    state = f"leased by {f.read().strip() or '?'}"
+            created = time.strftime('%Y-%m-%d', time.localtime(meta.get("created", 0)))
+            yield index, state, meta.get("uses", 0), meta.get("failures", 0), created
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or reset the persistent Chrome profiles')
+    parser.add_argument('--dir', default=get_profile_root())
+    parser.add_argument('--reset', metavar='SITE', help='Delete all profiles of a site')
+    args = parser.parse_args()
+
+    if args.reset:
+        shutil.rmtree(os.path.join(args.dir, args.reset), ignore_errors=True)
+        print(f"🧹 Removed {args.reset} profiles")
+        return
+
+    if not os.path.isdir(args.dir):
+        print(f"No profiles in {args.dir}/")
+        return
+    for site in sorted(os.listdir(args.dir)):
+        if not os.path.isdir(os.path.join(args.dir, site)):
+            continue
+        for index, state, uses, failures, created in ProfilePool(site, args.dir).status():
+            print(f"{site:<8} #{index}  {state:<18} uses={uses:<5} failures={failures}  created {created}")
+
+
+if __name__ == "__main__":
+    main()
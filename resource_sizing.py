@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Resource Sizing
+Works out how many scraper workers each site gets from the machine's cores, its free memory
+and the measured footprint of one worker, so the same command fills a 4-core laptop and a
+64-core server without tuning. A worker's footprint is the largest Chrome RSS its site has
+reported in metrics/ (scraper_browser_rss_bytes, see driver_lifecycle) plus its own Python
+process, or the registry estimate until a run has measured it. Each site is capped by its
+"max_workers" in site_registry.
+
+parallel_scraper plans once at start, plans again every minute while the run is going, and
+checks free memory before every worker it starts: no worker starts while it would leave less
+than RESERVED_RAM_MB free.
+
+Usage:
+    python resource_sizing.py                  # worker plan for this machine
+    python resource_sizing.py --sites nykaa zara
+"""
+
+import argparse
+import glob
+import os
+from typing import Dict, List, Optional
+
+import metrics
+from site_registry import SITES, get_output_sites
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RESERVED_RAM_MB = 1024      # left free for the OS, the orchestrator and the page cache
+PYTHON_WORKER_MB = 120      # the scraper's own Python process next to its Chrome
+METRICS_DIR = "metrics"
+
+
+def total_ram_mb() -> Optional[int]:
+    """Physical memory in MB, or None where the platform does not report it"""
+    if psutil is not None:
+        return psutil.virtual_memory().total // (1024 * 1024)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def available_ram_mb() -> Optional[int]:
+    """Memory that can be handed out without swapping, or None where it cannot be read"""
+    if psutil is not None:
+        return psutil.virtual_memory().available // (1024 * 1024)
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def measured_browser_mb(site_key: str, metrics_dir: str = METRICS_DIR) -> Optional[float]:
+    """Largest Chrome RSS any worker of the site reported, in MB"""
+    largest = None
+    for filepath in glob.glob(os.path.join(metrics_dir, "*.prom")):
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                samples = metrics.parse_metrics_text(f.read())
+        except (OSError, ValueError):
+            continue
+        for (name, labels), value in samples.items():
+            if name == "scraper_browser_rss_bytes" and dict(labels).get("site") == site_key and value > 0:
+                largest = max(largest or 0, value / (1024 * 1024))
+    return largest
+
+
+def worker_cost(site_key: str, metrics_dir: str = METRICS_DIR) -> Dict[str, float]:
+    """CPUs and MB of RAM one worker of the site needs, measured where possible"""
+    site = SITES[site_key]
+    cost = dict(site["cost"])
+    if site["backend"] == "browser":
+        measured = measured_browser_mb(site_key, metrics_dir)
+        if measured:
+            cost["ram_mb"] = int(measured + PYTHON_WORKER_MB)
+    return cost
+
+
+def plan_workers(site_keys: List[str], max_shards: Optional[Dict[str, int]] = None, cpus: float = None,
+                 ram_mb: Optional[int] = None, metrics_dir: str = METRICS_DIR) -> Dict[str, int]:
+    """Workers per site that fit in cpus and ram_mb (default: all cores, free memory minus the reserve).
+
+    Sites take turns, so every site gets its first worker before any gets a second. Every site
+    gets at least one worker, even on a machine too small for it; that worker simply waits
+    for room in parallel_scraper's budget.
+    """
+    max_shards = max_shards or {}
+    if cpus is None:
+        cpus = float(os.cpu_count() or 1)
+    if ram_mb is None:
+        available = available_ram_mb()
+        ram_mb = available - RESERVED_RAM_MB if available is not None else None
+
+    costs = {key: worker_cost(key, metrics_dir) for key in site_keys}
+    caps = {key: min(SITES[key]["max_workers"], max_shards.get(key, SITES[key]["max_workers"])) for key in site_keys}
+    plan = {key: 0 for key in site_keys}
+    used_cpus, used_ram_mb = 0.0, 0
+    added = True
+    while added:
+        added = False
+        for key in site_keys:
+            cost = costs[key]
+            if plan[key] >= caps[key] or used_cpus + cost["cpus"] > cpus:
+                continue
+            if ram_mb is not None and used_ram_mb + cost["ram_mb"] > ram_mb:
+                continue
+            plan[key] += 1
+            used_cpus += cost["cpus"]
+            used_ram_mb += cost["ram_mb"]
+            added = True
+    return {key: max(1, workers) for key, workers in plan.items()}
+
+
+def memory_allows(ram_mb: float) -> bool:
+    """True when starting a worker of ram_mb still leaves RESERVED_RAM_MB free"""
+    available = available_ram_mb()
+    return available is None or available - ram_mb >= RESERVED_RAM_MB
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show how many workers each site would get on this machine')
+    parser.add_argument('--sites', nargs='+', choices=list(SITES), default=list(get_output_sites()))
+    parser.add_argument('--cpus', type=float, help='CPUs to plan for (default: all cores)')
+    parser.add_argument('--ram-mb', type=int, help=f'MB of RAM to plan for (default: free memory minus {RESERVED_RAM_MB} MB)')
+    parser.add_argument('--metrics-dir', default=METRICS_DIR, help='Where earlier runs left their metrics files')
+    args = parser.parse_args()
+
+    available = available_ram_mb()
+    print(f"🖥️ {os.cpu_count()} cores, {total_ram_mb() or '?'} MB RAM ({available if available is not None else '?'} MB free)")
+    plan = plan_workers(args.sites, cpus=args.cpus, ram_mb=args.ram_mb, metrics_dir=args.metrics_dir)
+    print(f"{'site':<10} {'backend':<8} {'workers':>7} {'max':>4} {'cpus':>5} {'MB each':>8}  footprint")
+    for key in args.sites:
+        cost = worker_cost(key, args.metrics_dir)
+        source = "measured" if SITES[key]["backend"] == "browser" and measured_browser_mb(key, args.metrics_dir) else "estimate"
+        print(f"{key:<10} {SITES[key]['backend']:<8} {plan[key]:>7} {SITES[key]['max_workers']:>4} "
+              f"{cost['cpus']:>5g} {cost['ram_mb']:>8}  {source}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,17 @@ Simple script to run the parallel scraper system
 import subprocess
 import sys
 
+from site_registry import get_output_sites
+
 def main():
     print("🚀 Starting Parallel Scraper System...")
-    print("This will run Nykaa, Zara, and Myntra scrapers simultaneously")
+    names = [site["name"] for site in get_output_sites().values()]
+    print(f"This will run the {', '.join(names[:-1])} and {names[-1]} scrapers simultaneously")
     print("=" * 60)
     
     try:
-        # Run the parallel scraper
-        result = subprocess.run([sys.executable, "parallel_scraper.py"], check=True)
+        # Run the parallel scraper; extra arguments (e.g. --sites nykaa zara) are passed through
+        result = subprocess.run([sys.executable, "parallel_scraper.py", *sys.argv[1:]], check=True)
         print("\n✅ All scrapers completed successfully!")
         
     except subprocess.CalledProcessError as e:
@@ -0,0 +1,74 @@
+"""
+Scraper Logging
+Shared logging setup for the scrapers and the helpers they use. Records are handed to a
+QueueHandler and written by a background QueueListener, so a scraper never waits on console
+or file I/O. Every module logs under its own name and can be given its own level.
+
+Levels, format and log file come from config.LOGGING_CONFIG and can be overridden per run:
+    SCRAPER_LOG_LEVEL=DEBUG                                # default level
+    SCRAPER_LOG_LEVELS=zara=DEBUG,merge_json_files=WARNING # per module
+    SCRAPER_LOG_FILE=scraper.log                           # "" for console only
+
+Wrap debug-only work (extra WebDriver calls, large dumps) in
+logger.isEnabledFor(logging.DEBUG) so it is skipped entirely when that level is off.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict
+
+from config import LOGGING_CONFIG
+
+_listener = None
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """"zara=DEBUG,utils=WARNING" -> {"zara": "DEBUG", "utils": "WARNING"}"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        if level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """Install the queue handler on the root logger once per process"""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOGGING_CONFIG["format"])
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(formatter)
+    handlers = [console]
+    log_file = os.environ.get("SCRAPER_LOG_FILE", LOGGING_CONFIG.get("log_file"))
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(records))
+    root.setLevel(os.environ.get("SCRAPER_LOG_LEVEL", LOGGING_CONFIG["level"]).upper())
+    levels = {**LOGGING_CONFIG.get("modules", {}), **parse_levels(os.environ.get("SCRAPER_LOG_LEVELS", ""))}
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Drains whatever is still queued before the process exits
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module; a script run directly logs under its file name, not __main__"""
+    setup_logging()
+    if name == "__main__":
+        name = os.path.splitext(os.path.basename(sys.argv[0]))[0] or name
+    return logging.getLogger(name)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Learned Selector Cache
+Sites whose markup varies are scraped with fallback selector chains. A SelectorResolver
+remembers which alternative last matched for each (site, page type), tries it first next
+time, and persists that choice across runs, so a chain normally costs one find_elements
+round trip instead of one per miss. Hit rates are kept per chain and exported as metrics.
+
+A learned selector can be a broader fallback than the ones ahead of it (any product link
+instead of the product tile), so every REPROBE_EVERY lookups the chain is walked in its own
+order again. When a more specific selector matches once more, it becomes the learned one.
+
+The cache file defaults to selector_cache.json and can be moved with SCRAPER_SELECTOR_CACHE.
+
+Usage:
+    python selector_cache.py              # learned selectors and hit rates
+    python selector_cache.py --reset hm   # forget what was learned for a site
+"""
+
+import argparse
+import atexit
+import json
+import os
+import threading
+from typing import Dict, Any, List, Sequence
+
+from selenium.webdriver.common.by import By
+
+import metrics
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_FILE = "selector_cache.json"
+REPROBE_EVERY = 20          # lookups between walks of the chain in its own priority order
+
+_file_lock = threading.Lock()
+
+
+def get_cache_file() -> str:
+    return os.environ.get("SCRAPER_SELECTOR_CACHE", DEFAULT_CACHE_FILE)
+
+
+def load_cache(filepath: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class SelectorResolver:
+    """Fallback selector chains for one site that try the last matching selector first"""
+
+    def __init__(self, site: str, cache_file: str = None):
+        self.site = site
+        self.cache_file = cache_file or get_cache_file()
+        self.entries: Dict[str, Dict[str, Any]] = load_cache(self.cache_file).get(site, {})
+        self.dirty = False
+        atexit.register(self.save)
+
+    def _entry(self, page_type: str) -> Dict[str, Any]:
+        return self.entries.setdefault(page_type, {"selector": None, "lookups": 0, "hits": 0, "misses": 0, "empty": 0})
+
+    def ordered(self, page_type: str, selectors: Sequence[str]) -> List[str]:
+        """The chain with the learned selector moved to the front, except on every REPROBE_EVERY-th lookup"""
+        entry = self.entries.get(page_type, {})
+        learned = entry.get("selector")
+        if (entry.get("lookups", 0) + 1) % REPROBE_EVERY == 0:
+            return list(selectors)
+        if learned in selectors:
+            return [learned] + [selector for selector in selectors if selector != learned]
+        return list(selectors)
+
+    def find_elements(self, context, page_type: str, selectors: Sequence[str], by: str = By.CSS_SELECTOR) -> list:
+        """Elements for the first selector in the chain that matches anything, learned one first.
+
+        context is a driver or a parent element. Returns [] when no selector matches.
+        """
+        chain = self.ordered(page_type, selectors)
+        entry = self._entry(page_type)
+        entry["lookups"] += 1
+        learned = entry["selector"]
+        for attempt, selector in enumerate(chain):
+            elements = context.find_elements(by, selector)
+            if elements:
+                if attempt == 0 and selector == learned:
+                    entry["hits"] += 1
+                    metrics.record_selector_lookup(page_type, "hit")
+                else:
+                    entry["misses"] += 1
+                    metrics.record_selector_lookup(page_type, "miss", attempt + 1)
+                    if selector != learned:
+                        logger.info("🧭 %s/%s: learned selector %r", self.site, page_type, selector)
+                        entry["selector"] = selector
+                        self.dirty = True
+                        self.save()
+                self.dirty = True
+                return elements
+        entry["empty"] += 1
+        metrics.record_selector_lookup(page_type, "empty", len(selectors))
+        self.dirty = True
+        return []
+
+    def remember(self, page_type: str, selector: str) -> None:
+        """Record a match for chains walked by hand (via ordered) because they check more than presence"""
+        entry = self._entry(page_type)
+        entry["lookups"] += 1
+        if selector == entry["selector"]:
+            entry["hits"] += 1
+            metrics.record_selector_lookup(page_type, "hit")
+        else:
+            entry["misses"] += 1
+            metrics.record_selector_lookup(page_type, "miss")
+            logger.info("🧭 %s/%s: learned selector %r", self.site, page_type, selector)
+            entry["selector"] = selector
+            self.dirty = True
+            self.save()
+        self.dirty = True
+
+    def save(self) -> None:
+        """Merge this site's entries into the cache file (other sites may share it)"""
+        if not self.dirty:
+            return
+        with _file_lock:
+            cache = load_cache(self.cache_file)
+            cache[self.site] = self.entries
+            temp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(cache, f, indent=2)
+                os.replace(temp_path, self.cache_file)
+                self.dirty = False
+            except OSError as e:
+                logger.warning("⚠️ Could not save selector cache: %s", e)
+
+
+def print_report(cache: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    if not cache:
+        print("No learned selectors yet")
+        return
+    print(f"{'site':<8} {'page type':<16} {'lookups':>8} {'hit rate':>9} {'empty':>6}  selector")
+    for site, entries in sorted(cache.items()):
+        for page_type, entry in sorted(entries.items()):
+            lookups = entry.get("lookups", 0)
+            hit_rate = entry.get("hits", 0) / lookups if lookups else 0
+            print(f"{site:<8} {page_type:<16} {lookups:>8} {hit_rate:>8.1%} {entry.get('empty', 0):>6}  {entry.get('selector')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or reset learned fallback selectors')
+    parser.add_argument('--file', default=get_cache_file())
+    parser.add_argument('--reset', metavar='SITE', help='Forget the learned selectors of a site')
+    args = parser.parse_args()
+
+    cache = load_cache(args.file)
+    if args.reset:
+        if cache.pop(args.reset, None) is None:
+            print(f"❌ Nothing learned for {args.reset}")
+            return
+        with open(args.file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        print(f"🧹 Reset learned selectors for {args.reset}")
+        return
+    print_report(cache)
+
+
+if __name__ == "__main__":
+    main()
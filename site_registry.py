@@ -0,0 +1,179 @@
+"""
+Site Registry
+One place that lists every scraper in the project, the script that runs it,
+the file it writes, how to read that file back as unified product records and
+what it costs to run (parallel_scraper schedules sites against a CPU/RAM budget)
+"""
+
+import os
+from typing import Dict, Any, Iterator, Optional
+
+from utils import iter_json_array
+
+UNIFIED_FIELDS = [
+    "site",
+    "product_url",
+    "keyword_id",
+    "keyword",
+    "product_id",
+    "brand_name",
+    "product_name",
+    "product_rating",
+    "product_rating_count",
+    "current_product_price",
+    "original_product_price",
+    "product_color",
+    "product_description",
+    "product_sizes_available",
+    "product_sizes_coming_soon",
+    "product_sizes_out_of_stock",
+    "product_image_urls",
+    "additional_information",
+]
+
+
+def iter_unified_records(filepath: str) -> Iterator[Dict[str, Any]]:
+    """Records of scrapers that already write the unified structure"""
+    yield from iter_json_array(filepath)
+
+
+def iter_hm_records(filepath: str) -> Iterator[Dict[str, Any]]:
+    """H&M writes product_sizes/color_name and omits a few unified fields"""
+    for record in iter_json_array(filepath):
+        record["product_sizes_available"] = record.pop("product_sizes", record.get("product_sizes_available", []))
+        record["product_color"] = record.pop("color_name", record.get("product_color", "Not found"))
+        for field in UNIFIED_FIELDS:
+            if field not in record:
+                record[field] = [] if field.startswith("product_sizes") or field == "product_image_urls" else "Not applicable"
+        yield record
+
+
+def iter_ajio_api_records(filepath: str) -> Iterator[Dict[str, Any]]:
+    """The AJIO API scraper groups products per keyword with API field names"""
+    for group in iter_json_array(filepath):
+        for product in group.get("products", []):
+            product_id = product.get("id") or "Not found"
+            yield {
+                "site": "ajio",
+                "product_url": f"https://www.ajio.com/p/{product_id}" if product.get("id") else "Not found",
+                "keyword_id": group.get("keyword_id", "Not found"),
+                "keyword": group.get("keyword", ""),
+                "product_id": product_id,
+                "brand_name": product.get("brandName") or "Not found",
+                "product_name": product.get("name") or "Not found",
+                "product_rating": str(product.get("averageRating", "Not found")),
+                "product_rating_count": str(product.get("ratingsCount", "Not found")),
+                "current_product_price": str(product.get("currentPrice", "Not found")),
+                "original_product_price": str(product.get("originalPrice", "Not found")),
+                "product_color": "Not applicable",
+                "product_description": "Not applicable",
+                "product_sizes_available": product.get("sizes", []),
+                "product_sizes_coming_soon": [],
+                "product_sizes_out_of_stock": [],
+                "product_image_urls": product.get("images", []),
+                "additional_information": "Not applicable",
+            }
+
+
+# Rough footprint of one running scraper: a browser worker is Chrome (browser, renderer and GPU
+# processes) plus chromedriver; an HTTP worker is a single Python process
+BROWSER_COST = {"cpus": 1.0, "ram_mb": 1500}
+HTTP_COST = {"cpus": 0.25, "ram_mb": 150}
+
+# First and last keyword id the scrapers work on (update_ranges.py rewrites this line)
+KEYWORD_RANGE = (421, 525)
+
+# backend: "browser" (Selenium/Chrome) or "http" (plain requests)
+# keyword_range: (start_id, end_id) of keywords.json the script scrapes; a tuple of its own gives a site its own range
+# max_workers: most concurrent workers the site is given, however big the machine (rate limits)
+# queue_worker: the script honours SCRAPER_KEYWORD_IDS / SCRAPER_OUTPUT_FILE (see task_queue.py)
+SITES: Dict[str, Dict[str, Any]] = {
+    "nykaa": {
+        "name": "Nykaa",
+        "script": "nykaa.py",
+        "output": "nykaa_scraped_data.json",
+        "reader": iter_unified_records,
+        "backend": "browser",
+        "cost": BROWSER_COST,
+        "keyword_range": KEYWORD_RANGE,
+        "max_workers": 4,
+        "queue_worker": True,
+    },
+    "myntra": {
+        "name": "Myntra",
+        "script": "myntra.py",
+        "output": "myntra_scraped_data.json",
+        "reader": iter_unified_records,
+        "backend": "browser",
+        "cost": BROWSER_COST,
+        "keyword_range": KEYWORD_RANGE,
+        "max_workers": 4,
+        "queue_worker": True,
+    },
+    "zara": {
+        "name": "Zara",
+        "script": "zara.py",
+        "output": "zara_scraped_data.json",
+        "reader": iter_unified_records,
+        "backend": "browser",
+        "cost": BROWSER_COST,
+        "keyword_range": KEYWORD_RANGE,
+        "max_workers": 3,
+        "queue_worker": True,
+    },
+    "hm": {
+        "name": "H&M",
+        "script": "hm.py",
+        "output": "h&m_scraped_data.json",
+        "reader": iter_hm_records,
+        "backend": "browser",
+        "cost": BROWSER_COST,
+        "keyword_range": KEYWORD_RANGE,
+        "max_workers": 2,
+        "queue_worker": False,
+    },
+    "ajio": {
+        # The browser scraper only visits product pages; it does not save any records yet
+        "name": "Ajio",
+        "script": "ajio.py",
+        "output": None,
+        "reader": None,
+        "backend": "browser",
+        "cost": BROWSER_COST,
+        "keyword_range": KEYWORD_RANGE,
+        "max_workers": 1,
+        "queue_worker": False,
+    },
+    "ajio_api": {
+        "name": "Ajio API",
+        "script": "ajio_api.py",
+        "output": "ajio_scraped_data.json",
+        "reader": iter_ajio_api_records,
+        "backend": "http",
+        "cost": HTTP_COST,
+        "keyword_range": KEYWORD_RANGE,
+        "max_workers": 2,
+        "queue_worker": False,
+    },
+}
+
+
+def get_site(site_key: str) -> Dict[str, Any]:
+    """Look up a registered site, raising a helpful error for unknown keys"""
+    if site_key not in SITES:
+        raise KeyError(f"Unknown site '{site_key}'. Registered sites: {', '.join(SITES)}")
+    return SITES[site_key]
+
+
+def get_output_sites() -> Dict[str, Dict[str, Any]]:
+    """Sites that write an output file the combine stage can read"""
+    return {key: site for key, site in SITES.items() if site["output"] and site["reader"]}
+
+
+def iter_site_records(site_key: str, filepath: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream a site's output file as unified records"""
+    site = get_site(site_key)
+    filepath = filepath or site["output"]
+    if not filepath or not os.path.exists(filepath):
+        return iter(())
+    return site["reader"](filepath)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+HTML Snapshot Recorder
+Optionally saves every visited search and product page, gzip-compressed under its content
+hash, with an index.jsonl entry keyed by (site, product_url, timestamp). Bad records can
+then be debugged against the exact page the scraper saw, and extraction changes can be
+re-run offline instead of repeating a live scrape.
+
+Recording is off unless SCRAPER_SNAPSHOT_DIR is set. Pages are compressed and written by a
+background thread; the disk budget (SCRAPER_SNAPSHOT_BUDGET_MB, default 500) is enforced by
+evicting the least recently seen snapshots (a repeat visit to an identical page counts) and
+dropping their lines from index.jsonl. Several scrapers can share one directory: usage is
+re-measured on disk before evicting, and eviction holds an exclusive lock on index.lock
+where the platform has fcntl.
+
+Usage:
+    SCRAPER_SNAPSHOT_DIR=snapshots python zara.py
+    python snapshot_recorder.py list --site zara
+    python snapshot_recorder.py show <hash> -o page.html
+    python snapshot_recorder.py stats
+"""
+
+import argparse
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+import page_source
+from scraper_logging import get_logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+DEFAULT_BUDGET_MB = 500
+QUEUE_SIZE = 64
+RESCAN_EVERY = 50           # new objects between re-measuring the shared directory
+
+_recorder = None
+_recorder_checked = False
+
+
+class SnapshotRecorder:
+    """Writes snapshots from a background thread so capture() returns immediately"""
+
+    def __init__(self, snapshot_dir: str, budget_bytes: int):
+        self.snapshot_dir = snapshot_dir
+        self.objects_dir = os.path.join(snapshot_dir, "objects")
+        self.index_file = os.path.join(snapshot_dir, "index.jsonl")
+        self.lock_file = os.path.join(snapshot_dir, "index.lock")
+        self.budget_bytes = budget_bytes
+        self.dropped = 0
+        self.new_objects = 0
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.used_bytes = self._used_bytes()
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+
+    def _object_paths(self):
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name.endswith(".html.gz"):
+                    yield os.path.join(root, name)
+
+    def _used_bytes(self) -> int:
+        total = 0
+        for path in self._object_paths():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    @contextmanager
+    def _index_lock(self, exclusive: bool = False):
+        """Shared for appends, exclusive while evicting and compacting; a no-op without fcntl"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def object_path(self, content_hash: str) -> str:
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash}.html.gz")
+
+    def submit(self, html: str, entry: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait((html, entry))
+        except queue.Full:
+            # Never stall the scrape for a snapshot
+            self.dropped += 1
+
+    def _writer_loop(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except OSError as e:
+                logger.warning("⚠️ Could not write snapshot: %s", e)
+            finally:
+                self.queue.task_done()
+
+    def _write(self, html: str, entry: Dict[str, Any]) -> None:
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self.object_path(content_hash)
+        try:
+            # The mtime marks the last visit, so eviction keeps pages that keep coming back
+            os.utime(path, None)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(temp_path, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            self.used_bytes += os.path.getsize(path)
+            self.new_objects += 1
+            if self.used_bytes > self.budget_bytes or self.new_objects % RESCAN_EVERY == 0:
+                # Other scrapers write to the same directory; only the disk knows the real total
+                self.used_bytes = self._used_bytes()
+                if self.used_bytes > self.budget_bytes:
+                    self._evict()
+
+        entry.update({"hash": content_hash, "bytes": len(data)})
+        # One short append per line keeps concurrent scrapers from interleaving entries
+        with self._index_lock():
+            with open(self.index_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _evict(self) -> None:
+        """Remove the least recently seen snapshots until usage is under 90% of the budget, then compact the index"""
+        with self._index_lock(exclusive=True):
+            objects = []
+            for path in self._object_paths():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, path))
+            objects.sort()
+            # Another scraper may have evicted while we waited for the lock
+            self.used_bytes = sum(size for _, size, _ in objects)
+            target = self.budget_bytes * 0.9
+            kept = {os.path.basename(path)[:-len(".html.gz")] for _, _, path in objects}
+            evicted = 0
+            for _, size, path in objects:
+                if self.used_bytes <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self.used_bytes -= size
+                kept.discard(os.path.basename(path)[:-len(".html.gz")])
+                evicted += 1
+            if evicted:
+                self._compact_index(kept)
+                logger.info("🧹 Evicted %s snapshots, %.0f MB left", evicted, self.used_bytes / (1024 * 1024))
+
+    def _compact_index(self, kept) -> None:
+        """Drop index lines whose snapshot is gone; the caller holds the exclusive lock"""
+        temp_path = f"{self.index_file}.{os.getpid()}.tmp"
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as src, open(temp_path, "w", encoding="utf-8") as dst:
+                for line in src:
+                    try:
+                        if json.loads(line)["hash"] in kept:
+                            dst.write(line)
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            os.replace(temp_path, self.index_file)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        """Flush pending snapshots"""
+        self.queue.put(None)
+        self.thread.join(timeout=30)
+        if self.dropped:
+            logger.warning("⚠️ %s snapshots were dropped because the writer fell behind", self.dropped)
+
+
+def get_recorder() -> Optional[SnapshotRecorder]:
+    """The process-wide recorder, or None when SCRAPER_SNAPSHOT_DIR is not set"""
+    global _recorder, _recorder_checked
+    if not _recorder_checked:
+        _recorder_checked = True
+        snapshot_dir = os.environ.get("SCRAPER_SNAPSHOT_DIR")
+        if snapshot_dir:
+            budget_mb = float(os.environ.get("SCRAPER_SNAPSHOT_BUDGET_MB", DEFAULT_BUDGET_MB))
+            _recorder = SnapshotRecorder(snapshot_dir, int(budget_mb * 1024 * 1024))
+            atexit.register(_recorder.close)
+            logger.info("📸 Saving page snapshots to %s/ (budget %.0f MB)", snapshot_dir, budget_mb)
+    return _recorder
+
+
+def capture(driver, site: str, page_type: str, product_url: str = None, keyword_id=None, keyword: str = None) -> None:
+    """Snapshot the driver's current page; a no-op unless recording is enabled"""
+    recorder = get_recorder()
+    if recorder is None:
+        return
+    try:
+        # Search pages keep growing while they are scrolled, so only PDPs reuse a cached source
+        html = page_source.get_page_source(driver, refresh=page_type == "search")
+        url = driver.current_url
+    except Exception as e:
+        logger.warning("⚠️ Could not capture %s snapshot: %s", page_type, e)
+        return
+    recorder.submit(html, {
+        "site": site,
+        "page_type": page_type,
+        "product_url": product_url or url,
+        "url": url,
+        "keyword_id": keyword_id,
+        "keyword": keyword,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+
+
+def iter_index(snapshot_dir: str = DEFAULT_SNAPSHOT_DIR) -> Iterator[Dict[str, Any]]:
+    index_file = os.path.join(snapshot_dir, "index.jsonl")
+    if not os.path.exists(index_file):
+        return
+    with open(index_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def find_snapshots(snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, site: str = None, page_type: str = None,
+                   product_url: str = None) -> Iterator[Dict[str, Any]]:
+    """Index entries matching the filters whose snapshot is still on disk"""
+    for entry in iter_index(snapshot_dir):
+        if site and entry.get("site") != site:
+            continue
+        if page_type and entry.get("page_type") != page_type:
+            continue
+        if product_url and entry.get("product_url") != product_url:
+            continue
+        if os.path.exists(os.path.join(snapshot_dir, "objects", entry["hash"][:2], f"{entry['hash']}.html.gz")):
+            yield entry
+
+
+def load_snapshot(content_hash: str, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR) -> str:
+    path = os.path.join(snapshot_dir, "objects", content_hash[:2], f"{content_hash}.html.gz")
+    with gzip.open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Browse recorded page snapshots')
+    parser.add_argument('--dir', default=os.environ.get("SCRAPER_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help='List snapshots')
+    list_parser.add_argument('--site')
+    list_parser.add_argument('--type', choices=['search', 'pdp'])
+    list_parser.add_argument('--url', help='Only snapshots of this product URL')
+
+    show_parser = subparsers.add_parser('show', help='Print or save one snapshot')
+    show_parser.add_argument('hash')
+    show_parser.add_argument('-o', '--output', help='Write the HTML here instead of printing it')
+
+    subparsers.add_parser('stats', help='Snapshot counts and disk usage')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for entry in find_snapshots(args.dir, args.site, args.type, args.url):
+            print(f"{entry['timestamp']}  {entry['site']:<8} {entry['page_type']:<6} {entry['hash'][:16]}  {entry['product_url']}")
+    elif args.command == 'show':
+        matches = [entry["hash"] for entry in iter_index(args.dir) if entry["hash"].startswith(args.hash)]
+        if not matches:
+            print(f"❌ No snapshot matching {args.hash}")
+            return
+        html = load_snapshot(matches[0], args.dir)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(html)
+            print(f"💾 Saved {matches[0][:16]} to {args.output}")
+        else:
+            print(html)
+    elif args.command == 'stats':
+        counts = {}
+        for entry in iter_index(args.dir):
+            key = (entry["site"], entry["page_type"])
+            counts[key] = counts.get(key, 0) + 1
+        for (site, page_type), count in sorted(counts.items()):
+            print(f"{site:<10} {page_type:<6} {count:>7}")
+        objects_dir = os.path.join(args.dir, "objects")
+        total = sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(objects_dir) for name in files)
+        print(f"📦 {total / (1024 * 1024):.1f} MB on disk in {args.dir}/")
+
+
+if __name__ == "__main__":
+    main()
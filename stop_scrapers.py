@@ -9,6 +9,10 @@ import signal
 import subprocess
 import sys
 
+from site_registry import SITES, get_output_sites
+
+SCRAPER_SCRIPTS = {site["script"] for site in SITES.values()} | {"parallel_scraper.py"}
+
 def find_scraper_processes():
     """Find running scraper processes"""
     try:
@@ -20,9 +24,11 @@ def find_scraper_processes():
         
         processes = []
         for line in result.stdout.split('\n'):
-            if any(scraper in line for scraper in ['nykaa.py', 'myntra.py', 'zara.py', 'parallel_scraper.py']):
-                parts = line.split()
-                if len(parts) > 1:
+            parts = line.split()
+            # Only python processes running a scraper script, so e.g. "vim hm.py" is left alone.
+            # macOS framework and Homebrew builds run as "Python".
+            if len(parts) > 11 and "python" in os.path.basename(parts[10]).lower():
+                if any(os.path.basename(arg) in SCRAPER_SCRIPTS for arg in parts[11:]):
                     pid = parts[1]
                     processes.append({
                         'pid': int(pid),
@@ -66,9 +72,8 @@ def stop_scrapers():
     
     print(f"\n🎉 Gracefully stopped {stopped_count} scraper(s)")
     print("📁 Check for individual scraper data files:")
-    print("   - nykaa_scraped_data.json")
-    print("   - myntra_scraped_data.json") 
-    print("   - zara_scraped_data.json")
+    for site in get_output_sites().values():
+        print(f"   - {site['output']}")
 
 def main():
     print("🛑 Scraper Shutdown Tool")
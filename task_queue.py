@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Leased Task Queue
+Spreads one scraping run across several machines through a shared SQLite task table.
+Workers claim (site, keyword_id) tasks under time-limited leases, renew the leases while
+scraping and push results back. Expired leases are reclaimed by whichever worker claims next,
+so there is no central process to bottleneck on and no task is scraped twice. Keywords the
+scraper did not finish (its checkpoint lists the finished ones) go back to the queue and are
+retried up to --max-attempts times.
+
+Usage:
+    # Coordinator: seed the task table once (safe to re-run, existing tasks are kept)
+    python task_queue.py init --db tasks.db --sites nykaa myntra --start 421 --end 525
+
+    # Workers: start as many as you like, on any machine that can reach tasks.db
+    python task_queue.py worker --db tasks.db --site nykaa
+
+    # Progress and results
+    python task_queue.py status --db tasks.db
+    python task_queue.py export --db tasks.db -o scraped_data_4.json
+
+The database must live on a filesystem with working POSIX file locks (local disk or a
+properly configured NFS mount) so that SQLite can serialize claims between nodes.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+import heartbeat
+from site_registry import SITES
+from utils import write_json_array
+
+# Scrapers that honour SCRAPER_KEYWORD_IDS / SCRAPER_OUTPUT_FILE and can run as queue workers
+QUEUE_SITES = {key: site["script"] for key, site in SITES.items() if site["queue_worker"]}
+
+DEFAULT_DB_FILE = "tasks.db"
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_BATCH_SIZE = 5
+DEFAULT_MAX_ATTEMPTS = 3
+RESULTS_DIR = "queue_results"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    site TEXT NOT NULL,
+    keyword_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL,
+    PRIMARY KEY (site, keyword_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (site, status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    site TEXT NOT NULL,
+    keyword_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    product TEXT NOT NULL,
+    PRIMARY KEY (site, keyword_id, position)
+);
+"""
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open the task database with manual transaction control"""
+    conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def init_queue(db_path: str, sites: List[str], keywords_data: List[Dict[str, Any]]) -> int:
+    """Seed one task per (site, keyword). Existing tasks and their progress are left untouched."""
+    conn = connect(db_path)
+    now = time.time()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        before = conn.total_changes
+        for site in sites:
+            for keyword_obj in keywords_data:
+                conn.execute(
+                    "INSERT OR IGNORE INTO tasks (site, keyword_id, keyword, updated_at) VALUES (?, ?, ?, ?)",
+                    (site, str(keyword_obj["id"]), keyword_obj["keyword"], now)
+                )
+        added = conn.total_changes - before
+        conn.execute("COMMIT")
+        return added
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def _reclaim_expired(conn: sqlite3.Connection, now: float, max_attempts: int) -> int:
+    """Return expired leases to the pool, or fail them once they ran out of attempts"""
+    cursor = conn.execute(
+        """UPDATE tasks
+           SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+               owner = NULL, lease_expires = NULL, updated_at = ?
+           WHERE status = 'leased' AND lease_expires < ?""",
+        (max_attempts, now, now)
+    )
+    return cursor.rowcount
+
+
+def claim_tasks(db_path: str, site: str, worker_id: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[Dict[str, Any]]:
+    """Atomically lease up to batch_size pending tasks of a site to this worker"""
+    conn = connect(db_path)
+    now = time.time()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        reclaimed = _reclaim_expired(conn, now, max_attempts)
+        if reclaimed:
+            print(f"♻️ Reclaimed {reclaimed} expired lease(s)")
+
+        rows = conn.execute(
+            """SELECT keyword_id, keyword FROM tasks
+               WHERE site = ? AND status = 'pending'
+               ORDER BY CAST(keyword_id AS INTEGER) LIMIT ?""",
+            (site, batch_size)
+        ).fetchall()
+
+        for keyword_id, _ in rows:
+            conn.execute(
+                """UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?,
+                   attempts = attempts + 1, updated_at = ?
+                   WHERE site = ? AND keyword_id = ?""",
+                (worker_id, now + lease_seconds, now, site, keyword_id)
+            )
+        conn.execute("COMMIT")
+        return [{"id": keyword_id, "keyword": keyword} for keyword_id, keyword in rows]
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def renew_leases(db_path: str, site: str, worker_id: str, keyword_ids: List[str],
+                 lease_seconds: int = DEFAULT_LEASE_SECONDS) -> bool:
+    """Extend this worker's leases. Returns False if any of them was lost to another worker."""
+    conn = connect(db_path)
+    now = time.time()
+    try:
+        placeholders = ",".join("?" for _ in keyword_ids)
+        cursor = conn.execute(
+            f"""UPDATE tasks SET lease_expires = ?, updated_at = ?
+                WHERE site = ? AND owner = ? AND status = 'leased' AND keyword_id IN ({placeholders})""",
+            [now + lease_seconds, now, site, worker_id] + list(keyword_ids)
+        )
+        return cursor.rowcount == len(keyword_ids)
+    finally:
+        conn.close()
+
+
+def complete_tasks(db_path: str, site: str, worker_id: str,
+                   products_by_keyword: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    """Store results and mark tasks done. Tasks no longer leased to this worker are rejected."""
+    conn = connect(db_path)
+    now = time.time()
+    accepted = []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for keyword_id, products in products_by_keyword.items():
+            owned = conn.execute(
+                "SELECT 1 FROM tasks WHERE site = ? AND keyword_id = ? AND owner = ? AND status = 'leased'",
+                (site, keyword_id, worker_id)
+            ).fetchone()
+            if not owned:
+                print(f"⚠️ Lease on {site}/{keyword_id} was lost - discarding {len(products)} products")
+                continue
+
+            conn.execute("DELETE FROM results WHERE site = ? AND keyword_id = ?", (site, keyword_id))
+            conn.executemany(
+                "INSERT INTO results (site, keyword_id, position, product) VALUES (?, ?, ?, ?)",
+                [(site, keyword_id, position, json.dumps(product, ensure_ascii=False))
+                 for position, product in enumerate(products)]
+            )
+            conn.execute(
+                """UPDATE tasks SET status = 'done', owner = NULL, lease_expires = NULL, updated_at = ?
+                   WHERE site = ? AND keyword_id = ?""",
+                (now, site, keyword_id)
+            )
+            accepted.append(keyword_id)
+        conn.execute("COMMIT")
+        return accepted
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def release_tasks(db_path: str, site: str, worker_id: str, keyword_ids: List[str],
+                  max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> None:
+    """Give leased tasks back after a failed attempt so another worker can retry them"""
+    conn = connect(db_path)
+    now = time.time()
+    try:
+        placeholders = ",".join("?" for _ in keyword_ids)
+        conn.execute(
+            f"""UPDATE tasks
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE site = ? AND owner = ? AND status = 'leased' AND keyword_id IN ({placeholders})""",
+            [max_attempts, now, site, worker_id] + list(keyword_ids)
+        )
+    finally:
+        conn.close()
+
+
+def count_open_tasks(db_path: str, site: str) -> int:
+    """Number of tasks of a site that are still pending or leased"""
+    conn = connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE site = ? AND status IN ('pending', 'leased')", (site,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def get_status(db_path: str) -> Dict[str, Dict[str, int]]:
+    """Task counts per site and status"""
+    conn = connect(db_path)
+    try:
+        status = {}
+        for site, task_status, count in conn.execute(
+                "SELECT site, status, COUNT(*) FROM tasks GROUP BY site, status ORDER BY site"):
+            status.setdefault(site, {})[task_status] = count
+        return status
+    finally:
+        conn.close()
+
+
+def iter_results(db_path: str):
+    """Yield stored products in (site, keyword_id, position) order"""
+    conn = connect(db_path)
+    try:
+        for (product,) in conn.execute(
+                "SELECT product FROM results ORDER BY site, CAST(keyword_id AS INTEGER), position"):
+            yield json.loads(product)
+    finally:
+        conn.close()
+
+
+class LeaseKeeper(threading.Thread):
+    """Background thread that renews a worker's leases while its scraper is running"""
+
+    def __init__(self, db_path, site, worker_id, keyword_ids, lease_seconds, on_lost=None):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.site = site
+        self.worker_id = worker_id
+        self.keyword_ids = keyword_ids
+        self.lease_seconds = lease_seconds
+        self.on_lost = on_lost
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        interval = max(1, self.lease_seconds / 3)
+        while not self._stop_event.wait(interval):
+            try:
+                if renew_leases(self.db_path, self.site, self.worker_id, self.keyword_ids, self.lease_seconds):
+                    continue
+                print(f"⚠️ Lost lease on {self.site} tasks {self.keyword_ids}")
+                self.lost = True
+                if self.on_lost:
+                    self.on_lost()
+                return
+            except sqlite3.Error as e:
+                # A busy database is not a lost lease; try again on the next tick
+                print(f"⚠️ Could not renew leases: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_batch(db_path: str, site: str, worker_id: str, tasks: List[Dict[str, Any]],
+              lease_seconds: int = DEFAULT_LEASE_SECONDS,
+              max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> bool:
+    """Run the site scraper over a batch of leased tasks and push its results back.
+
+    Only keywords the scraper's checkpoint lists as finished are completed; the rest of the
+    batch (failed, timed out or given up on) goes back to the queue for another attempt.
+    """
+    keyword_ids = [task["id"] for task in tasks]
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    safe_worker_id = worker_id.replace(":", "_").replace("/", "_")
+    output_file = os.path.join(RESULTS_DIR, f"{site}_{safe_worker_id}_{keyword_ids[0]}.json")
+    checkpoint_file = os.path.join(RESULTS_DIR, f"{site}_{safe_worker_id}_{keyword_ids[0]}.checkpoint.json")
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    env = os.environ.copy()
+    env["SCRAPER_KEYWORD_IDS"] = ",".join(keyword_ids)
+    env["SCRAPER_OUTPUT_FILE"] = output_file
+    env["SCRAPER_WORKER_ID"] = worker_id
+    env["SCRAPER_CHECKPOINT_FILE"] = checkpoint_file
+    env.setdefault("SCRAPER_METRICS_FILE", os.path.join("metrics", f"{site}_{safe_worker_id}.prom"))
+
+    print(f"🚀 [{worker_id}] Scraping {site} keywords {keyword_ids}")
+    process = subprocess.Popen([sys.executable, QUEUE_SITES[site]], env=env)
+    keeper = LeaseKeeper(db_path, site, worker_id, keyword_ids, lease_seconds, on_lost=process.terminate)
+    keeper.start()
+    try:
+        returncode = process.wait()
+    except KeyboardInterrupt:
+        process.wait()
+        release_tasks(db_path, site, worker_id, keyword_ids, max_attempts)
+        raise
+    finally:
+        keeper.stop()
+
+    _, done_keyword_ids = heartbeat.load_checkpoint(checkpoint_file)
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    if keeper.lost:
+        # Another worker owns these tasks now; pushing our copy would double-count them
+        return False
+
+    if returncode != 0 or not os.path.exists(output_file):
+        print(f"❌ {site} scraper exited with code {returncode} - returning tasks to the queue")
+        release_tasks(db_path, site, worker_id, keyword_ids, max_attempts)
+        return False
+
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Could not read {output_file}: {e}")
+        release_tasks(db_path, site, worker_id, keyword_ids, max_attempts)
+        return False
+
+    finished = [keyword_id for keyword_id in keyword_ids if keyword_id in done_keyword_ids]
+    unfinished = [keyword_id for keyword_id in keyword_ids if keyword_id not in done_keyword_ids]
+    products_by_keyword = {keyword_id: [] for keyword_id in finished}
+    for product in products:
+        # Partial products of an unfinished keyword are dropped; its retry scrapes it whole
+        if str(product.get("keyword_id")) in products_by_keyword:
+            products_by_keyword[str(product.get("keyword_id"))].append(product)
+
+    accepted = complete_tasks(db_path, site, worker_id, products_by_keyword)
+    if unfinished:
+        print(f"⚠️ [{worker_id}] {site} keywords {unfinished} did not finish - returning them to the queue")
+        release_tasks(db_path, site, worker_id, unfinished, max_attempts)
+    os.remove(output_file)
+    pushed = sum(len(keyword_products) for keyword_products in products_by_keyword.values())
+    print(f"✅ [{worker_id}] Pushed {pushed} {site} products for {len(accepted)} keyword(s)")
+    return True
+
+
+def run_worker(db_path: str, site: str, worker_id: Optional[str] = None,
+               batch_size: int = DEFAULT_BATCH_SIZE, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS, poll_interval: int = 30) -> None:
+    """Claim and scrape batches of a site's tasks until none are left open"""
+    if site not in QUEUE_SITES:
+        raise ValueError(f"Unknown site '{site}'. Choose from: {', '.join(QUEUE_SITES)}")
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{site}"
+    print(f"👷 Worker {worker_id} started for {site}")
+
+    while True:
+        tasks = claim_tasks(db_path, site, worker_id, batch_size, lease_seconds, max_attempts)
+        if tasks:
+            run_batch(db_path, site, worker_id, tasks, lease_seconds, max_attempts)
+            continue
+
+        if count_open_tasks(db_path, site) == 0:
+            print(f"🏁 Worker {worker_id}: no {site} tasks left")
+            return
+
+        # Other workers hold the remaining leases; wait in case one of them expires
+        time.sleep(poll_interval)
+
+
+def main():
+    """Command line entry point for the coordinator and worker roles"""
+    parser = argparse.ArgumentParser(description='Leased task queue for multi-node scraping')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    init_parser = subparsers.add_parser('init', help='Seed the task table')
+    init_parser.add_argument('--db', default=DEFAULT_DB_FILE)
+    init_parser.add_argument('--sites', nargs='+', default=list(QUEUE_SITES), choices=list(QUEUE_SITES))
+    init_parser.add_argument('--keywords', default='keywords.json')
+    init_parser.add_argument('--start', type=int, default=1)
+    init_parser.add_argument('--end', type=int, default=sys.maxsize)
+
+    worker_parser = subparsers.add_parser('worker', help='Claim and scrape tasks')
+    worker_parser.add_argument('--db', default=DEFAULT_DB_FILE)
+    worker_parser.add_argument('--site', required=True, choices=list(QUEUE_SITES))
+    worker_parser.add_argument('--worker-id')
+    worker_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    worker_parser.add_argument('--lease', type=int, default=DEFAULT_LEASE_SECONDS, help='Lease length in seconds')
+    worker_parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+
+    status_parser = subparsers.add_parser('status', help='Show task counts')
+    status_parser.add_argument('--db', default=DEFAULT_DB_FILE)
+
+    export_parser = subparsers.add_parser('export', help='Write all pushed results to a JSON file')
+    export_parser.add_argument('--db', default=DEFAULT_DB_FILE)
+    export_parser.add_argument('-o', '--output', default='scraped_data_4.json')
+
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        with open(args.keywords, 'r') as f:
+            keywords_data = json.load(f)
+        selected = [k for k in keywords_data if args.start <= int(k["id"]) <= args.end]
+        added = init_queue(args.db, args.sites, selected)
+        print(f"📋 Added {added} new task(s) for {len(selected)} keywords across {len(args.sites)} site(s)")
+    elif args.command == 'worker':
+        run_worker(args.db, args.site, args.worker_id, args.batch_size, args.lease, args.max_attempts)
+    elif args.command == 'status':
+        for site, counts in get_status(args.db).items():
+            summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+            print(f"{site}: {summary}")
+    elif args.command == 'export':
+        count = write_json_array(iter_results(args.db), args.output)
+        print(f"🎉 Exported {count} products to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
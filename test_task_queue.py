@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for task_queue: claiming, lease expiry and reclaim, renewal, the ownership check on
+completion, and run_batch returning the keywords a scraper did not finish to the queue.
+"""
+
+import time
+
+import task_queue
+
+KEYWORDS = [{"id": str(keyword_id), "keyword": f"keyword {keyword_id}"} for keyword_id in range(1, 7)]
+
+
+def make_queue(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    task_queue.init_queue(db_path, ["nykaa"], KEYWORDS)
+    return db_path
+
+
+def task_row(db_path, keyword_id):
+    conn = task_queue.connect(db_path)
+    try:
+        return conn.execute("SELECT status, owner, attempts FROM tasks WHERE site = 'nykaa' AND keyword_id = ?",
+                            (keyword_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_claims_do_not_overlap(tmp_path):
+    db_path = make_queue(tmp_path)
+    first = task_queue.claim_tasks(db_path, "nykaa", "a", batch_size=3)
+    second = task_queue.claim_tasks(db_path, "nykaa", "b", batch_size=3)
+    assert [task["id"] for task in first] == ["1", "2", "3"]
+    assert [task["id"] for task in second] == ["4", "5", "6"]
+    assert task_queue.claim_tasks(db_path, "nykaa", "c", batch_size=3) == []
+    assert task_row(db_path, "1") == ("leased", "a", 1)
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    db_path = make_queue(tmp_path)
+    task_queue.claim_tasks(db_path, "nykaa", "a", batch_size=2, lease_seconds=-1)
+    reclaimed = task_queue.claim_tasks(db_path, "nykaa", "b", batch_size=2)
+    assert [task["id"] for task in reclaimed] == ["1", "2"]
+    assert task_row(db_path, "1") == ("leased", "b", 2)
+
+
+def test_expired_lease_fails_after_max_attempts(tmp_path):
+    db_path = make_queue(tmp_path)
+    for worker_id in ("a", "b"):
+        task_queue.claim_tasks(db_path, "nykaa", worker_id, batch_size=1, lease_seconds=-1, max_attempts=2)
+    task_queue.claim_tasks(db_path, "nykaa", "c", batch_size=1, max_attempts=2)
+    assert task_row(db_path, "1") == ("failed", None, 2)
+    assert task_row(db_path, "2") == ("leased", "c", 1)
+
+
+def test_renewal_keeps_lease_and_detects_loss(tmp_path):
+    db_path = make_queue(tmp_path)
+    task_queue.claim_tasks(db_path, "nykaa", "a", batch_size=2, lease_seconds=1)
+    assert task_queue.renew_leases(db_path, "nykaa", "a", ["1", "2"], lease_seconds=600)
+    time.sleep(1.1)
+    # Renewed, so the lease outlives its original second and nobody can reclaim it
+    assert [task["id"] for task in task_queue.claim_tasks(db_path, "nykaa", "b", batch_size=2)] == ["3", "4"]
+    assert not task_queue.renew_leases(db_path, "nykaa", "b", ["1", "2"])
+
+    task_queue.claim_tasks(db_path, "nykaa", "c", batch_size=2, lease_seconds=-1)
+    task_queue.claim_tasks(db_path, "nykaa", "d", batch_size=2)
+    assert not task_queue.renew_leases(db_path, "nykaa", "c", ["5", "6"])
+
+
+def test_complete_tasks_checks_ownership(tmp_path):
+    db_path = make_queue(tmp_path)
+    task_queue.claim_tasks(db_path, "nykaa", "a", batch_size=1, lease_seconds=-1)
+    task_queue.claim_tasks(db_path, "nykaa", "b", batch_size=1)
+    product = {"keyword_id": "1", "product_name": "dress"}
+
+    assert task_queue.complete_tasks(db_path, "nykaa", "a", {"1": [product]}) == []
+    assert task_row(db_path, "1") == ("leased", "b", 2)
+    assert task_queue.complete_tasks(db_path, "nykaa", "b", {"1": [product]}) == ["1"]
+    assert task_row(db_path, "1") == ("done", None, 2)
+    assert list(task_queue.iter_results(db_path)) == [product]
+
+
+def test_release_returns_tasks_to_pending(tmp_path):
+    db_path = make_queue(tmp_path)
+    task_queue.claim_tasks(db_path, "nykaa", "a", batch_size=2)
+    task_queue.release_tasks(db_path, "nykaa", "b", ["1"])
+    task_queue.release_tasks(db_path, "nykaa", "a", ["2"])
+    assert task_row(db_path, "1") == ("leased", "a", 1)
+    assert task_row(db_path, "2") == ("pending", None, 1)
+
+
+def test_run_batch_releases_unfinished_keywords(tmp_path, monkeypatch):
+    db_path = make_queue(tmp_path)
+    # Stands in for a scraper that finished keyword 1, gave up on 2 and never reached 3
+    script = tmp_path / "fake_scraper.py"
+    script.write_text(
+        "import json, os\n"
+        "products = [{'keyword_id': '1', 'product_name': 'dress'}, {'keyword_id': '2', 'product_name': 'partial'}]\n"
+        "json.dump(products, open(os.environ['SCRAPER_OUTPUT_FILE'], 'w'))\n"
+        "json.dump({'done_keyword_ids': ['1'], 'products': products}, open(os.environ['SCRAPER_CHECKPOINT_FILE'], 'w'))\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(task_queue.QUEUE_SITES, "nykaa", str(script))
+    monkeypatch.setenv("SCRAPER_METRICS_FILE", str(tmp_path / "worker.prom"))
+
+    tasks = task_queue.claim_tasks(db_path, "nykaa", "a", batch_size=3)
+    assert task_queue.run_batch(db_path, "nykaa", "a", tasks)
+
+    assert task_row(db_path, "1") == ("done", None, 1)
+    assert task_row(db_path, "2") == ("pending", None, 1)
+    assert task_row(db_path, "3") == ("pending", None, 1)
+    assert list(task_queue.iter_results(db_path)) == [{"keyword_id": "1", "product_name": "dress"}]
+    assert list((tmp_path / task_queue.RESULTS_DIR).iterdir()) == []
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for zara_images: the compiled classifier must give exactly the same answers as the
+original is_valid_product_image / clean_image_url from zara.py, copied below as reference.
+"""
+
+import glob
+import itertools
+import json
+import re
+
+from zara_images import is_valid_product_image, clean_image_url, classify_image_urls, unique_product_images
+
+
+def legacy_is_valid_product_image(url):
+    """Check if URL is a valid product image (not marketing/banner)"""
+    if not url:
+        return False
+
+    exclude_patterns = [
+        'transparent-background', 'stdstatic', 'poster', 'subhome', 'xmedia', 'joinlife',
+        'anniversary', 'north-woman', 'north-kids', 'north-man', 'beauty', 'arizona',
+        'image-portrait-fit', 'image-landscape-fit', 'image-portrait-fill', 'image-landscape-fill',
+    ]
+    for pattern in exclude_patterns:
+        if pattern in url.lower():
+            return False
+
+    if 'static.zara.net/assets/public' not in url:
+        return False
+
+    if not any(ext in url.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
+        return False
+
+    product_patterns = ['-p.jpg', '-a1.jpg', '-e1.jpg', '-e2.jpg', '-e3.jpg', '-e4.jpg', '-a2.jpg', '-a3.jpg', '-a4.jpg']
+    for pattern in product_patterns:
+        if pattern in url:
+            return True
+
+    product_id_pattern = r'/\d{11}-[pae]\d*\.jpg'
+    if re.search(product_id_pattern, url):
+        return True
+
+    flexible_pattern = r'/\d{11}-[a-z]\d*\.jpg'
+    if re.search(flexible_pattern, url):
+        return True
+
+    if '/assets/public/' in url and any(ext in url for ext in ['.jpg', '.jpeg', '.png', '.webp']):
+        if re.search(r'/\d{6,12}', url):
+            return True
+
+    return False
+
+
+def legacy_clean_image_url(url):
+    """Clean and normalize image URL"""
+    if not url:
+        return None
+    url = url.replace('&w={width}', '').replace('&w=1920', '').replace('&w=2400', '')
+    url = url.replace('&amp;', '&')
+    if '?' in url:
+        base_url = url.split('?')[0]
+        if 'ts=' in url:
+            ts_part = url.split('ts=')[1].split('&')[0]
+            url = f"{base_url}?ts={ts_part}"
+        else:
+            url = base_url
+    return url.strip()
+
+
+def legacy_unique(urls):
+    image_urls = []
+    for url in urls:
+        if legacy_is_valid_product_image(url):
+            clean_url = legacy_clean_image_url(url)
+            if clean_url and clean_url not in image_urls:
+                image_urls.append(clean_url)
+    return image_urls
+
+
+def url_corpus():
+    """Realistic, marketing, malformed and case-varied URLs"""
+    hosts = ["https://static.zara.net/assets/public/", "https://STATIC.ZARA.NET/assets/public/",
+             "https://static.zara.net/assets/publicx/", "https://static.zara.net/stdstatic/", "https://cdn.example.com/"]
+    paths = ["7c1d/05b4/04387021800-p.jpg", "7c1d/05b4/04387021800-a3.jpg", "7c1d/05b4/04387021800-e9.jpg",
+             "7c1d/05b4/04387021800-x1.jpg", "7c1d/05b4/04387021800-P.JPG", "7c1d/05b4/4387021800-p1.jpg",
+             "7c1d/05b4/043870-p.jpeg", "7c1d/05b4/0438702.webp", "7c1d/05b4/0438702.WEBP", "7c1d/05b4/image-p.png",
+             "north-woman/banner-1234567.jpg", "subhome-xmedia-01/2025.jpg", "Beauty/Perfume-12345678.jpg",
+             "transparent-background.png", "7c1d/05b4/04387021800-p.jpg/poster.jpg", "7c1d/abc/def.gif",
+             "7c1d/05b4/04387021800-a.jpg", "joinlife/04387021800-p.jpg", "ARIZONA/04387021800-p.jpg",
+             "7c1d/05b4/٤٣٨٧٠٢١٨٠٠٠-p1.jpg",
+             "7c1d/05b4/arİzona-04387021800.jpg"]
+    queries = ["", "?ts=1718000000000&w={width}", "?ts=1718000000000&amp;w=1920", "?w=2400", "?ts=1&w=750&f=auto",
+               "?foo=bar", "  ", "?ts="]
+    corpus = [None, "", " ", "static.zara.net/assets/public", "https://static.zara.net/assets/public/"]
+    corpus += [host + path + query for host, path, query in itertools.product(hosts, paths, queries)]
+
+    # Plus whatever real image URLs the repo's scraped data holds
+    for filepath in glob.glob("*.json"):
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, list):
+            for record in data[:2000]:
+                if isinstance(record, dict):
+                    corpus.extend(url for url in record.get("product_image_urls", []) if isinstance(url, str))
+    return corpus
+
+
+def test_is_valid_product_image_matches_legacy():
+    for url in url_corpus():
+        assert is_valid_product_image(url) == legacy_is_valid_product_image(url), url
+
+
+def test_clean_image_url_matches_legacy():
+    for url in url_corpus():
+        assert clean_image_url(url) == legacy_clean_image_url(url), url
+
+
+def test_batch_helpers_match_legacy():
+    corpus = url_corpus()
+    assert classify_image_urls(corpus) == [legacy_is_valid_product_image(url) for url in corpus]
+    doubled = corpus + list(reversed(corpus))
+    assert unique_product_images(doubled) == legacy_unique(doubled)
+
+
+def test_unique_product_images_skips_existing():
+    first = "https://static.zara.net/assets/public/7c1d/05b4/04387021800-p.jpg?ts=1&w=1920"
+    second = "https://static.zara.net/assets/public/7c1d/05b4/04387021800-a1.jpg?ts=1"
+    existing = [clean_image_url(first)]
+    assert unique_product_images([first, second, second], existing) == [clean_image_url(second)]
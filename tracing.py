@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Span Tracing
+Lightweight per-phase spans written as Chrome trace-event JSON, so a run can be opened
+in chrome://tracing or https://ui.perfetto.dev to see which step dominates for each site.
+
+Scrapers call start_tracing(site) once; tracing is only active when SCRAPER_TRACE_FILE
+(one file) or SCRAPER_TRACE_DIR (one file per process) is set. Events are appended as they
+finish using the JSON array format, whose closing bracket is optional, so a trace stays
+readable even if the scraper is killed mid-run.
+
+Usage:
+    # Merge the per-site traces of one parallel_scraper run into a single file
+    python tracing.py traces/20250101_120000 -o run_trace.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_trace_file = None
+_site = "unknown"
+_pid = os.getpid()
+
+
+def is_enabled() -> bool:
+    return _trace_file is not None
+
+
+def _write_event(event) -> None:
+    with _lock:
+        if _trace_file is None:
+            return
+        _trace_file.write(json.dumps(event, ensure_ascii=False) + ",\n")
+        _trace_file.flush()
+
+
+def start_tracing(site: str, filepath: str = None) -> str:
+    """Open this process's trace file if the environment (or caller) asks for one"""
+    global _trace_file, _site
+    _site = site
+    if _trace_file is not None:
+        return _trace_file.name
+
+    filepath = filepath or os.environ.get("SCRAPER_TRACE_FILE")
+    trace_dir = os.environ.get("SCRAPER_TRACE_DIR")
+    if not filepath and trace_dir:
+        filepath = os.path.join(trace_dir, f"{site}_{time.strftime('%Y%m%d_%H%M%S')}_{_pid}.json")
+    if not filepath:
+        return None
+
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _trace_file = open(filepath, 'w', encoding='utf-8')
+    _trace_file.write("[\n")
+    worker = os.environ.get("SCRAPER_WORKER_ID") or f"{socket.gethostname()}:{_pid}"
+    _write_event({"name": "process_name", "ph": "M", "pid": _pid, "args": {"name": f"{site} ({worker})"}})
+    print(f"🧭 Writing trace events to {filepath}")
+    return filepath
+
+
+def add_span(name: str, started_at: float, ended_at: float = None, category: str = None, **args) -> None:
+    """Record a finished span from time.time() timestamps"""
+    if _trace_file is None:
+        return
+    ended_at = ended_at or time.time()
+    event = {
+        "name": name,
+        "cat": category or _site,
+        "ph": "X",
+        "ts": int(started_at * 1_000_000),
+        "dur": max(int((ended_at - started_at) * 1_000_000), 1),
+        "pid": _pid,
+        "tid": threading.get_ident(),
+    }
+    if args:
+        event["args"] = {key: str(value) for key, value in args.items()}
+    _write_event(event)
+
+
+@contextmanager
+def span(name: str, category: str = None, **args):
+    """Time the enclosed block as one span"""
+    started_at = time.time()
+    try:
+        yield
+    finally:
+        add_span(name, started_at, category=category, **args)
+
+
+def instant(name: str, **args) -> None:
+    """Mark a point in time (e.g. a driver restart)"""
+    if _trace_file is None:
+        return
+    event = {"name": name, "cat": _site, "ph": "i", "s": "p", "ts": int(time.time() * 1_000_000),
+             "pid": _pid, "tid": threading.get_ident()}
+    if args:
+        event["args"] = {key: str(value) for key, value in args.items()}
+    _write_event(event)
+
+
+def sleep(seconds: float, name: str = "sleep") -> None:
+    """time.sleep that shows up as its own span, so fixed waits are visible in the trace"""
+    with span(name, category="wait", seconds=seconds):
+        time.sleep(seconds)
+
+
+def load_trace_events(filepath: str):
+    """Read a trace file written by this module (one event per line).
+
+    A missing closing bracket is fine, and so is a half-written last event from a worker that
+    was killed mid-write: that line is dropped. A bad line anywhere else is an error.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    lines = [line for line in lines if line and line not in ('[', ']')]
+    events = []
+    for number, line in enumerate(lines, 1):
+        try:
+            events.append(json.loads(line.rstrip(',')))
+        except json.JSONDecodeError:
+            if number == len(lines):
+                break
+            raise
+    return events
+
+
+def merge_traces(trace_dir: str, output_file: str) -> int:
+    """Merge every trace file in trace_dir into one Chrome trace file"""
+    events = []
+    for filepath in sorted(glob.glob(os.path.join(trace_dir, '*.json'))):
+        try:
+            events.extend(load_trace_events(filepath))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Skipping unreadable trace {filepath}: {e}")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge per-process scraper traces into one Chrome trace file')
+    parser.add_argument('trace_dir', help='Directory with the trace files of one run')
+    parser.add_argument('-o', '--output', default='run_trace.json')
+    args = parser.parse_args()
+
+    count = merge_traces(args.trace_dir, args.output)
+    print(f"🧭 Merged {count} events into {args.output} - open it in chrome://tracing or ui.perfetto.dev")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,35 @@
 #!/usr/bin/env python3
 """
 Range Updater Script
-Updates the keyword ranges in all scraper files
+Updates the keyword range all scrapers read from site_registry (KEYWORD_RANGE)
 """
 
 import re
-import os
 
-def update_ranges_in_file(file_path, start_id, end_id):
-    """Update the start_id and end_id values in a Python file"""
+REGISTRY_FILE = "site_registry.py"
+
+def update_keyword_range(start_id, end_id, file_path=REGISTRY_FILE):
+    """Rewrite the KEYWORD_RANGE line of the site registry"""
     try:
         with open(file_path, 'r') as f:
             content = f.read()
-        
-        # Update start_id
-        content = re.sub(
-            r'start_id = \d+',
-            f'start_id = {start_id}',
-            content
-        )
-        
-        # Update end_id
-        content = re.sub(
-            r'end_id = \d+',
-            f'end_id = {end_id}',
-            content
+
+        content, count = re.subn(
+            r'^KEYWORD_RANGE = \(\d+, \d+\)$',
+            f'KEYWORD_RANGE = ({start_id}, {end_id})',
+            content,
+            flags=re.MULTILINE
         )
-        
+        if count != 1:
+            print(f"❌ Expected one KEYWORD_RANGE line in {file_path}, found {count}")
+            return False
+
         with open(file_path, 'w') as f:
             f.write(content)
-        
+
         print(f"✅ Updated {file_path}: range {start_id}-{end_id}")
         return True
-        
+
     except Exception as e:
         print(f"❌ Error updating {file_path}: {e}")
         return False
@@ -40,7 +37,7 @@ def update_ranges_in_file(file_path, start_id, end_id):
 def main():
     print("🔄 Keyword Range Updater")
     print("=" * 40)
-    
+
     # Get user input
     try:
         start_id = int(input("Enter start ID (e.g., 1): "))
@@ -48,30 +45,14 @@ def main():
     except ValueError:
         print("❌ Please enter valid numbers")
         return
-    
+
     if start_id > end_id:
         print("❌ Start ID cannot be greater than end ID")
         return
-    
-    # List of scraper files to update
-    scraper_files = [
-        'nykaa.py',
-        'myntra.py', 
-        'zara.py'
-    ]
-    
-    print(f"\n📝 Updating ranges to {start_id}-{end_id} in:")
-    
-    success_count = 0
-    for file_path in scraper_files:
-        if os.path.exists(file_path):
-            if update_ranges_in_file(file_path, start_id, end_id):
-                success_count += 1
-        else:
-            print(f"⚠️  File not found: {file_path}")
-    
-    print(f"\n✅ Successfully updated {success_count}/{len(scraper_files)} files")
-    print(f"🎯 All scrapers will now process keywords with IDs {start_id} to {end_id}")
+
+    if update_keyword_range(start_id, end_id):
+        print(f"🎯 All scrapers will now process keywords with IDs {start_id} to {end_id}")
+        print("   (sites with a keyword_range of their own in site_registry keep it)")
 
 if __name__ == "__main__":
     main()
@@ -7,7 +7,7 @@ import json
 import csv
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 import random
 
 def create_output_directory(directory_name: str = "scraped_data") -> str:
@@ -80,6 +80,71 @@ def save_as_xml(data: List[Dict[str, Any]], filename: str, directory: str = "scr
     print(f"Data saved to XML: {filepath}")
     return filepath
 
+def write_json_array(records: Iterable[Dict[str, Any]], filepath: str) -> int:
+    """Write records to a JSON array file one at a time, without holding them all in memory"""
+    count = 0
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for record in records:
+            f.write(',\n  ' if count else '\n  ')
+            f.write(json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+            count += 1
+        f.write('\n]' if count else ']')
+    return count
+
+def iter_json_array(filepath: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time, reading the file in chunks"""
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def next_char():
+            """Skip whitespace and return the next significant character ('' at end of file)"""
+            nonlocal buffer, pos, eof
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return buffer[pos] if pos < len(buffer) else ''
+                chunk = f.read(chunk_size)
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                eof = not chunk
+
+        if next_char() != '[':
+            raise ValueError(f"{filepath} does not contain a JSON array")
+        pos += 1
+
+        while True:
+            char = next_char()
+            if char == ']':
+                return
+            if char == ',':
+                pos += 1
+                continue
+            if char == '':
+                raise ValueError(f"Unexpected end of file in {filepath}")
+
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                # Element runs past the buffered text; read more and decode again
+                chunk = f.read(chunk_size)
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                eof = not chunk
+
+            yield item
+            buffer = buffer[end:]
+            pos = 0
+
 def export_data(data: List[Dict[str, Any]], filename: str, formats: List[str] = None, directory: str = "scraped_data") -> Dict[str, str]:
     """Export data in multiple formats"""
     if formats is None:
@@ -175,6 +240,28 @@ def count_by_field(data: List[Dict[str, Any]], key: str) -> Dict[str, int]:
     
     return counts
 
+def filter_keywords(keywords_data: List[Dict[str, Any]], start_id: int, end_id: int) -> List[Dict[str, Any]]:
+    """Select keywords by ID range, or by the exact IDs a queue worker assigned via SCRAPER_KEYWORD_IDS"""
+    assigned_ids = os.environ.get("SCRAPER_KEYWORD_IDS")
+    if assigned_ids:
+        wanted = {keyword_id.strip() for keyword_id in assigned_ids.split(",") if keyword_id.strip()}
+        return [keyword_obj for keyword_obj in keywords_data if str(keyword_obj["id"]) in wanted]
+
+    filtered_keywords = []
+    for keyword_obj in keywords_data:
+        keyword_id = int(keyword_obj["id"])
+        if start_id <= keyword_id <= end_id:
+            filtered_keywords.append(keyword_obj)
+    return filtered_keywords
+
+def get_output_file(default_filename: str) -> str:
+    """Return the scraper output path, overridable via SCRAPER_OUTPUT_FILE"""
+    return os.environ.get("SCRAPER_OUTPUT_FILE") or default_filename
+
+def get_base_url(default_url: str) -> str:
+    """Return the site's start URL, overridable via SCRAPER_BASE_URL (e.g. to point at fixture_server.py)"""
+    return os.environ.get("SCRAPER_BASE_URL") or default_url
+
 def get_random_headers():
     """Get random headers"""
     response = requests.get(
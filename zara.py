@@ -4,104 +4,84 @@ Simple Zara Navigation Script
 Navigates to Zara.com, searches for keywords, waits, and closes
 """
 
+import logging
+import re
 import time
 import json
 from urllib.parse import urlparse, parse_qs
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from utils import filter_keywords, get_output_file, get_base_url
+from site_registry import get_site
+import heartbeat
+import metrics
+import snapshot_recorder
+from zara_images import is_valid_product_image, clean_image_url, unique_product_images
+import tracing
+import page_source
+from browser_setup import create_driver
+from driver_lifecycle import DriverLifecycle, is_session_error, retire_driver
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Zara CDN image URLs in raw page/script text
+PAGE_IMAGE_PATTERN = re.compile(r'https://static\.zara\.net/assets/public/[^"\s]*?\.(?:jpg|jpeg|png|webp)[^"\s]*')
+SCRIPT_IMAGE_PATTERN = re.compile(r'https?://[^"\s]*?zara\.net[^"\s]*?\.(?:jpg|jpeg|png|webp)[^"\s]*')
+
+def _collect_json_images(obj, urls):
+    """Recursively collect product image URLs from parsed JSON"""
+    if isinstance(obj, dict):
+        for value in obj.values():
+            _collect_json_images(value, urls)
+    elif isinstance(obj, list):
+        for item in obj:
+            _collect_json_images(item, urls)
+    elif isinstance(obj, str) and is_valid_product_image(obj):
+        clean_url = clean_image_url(obj)
+        if clean_url and clean_url not in urls:
+            urls[clean_url] = None
+            logger.debug("    ✅ Found in JSON: %s...", clean_url[:80])
+
 
 def extract_images_from_json_data(driver):
     """Extract product images from embedded JSON data"""
     image_urls = []
     
     try:
-        print("Looking for product JSON data...")
-        
-        # Get the page source
-        page_source = driver.page_source
-        
-        # Look for product data JSON (common patterns)
-        import re
-        import json
-        
-        # Pattern 1: Look for window.__INITIAL_STATE__ or similar
-        json_patterns = [
-            r'window\.__INITIAL_STATE__\s*=\s*({.*?});',
-            r'window\.__PRELOADED_STATE__\s*=\s*({.*?});',
-            r'window\.zara\s*=\s*({.*?});',
-            r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>',
-            r'productDetail["\']\s*:\s*({.*?})[,}]',
-            r'"productDetail"\s*:\s*({.*?})[,}]'
-        ]
-        
-        found_json = False
-        for pattern in json_patterns:
-            matches = re.findall(pattern, page_source, re.DOTALL)
-            for match in matches:
-                try:
-                    # Clean up the JSON string
-                    json_str = match.strip()
-                    if json_str.startswith('{') and json_str.endswith('}'):
-                        # Try to parse as JSON
-                        data = json.loads(json_str)
-                        print("✅ Found and parsed JSON data")
-                        
-                        # Recursively search for image URLs in the JSON
-                        def extract_image_urls_from_dict(obj, urls):
-                            if isinstance(obj, dict):
-                                for key, value in obj.items():
-                                    if isinstance(value, str) and is_valid_product_image(value):
-                                        clean_url = clean_image_url(value)
-                                        if clean_url and clean_url not in urls:
-                                            urls.append(clean_url)
-                                            print(f"    ✅ Found in JSON: {clean_url[:80]}...")
-                                    elif isinstance(value, (dict, list)):
-                                        extract_image_urls_from_dict(value, urls)
-                            elif isinstance(obj, list):
-                                for item in obj:
-                                    extract_image_urls_from_dict(item, urls)
-                        
-                        extract_image_urls_from_dict(data, image_urls)
-                        found_json = True
-                        break
-                except json.JSONDecodeError:
-                    continue
-            if found_json:
-                break
+        logger.debug("Looking for product JSON data...")
+        
+        # Shared with the other page-source fallbacks for this navigation
+        html = page_source.get_page_source(driver)
+        
+        # Pattern 1: window.__INITIAL_STATE__, __NEXT_DATA__, productDetail and similar state objects
+        data = page_source.extract_embedded_json(html)
+        if data is not None:
+            logger.debug("✅ Found and parsed JSON data")
+            found = {}
+            _collect_json_images(data, found)
+            image_urls = list(found)
         
         # Pattern 2: Look for specific product data scripts
         if not image_urls:
-            print("Searching script tags for product images...")
-            script_tags = driver.find_elements(By.TAG_NAME, "script")
-            for i, script in enumerate(script_tags):
-                script_content = script.get_attribute("innerHTML")
-                if script_content and ('product' in script_content.lower() or 'image' in script_content.lower()):
-                    print(f"  Found relevant script {i+1}")
+            logger.debug("Searching script tags for product images...")
+            for i, script_content in enumerate(page_source.script_contents(html)):
+                lowered = script_content.lower()
+                if 'product' in lowered or 'image' in lowered:
+                    logger.debug("  Found relevant script %s", i+1)
                     # Look for image arrays in the script
-                    img_matches = re.findall(r'https?://[^"\s]*?zara\.net[^"\s]*?\.(?:jpg|jpeg|png|webp)[^"\s]*', script_content)
-                    print(f"    Found {len(img_matches)} image URLs in script")
+                    img_matches = SCRIPT_IMAGE_PATTERN.findall(script_content)
+                    logger.debug("    Found %s image URLs in script", len(img_matches))
                     
                     # Process all images from this script
-                    script_valid_count = 0
-                    for url in img_matches:
-                        if is_valid_product_image(url):
-                            clean_url = clean_image_url(url)
-                            if clean_url and clean_url not in image_urls:
-                                image_urls.append(clean_url)
-                                script_valid_count += 1
-                                print(f"    ✅ Added from script: {clean_url[:80]}...")
-                        else:
-                            print(f"    ❌ Invalid from script: {url[:80]}...")
-                    
-                    print(f"    Added {script_valid_count} valid images from this script")
+                    script_images = unique_product_images(img_matches, image_urls)
+                    image_urls.extend(script_images)
+                    logger.debug("    Added %s valid images from this script", len(script_images))
         
         # Pattern 3: Look for window.__INITIAL_STATE__ or similar
         if not image_urls:
-            print("Searching for window.__INITIAL_STATE__ or similar...")
+            logger.debug("Searching for window.__INITIAL_STATE__ or similar...")
             try:
                 initial_state = driver.execute_script("""
                     if (window.__INITIAL_STATE__) {
@@ -117,38 +97,25 @@ def extract_images_from_json_data(driver):
                 """)
                 
                 if initial_state:
-                    print("Found initial state data")
-                    # Recursively search for image URLs
-                    def extract_from_state(obj, urls):
-                        if isinstance(obj, dict):
-                            for key, value in obj.items():
-                                if isinstance(value, str) and is_valid_product_image(value):
-                                    clean_url = clean_image_url(value)
-                                    if clean_url and clean_url not in urls:
-                                        urls.append(clean_url)
-                                        print(f"    ✅ Added from state: {clean_url[:80]}...")
-                                elif isinstance(value, (dict, list)):
-                                    extract_from_state(value, urls)
-                        elif isinstance(obj, list):
-                            for item in obj:
-                                extract_from_state(item, urls)
-                    
-                    extract_from_state(initial_state, image_urls)
+                    logger.debug("Found initial state data")
+                    found = {}
+                    _collect_json_images(initial_state, found)
+                    image_urls = list(found)
                     
             except Exception as e:
-                print(f"Error extracting from initial state: {e}")
+                logger.debug("Error extracting from initial state: %s", e)
         
-        print(f"Found {len(image_urls)} images from JSON data")
+        logger.debug("Found %s images from JSON data", len(image_urls))
         return image_urls
         
     except Exception as e:
-        print(f"Error extracting images from JSON: {e}")
+        logger.debug("Error extracting images from JSON: %s", e)
         return []
 
 def force_all_images_to_load(driver):
     """Aggressively force all product images to load by simulating user interaction"""
     try:
-        print("Aggressively forcing all product images to load...")
+        logger.debug("Aggressively forcing all product images to load...")
         
         # First, try to make the browser think it's visible
         driver.execute_script("""
@@ -166,13 +133,13 @@ def force_all_images_to_load(driver):
         
         # Scroll through all product images to trigger loading
         product_images = driver.find_elements(By.CSS_SELECTOR, "img.media-image__image")
-        print(f"Found {len(product_images)} product images to force load")
+        logger.debug("Found %s product images to force load", len(product_images))
         
         for i, img in enumerate(product_images):
             try:
                 # Scroll to each image
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", img)
-                time.sleep(0.5)
+                tracing.sleep(0.5, "wait_image_scroll")
                 
                 # Force load with JavaScript
                 driver.execute_script("""
@@ -206,10 +173,10 @@ def force_all_images_to_load(driver):
                     }
                 """, img)
                 
-                print(f"  Forced load for image {i+1}")
+                logger.debug("  Forced load for image %s", i+1)
                 
             except Exception as e:
-                print(f"  Error forcing load for image {i+1}: {e}")
+                logger.warning("  Error forcing load for image %s: %s", i+1, e)
                 continue
         
         # Final aggressive loading attempt
@@ -245,67 +212,62 @@ def force_all_images_to_load(driver):
         """)
         
         # Wait for all images to load
-        time.sleep(3)
+        tracing.sleep(3, "wait_images_loaded")
+        page_source.invalidate(driver)
         
     except Exception as e:
-        print(f"Error in aggressive image loading: {e}")
+        logger.warning("Error in aggressive image loading: %s", e)
 
 def get_product_images_from_page_source(driver):
     """Extract product images from page source with strict filtering"""
     try:
-        import re
-        
         # Get all image URLs from the page that look like product images
-        page_source = driver.page_source
-        # Look for Zara product image patterns
-        pattern = r'https://static\.zara\.net/assets/public/[^"\s]*?\.(?:jpg|jpeg|png|webp)[^"\s]*'
-        matches = re.findall(pattern, page_source)
+        html = page_source.get_page_source(driver)
+        matches = PAGE_IMAGE_PATTERN.findall(html)
         
         # Filter out placeholders and duplicates with strict validation
-        image_urls = []
-        for url in matches:
-            if is_valid_product_image(url):
-                clean_url = clean_image_url(url)
-                if clean_url and clean_url not in image_urls:
-                    image_urls.append(clean_url)
+        image_urls = unique_product_images(matches)
         
-        print(f"Found {len(image_urls)} valid product images from page source")
+        logger.debug("Found %s valid product images from page source", len(image_urls))
         return image_urls
         
     except Exception as e:
-        print(f"Error extracting images: {e}")
+        logger.debug("Error extracting images: %s", e)
         return []
 
 def extract_product_images_comprehensive(driver):
-    """Extract product images using focused methods targeting actual product photos"""
+    """Extract product images using focused methods targeting actual product photos (slow, verbose;
+    kept for debugging - the scraper uses resolve_product_images)"""
     image_urls = []
     
-    print("\n=== Focused Product Image Extraction ===")
+    logger.debug("=== Focused Product Image Extraction ===")
     
     # Aggressively force all images to load first
-    force_all_images_to_load(driver)
+    with tracing.span("force_all_images_to_load"):
+        force_all_images_to_load(driver)
     
     # Method 1: Target specific product image selectors with enhanced loading
+    method_started = time.time()
     try:
-        print("Method 1: Targeting picture.media-image > img.media-image__image...")
+        logger.debug("Method 1: Targeting picture.media-image > img.media-image__image...")
         
         # First, try the exact selector you want
         picture_elements = driver.find_elements(By.CSS_SELECTOR, "picture.media-image")
-        print(f"Found {len(picture_elements)} picture.media-image elements")
+        logger.debug("Found %s picture.media-image elements", len(picture_elements))
         
         for i, picture in enumerate(picture_elements):
             try:
-                print(f"  Processing picture element {i+1}...")
+                logger.debug("  Processing picture element %s...", i+1)
                 
                 # Look for img inside the picture element
                 img_elements = picture.find_elements(By.CSS_SELECTOR, "img.media-image__image")
-                print(f"    Found {len(img_elements)} img.media-image__image elements in picture {i+1}")
+                logger.debug("    Found %s img.media-image__image elements in picture %s", len(img_elements), i+1)
                 
                 for j, img in enumerate(img_elements):
                     try:
                         # Force scroll to element and wait longer
                         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", img)
-                        time.sleep(1)  # Longer wait for loading
+                        tracing.sleep(1, "wait_image_scroll")  # Longer wait for loading
                         
                         # Force image loading with JavaScript - more aggressive approach
                         driver.execute_script("""
@@ -341,7 +303,7 @@ def extract_product_images_comprehensive(driver):
                             }
                         """, img)
                         
-                        time.sleep(1)  # Wait for JavaScript to execute
+                        tracing.sleep(1, "wait_image_script")  # Wait for JavaScript to execute
                         
                         # Try multiple attributes in order of preference
                         src = img.get_attribute('src')
@@ -349,42 +311,44 @@ def extract_product_images_comprehensive(driver):
                         data_lazy = img.get_attribute('data-lazy')
                         data_original = img.get_attribute('data-original')
                         
-                        # Debug all attributes and DOM structure
-                        print(f"    Image {j+1} attributes:")
-                        print(f"      src: '{src[:100] if src else 'None'}...'")
-                        print(f"      data-src: '{data_src[:100] if data_src else 'None'}...'")
-                        print(f"      data-lazy: '{data_lazy[:100] if data_lazy else 'None'}...'")
-                        print(f"      data-original: '{data_original[:100] if data_original else 'None'}...'")
+                        # Debug all attributes and DOM structure; two extra WebDriver round trips, so only
+                        # when debug logging is on
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("    Image %s attributes:", j+1)
+                            logger.debug("      src: '%s...'", src[:100] if src else 'None')
+                            logger.debug("      data-src: '%s...'", data_src[:100] if data_src else 'None')
+                            logger.debug("      data-lazy: '%s...'", data_lazy[:100] if data_lazy else 'None')
+                            logger.debug("      data-original: '%s...'", data_original[:100] if data_original else 'None')
                         
-                        # Check all data attributes
-                        all_attrs = driver.execute_script("""
-                            const img = arguments[0];
-                            const attrs = {};
-                            for (let attr of img.attributes) {
-                                attrs[attr.name] = attr.value;
-                            }
-                            return attrs;
-                        """, img)
+                            # Check all data attributes
+                            all_attrs = driver.execute_script("""
+                                const img = arguments[0];
+                                const attrs = {};
+                                for (let attr of img.attributes) {
+                                    attrs[attr.name] = attr.value;
+                                }
+                                return attrs;
+                            """, img)
                         
-                        print(f"      All attributes: {all_attrs}")
+                            logger.debug("      All attributes: %s", all_attrs)
                         
-                        # Check parent elements for image data
-                        parent_data = driver.execute_script("""
-                            const img = arguments[0];
-                            const parent = img.parentElement;
-                            const grandparent = parent ? parent.parentElement : null;
+                            # Check parent elements for image data
+                            parent_data = driver.execute_script("""
+                                const img = arguments[0];
+                                const parent = img.parentElement;
+                                const grandparent = parent ? parent.parentElement : null;
                             
-                            return {
-                                parent_tag: parent ? parent.tagName : 'None',
-                                parent_class: parent ? parent.className : 'None',
-                                grandparent_tag: grandparent ? grandparent.tagName : 'None',
-                                grandparent_class: grandparent ? grandparent.className : 'None',
-                                parent_attrs: parent ? Object.fromEntries(Array.from(parent.attributes).map(attr => [attr.name, attr.value])) : {},
-                                grandparent_attrs: grandparent ? Object.fromEntries(Array.from(grandparent.attributes).map(attr => [attr.name, attr.value])) : {}
-                            };
-                        """, img)
+                                return {
+                                    parent_tag: parent ? parent.tagName : 'None',
+                                    parent_class: parent ? parent.className : 'None',
+                                    grandparent_tag: grandparent ? grandparent.tagName : 'None',
+                                    grandparent_class: grandparent ? grandparent.className : 'None',
+                                    parent_attrs: parent ? Object.fromEntries(Array.from(parent.attributes).map(attr => [attr.name, attr.value])) : {},
+                                    grandparent_attrs: grandparent ? Object.fromEntries(Array.from(grandparent.attributes).map(attr => [attr.name, attr.value])) : {}
+                                };
+                            """, img)
                         
-                        print(f"      Parent structure: {parent_data}")
+                            logger.debug("      Parent structure: %s", parent_data)
                         
                         # Use the best available source
                         final_src = src or data_src or data_lazy or data_original
@@ -392,7 +356,7 @@ def extract_product_images_comprehensive(driver):
                         if final_src and final_src.strip():
                             # Check if it's a transparent background first
                             if 'transparent-background' in final_src:
-                                print(f"    ❌ Skipping transparent background image")
+                                logger.debug("    ❌ Skipping transparent background image")
                                 continue
                                 
                             # Check if it's a valid product image
@@ -400,36 +364,38 @@ def extract_product_images_comprehensive(driver):
                                 clean_url = clean_image_url(final_src)
                                 if clean_url and clean_url not in image_urls:
                                     image_urls.append(clean_url)
-                                    print(f"    ✅ Product image {len(image_urls)}: {clean_url[:80]}...")
+                                    logger.debug("    ✅ Product image %s: %s...", len(image_urls), clean_url[:80])
                             else:
-                                print(f"    ❌ Invalid product image: {final_src[:80]}...")
+                                logger.debug("    ❌ Invalid product image: %s...", final_src[:80])
                         else:
-                            print(f"    ❌ No valid src found for image {j+1}")
+                            logger.debug("    ❌ No valid src found for image %s", j+1)
                             
                     except Exception as e:
-                        print(f"    Error processing image {j+1} in picture {i+1}: {e}")
+                        logger.warning("    Error processing image %s in picture %s: %s", j+1, i+1, e)
                         continue
                         
             except Exception as e:
-                print(f"  Error processing picture {i+1}: {e}")
+                logger.warning("  Error processing picture %s: %s", i+1, e)
                 continue
                 
-        print(f"Method 1 extracted {len(image_urls)} valid images")
+        logger.debug("Method 1 extracted %s valid images", len(image_urls))
                 
     except Exception as e:
-        print(f"Method 1 failed: {e}")
+        logger.debug("Method 1 failed: %s", e)
+    tracing.add_span("images.method1_picture", method_started, images=len(image_urls))
     
     # Method 2: Fallback to direct img.media-image__image selector
     if not image_urls:
+        method_started = time.time()
         try:
-            print("Method 2: Direct img.media-image__image selector...")
+            logger.debug("Method 2: Direct img.media-image__image selector...")
             img_elements = driver.find_elements(By.CSS_SELECTOR, "img.media-image__image")
-            print(f"Found {len(img_elements)} img.media-image__image elements")
+            logger.debug("Found %s img.media-image__image elements", len(img_elements))
             
             for i, img in enumerate(img_elements):
                 try:
                     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", img)
-                    time.sleep(0.5)
+                    tracing.sleep(0.5, "wait_image_scroll")
                     
                     src = img.get_attribute('src') or img.get_attribute('data-src') or img.get_attribute('data-lazy')
                     
@@ -437,168 +403,230 @@ def extract_product_images_comprehensive(driver):
                         clean_url = clean_image_url(src)
                         if clean_url and clean_url not in image_urls:
                             image_urls.append(clean_url)
-                            print(f"  ✅ Product image {len(image_urls)}: {clean_url[:80]}...")
+                            logger.debug("  ✅ Product image %s: %s...", len(image_urls), clean_url[:80])
                 except Exception as e:
-                    print(f"  Error processing image {i+1}: {e}")
+                    logger.warning("  Error processing image %s: %s", i+1, e)
                     continue
                     
         except Exception as e:
-            print(f"Method 2 failed: {e}")
+            logger.debug("Method 2 failed: %s", e)
+        tracing.add_span("images.method2_img", method_started, images=len(image_urls))
     
     # Method 3: Extract from product JSON data (most reliable for actual product images)
     if not image_urls:
-        print("Method 3: Extracting from product JSON data...")
+        method_started = time.time()
+        logger.debug("Method 3: Extracting from product JSON data...")
         json_images = extract_images_from_json_data(driver)
-        print(f"Found {len(json_images)} total images from JSON")
+        logger.debug("Found %s total images from JSON", len(json_images))
         
         # Filter JSON images to only include actual product images
         for i, url in enumerate(json_images):
-            print(f"  JSON image {i+1}: {url[:100]}...")
+            logger.debug("  JSON image %s: %s...", i+1, url[:100])
             if is_valid_product_image(url):
                 clean_url = clean_image_url(url)
                 if clean_url and clean_url not in image_urls:
                     image_urls.append(clean_url)
-                    print(f"    ✅ Valid product image {len(image_urls)}: {clean_url[:80]}...")
+                    logger.debug("    ✅ Valid product image %s: %s...", len(image_urls), clean_url[:80])
             else:
-                print(f"    ❌ Invalid product image: {url[:80]}...")
+                logger.debug("    ❌ Invalid product image: %s...", url[:80])
+        tracing.add_span("images.method3_json", method_started, images=len(image_urls))
     
     # Method 4: Try to extract from page source with more aggressive patterns
     if not image_urls:
-        print("Method 4: Extracting from page source with aggressive patterns...")
+        method_started = time.time()
+        logger.debug("Method 4: Extracting from page source with aggressive patterns...")
         page_source_images = get_product_images_from_page_source(driver)
         for url in page_source_images:
             if url not in image_urls:
                 image_urls.append(url)
-                print(f"  ✅ Page source image {len(image_urls)}: {url[:80]}...")
+                logger.debug("  ✅ Page source image %s: %s...", len(image_urls), url[:80])
+        tracing.add_span("images.method4_page_source", method_started, images=len(image_urls))
     
-    print(f"\nFinal product images: {len(image_urls)} images found")
+    logger.debug("Final product images: %s images found", len(image_urls))
     return image_urls
 
-def is_valid_product_image(url):
-    """Check if URL is a valid product image (not marketing/banner)"""
-    if not url:
-        return False
-    
-    # Exclude obvious non-product images
-    exclude_patterns = [
-        'transparent-background',
-        'stdstatic',  # Standard static files
-        'poster',     # Video posters
-        'subhome',    # Homepage banners
-        'xmedia',     # Marketing media
-        'joinlife',   # Marketing campaigns
-        'anniversary', # Marketing campaigns
-        'north-woman', # Marketing campaigns
-        'north-kids',  # Marketing campaigns
-        'north-man',   # Marketing campaigns
-        'beauty',      # Category banners
-        'arizona',     # Marketing campaigns
-        'image-portrait-fit',  # Marketing images
-        'image-landscape-fit', # Marketing images
-        'image-portrait-fill', # Marketing images
-        'image-landscape-fill', # Marketing images
-    ]
-    
-    for pattern in exclude_patterns:
-        if pattern in url.lower():
-            return False
-    
-    # Must be from Zara's CDN
-    if 'static.zara.net/assets/public' not in url:
-        return False
-    
-    # Must have a valid image extension
-    if not any(ext in url.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
-        return False
-    
-    # Should have product-like naming pattern (less strict validation)
-    product_patterns = [
-        '-p.jpg',     # Primary product image
-        '-a1.jpg',    # Alternative view 1
-        '-e1.jpg',    # Extra view 1
-        '-e2.jpg',    # Extra view 2
-        '-e3.jpg',    # Extra view 3
-        '-e4.jpg',    # Extra view 4
-        '-a2.jpg',    # Alternative view 2
-        '-a3.jpg',    # Alternative view 3
-        '-a4.jpg',    # Alternative view 4
-    ]
-    
-    # Check if it matches any product pattern
-    for pattern in product_patterns:
-        if pattern in url:
-            return True
-    
-    # Additional check: should have product ID pattern (numbers followed by -p, -a1, -e1, etc.)
-    import re
-    product_id_pattern = r'/\d{11}-[pae]\d*\.jpg'
-    if re.search(product_id_pattern, url):
-        return True
-    
-    # More flexible pattern: any 11-digit number followed by dash and letter/number
-    flexible_pattern = r'/\d{11}-[a-z]\d*\.jpg'
-    if re.search(flexible_pattern, url):
-        return True
-    
-    # Even more flexible: any path that looks like a product image
-    if '/assets/public/' in url and any(ext in url for ext in ['.jpg', '.jpeg', '.png', '.webp']):
-        # Check if it has a reasonable product-like structure
-        if re.search(r'/\d{6,12}', url):  # Has some numbers that could be product ID
-            return True
-    
-    return False
+# Collects every usable URL of each media image in one round trip, widest srcset entry first
+COLLECT_IMAGE_CANDIDATES_JS = """
+    const widest = (srcset) => (srcset || '').split(',')
+        .map((entry) => entry.trim().split(/\\s+/))
+        .filter((parts) => parts[0])
+        .sort((a, b) => (parseInt(b[1]) || 0) - (parseInt(a[1]) || 0))
+        .map((parts) => parts[0]);
+    const indices = arguments[0];
+    const images = Array.from(document.querySelectorAll('img.media-image__image'));
+    return (indices || images.map((_, i) => i)).map((i) => {
+        const img = images[i];
+        if (!img) return [];
+        const sources = img.parentElement ? Array.from(img.parentElement.querySelectorAll('source')) : [];
+        return [img.currentSrc, img.getAttribute('src'), ...widest(img.getAttribute('srcset')),
+                ...sources.flatMap((source) => widest(source.getAttribute('srcset'))),
+                img.dataset.src, img.dataset.lazy, img.dataset.original].filter(Boolean);
+    });
+"""
+
+# Scrolls only the still-missing images into view (letting lazy loaders fire), then waits
+# for them to swap in a real source or for the timeout. Returns the indices so the caller can
+# collect their candidates again with COLLECT_IMAGE_CANDIDATES_JS.
+TRIGGER_LAZY_IMAGES_JS = """
+    const done = arguments[arguments.length - 1];
+    const [indices, timeoutMs] = arguments;
+    const images = Array.from(document.querySelectorAll('img.media-image__image'));
+    const targets = indices.map((i) => images[i]).filter(Boolean);
+    const isPlaceholder = (img) => !img.currentSrc || img.currentSrc.includes('transparent-background');
+    (async () => {
+        for (const img of targets) {
+            img.loading = 'eager';
+            img.scrollIntoView({block: 'center'});
+            if (isPlaceholder(img) && img.dataset.src) img.src = img.dataset.src;
+            await new Promise((resolve) => setTimeout(resolve, 150));
+        }
+        const started = Date.now();
+        while (targets.some(isPlaceholder) && Date.now() - started < timeoutMs) {
+            await new Promise((resolve) => setTimeout(resolve, 100));
+        }
+        done(indices);
+    })();
+"""
+
+
+# Reads size labels and stock states in one call: from the size selector markup when it is
+# already in the DOM (hidden or not), otherwise from the product payload embedded in the page.
+# The payload is only used for the colour whose id matches the product; anything else is null,
+# and the caller falls back to opening the size dropdown. Payload availabilities are mapped
+# onto the selector's data-qa-action values.
+COLLECT_SIZES_JS = """
+    const productId = arguments[0];
+    const buttons = Array.from(document.querySelectorAll('button.size-selector-sizes-size__button'));
+    if (buttons.length) {
+        return {source: 'markup', sizes: buttons.map((button) => {
+            const label = button.querySelector('div.size-selector-sizes-size__label');
+            return [label ? label.textContent.trim() : '', button.getAttribute('data-qa-action')];
+        }).filter((size) => size[0])};
+    }
+
+    const states = {in_stock: 'size-in-stock', low_on_stock: 'size-in-stock',
+                    back_soon: 'size-back-soon', coming_soon: 'size-back-soon', out_of_stock: 'size-out-of-stock'};
+    const roots = [window.__PRELOADED_STATE__, window.__INITIAL_STATE__, window.zara];
+    for (const script of document.querySelectorAll('script#__NEXT_DATA__, script[type="application/json"]')) {
+        try { roots.push(JSON.parse(script.textContent)); } catch (e) {}
+    }
+    // Every object holding a sizes array of {name, availability}, i.e. one per colour
+    const colours = [];
+    const seen = new Set();
+    const visit = (obj, depth) => {
+        if (!obj || typeof obj !== 'object' || depth > 12 || seen.has(obj)) return;
+        seen.add(obj);
+        if (Array.isArray(obj.sizes) && obj.sizes.length && obj.sizes.every((s) => s && s.name && s.availability)) {
+            colours.push(obj);
+        }
+        for (const value of Object.values(obj)) visit(value, depth + 1);
+    };
+    roots.forEach((root) => visit(root, 0));
+    // The payload also carries related products, so only a colour of this product will do
+    const colour = colours.find((c) => productId && String(c.productId || c.id) === String(productId));
+    if (!colour) return null;
+    return {source: 'payload', sizes: colour.sizes.map((s) => [s.name, states[s.availability] || 'size-out-of-stock'])};
+"""
 
-def clean_image_url(url):
-    """Clean and normalize image URL"""
-    if not url:
+SIZE_FIELDS = {
+    "size-in-stock": "product_sizes_available",
+    "size-back-soon": "product_sizes_coming_soon",
+    "size-out-of-stock": "product_sizes_out_of_stock",
+}
+
+
+def read_product_sizes(driver, product_id=None):
+    """Sizes by stock state from the page's markup or payload, or None if neither has them"""
+    result = driver.execute_script(COLLECT_SIZES_JS, product_id)
+    if not result or not result.get("sizes"):
         return None
-    
-    # Remove width parameters and normalize
-    url = url.replace('&w={width}', '').replace('&w=1920', '').replace('&w=2400', '')
-    url = url.replace('&amp;', '&')
-    
-    # Remove any trailing parameters that might cause issues
-    if '?' in url:
-        base_url = url.split('?')[0]
-        # Keep timestamp parameter if it exists
-        if 'ts=' in url:
-            ts_part = url.split('ts=')[1].split('&')[0]
-            url = f"{base_url}?ts={ts_part}"
-        else:
-            url = base_url
-    
-    return url.strip()
+    sizes = {field: [] for field in SIZE_FIELDS.values()}
+    for label, state in result["sizes"]:
+        if state in SIZE_FIELDS:
+            sizes[SIZE_FIELDS[state]].append(label)
+    logger.debug("📏 Read %s sizes from the page %s", len(result['sizes']), result['source'])
+    return sizes
+
+
+def _pick_product_image(candidates):
+    """First candidate that is a real product image, cleaned"""
+    for candidate in candidates:
+        if 'transparent-background' not in candidate and is_valid_product_image(candidate):
+            return clean_image_url(candidate)
+    return None
+
+
+def resolve_product_images(driver, lazy_timeout=3.0):
+    """Resolve all product images with one script call, lazy-loading only the images still missing"""
+    started = time.time()
+    lazy_count = 0
+
+    with tracing.span("images.batch_collect"):
+        candidates = driver.execute_script(COLLECT_IMAGE_CANDIDATES_JS, None) or []
+    resolved = [_pick_product_image(image_candidates) for image_candidates in candidates]
+
+    missing = [index for index, url in enumerate(resolved) if not url]
+    if missing:
+        lazy_count = len(missing)
+        with tracing.span("images.lazy_fallback", images=lazy_count):
+            script_timeout = driver.timeouts.script
+            try:
+                driver.set_script_timeout(lazy_timeout + 0.15 * len(missing) + 5)
+                driver.execute_async_script(TRIGGER_LAZY_IMAGES_JS, missing, int(lazy_timeout * 1000))
+            except Exception as e:
+                logger.warning("⚠️ Lazy image trigger failed, collecting what loaded anyway: %s", e)
+            finally:
+                driver.set_script_timeout(script_timeout)
+            try:
+                retried = driver.execute_script(COLLECT_IMAGE_CANDIDATES_JS, missing) or []
+                for index, image_candidates in zip(missing, retried):
+                    resolved[index] = _pick_product_image(image_candidates)
+            except Exception as e:
+                logger.warning("⚠️ Could not collect lazy-loaded images: %s", e)
+            page_source.invalidate(driver)
+
+    image_urls = list(dict.fromkeys(url for url in resolved if url))
+
+    if not image_urls:
+        # No media images on the page: fall back to the embedded JSON and then the raw page source
+        with tracing.span("images.page_fallback"):
+            image_urls = unique_product_images(extract_images_from_json_data(driver) + get_product_images_from_page_source(driver))
+
+    logger.info("🖼️ Resolved %s images from %s media elements in %.2fs (%s needed lazy loading)",
+                len(image_urls), len(candidates), time.time() - started, lazy_count)
+    return image_urls
 
 def main():
     # Load keywords from JSON file
     try:
         with open('keywords.json', 'r') as f:
             keywords_data = json.load(f)
-        print(f"Loaded {len(keywords_data)} keywords from keywords.json")
+        logger.info("Loaded %s keywords from keywords.json", len(keywords_data))
     except Exception as e:
-        print(f"Error loading keywords file: {e}")
+        logger.error("Error loading keywords file: %s", e)
         return
     
-    # Define keyword range (modify these values to scrape different ranges)
-    start_id = 421
-    end_id = 525
+    # The keyword range lives in site_registry (see update_ranges.py)
+    start_id, end_id = get_site("zara")["keyword_range"]
     
-    # Filter keywords based on ID range
-    filtered_keywords = []
-    for keyword_obj in keywords_data:
-        keyword_id = int(keyword_obj["id"])
-        if start_id <= keyword_id <= end_id:
-            filtered_keywords.append(keyword_obj)
+    # Filter keywords based on ID range (or the IDs assigned by a queue worker)
+    filtered_keywords = filter_keywords(keywords_data, start_id, end_id)
     
-    print(f"Scraping keywords with IDs {start_id} to {end_id}")
-    print(f"Total keywords to scrape: {len(filtered_keywords)}")
+    logger.info("Scraping keywords with IDs %s to %s", start_id, end_id)
+    logger.info("Total keywords to scrape: %s", len(filtered_keywords))
     
     if not filtered_keywords:
-        print(f"No keywords found in range {start_id}-{end_id}")
+        logger.warning("No keywords found in range %s-%s", start_id, end_id)
         return
     
     # Initialize list to store all scraped data
-    all_scraped_data = []
+    metrics.start_metrics("zara")
+    # A watchdog restart resumes after the keywords the checkpoint already covers
+    all_scraped_data, done_keyword_ids = heartbeat.load_checkpoint()
+    if done_keyword_ids:
+        logger.info("⏩ Resuming from checkpoint: %s keywords and %s products already done", len(done_keyword_ids), len(all_scraped_data))
+    output_file = get_output_file('zara_scraped_data.json')
+    base_url = get_base_url("https://www.zara.com/in/")
     
     # Set up Chrome options (prevent background throttling and ensure images load when minimized)
     chrome_options = Options()
@@ -627,198 +655,230 @@ def main():
     chrome_options.add_argument("--force-device-scale-factor=1")
     chrome_options.add_argument("--disable-features=TranslateUI")
     
-    # Initialize the driver with proper Chrome path for macOS
-    try:
-        # Try to get the correct ChromeDriver for ARM64 Mac
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    except Exception as e:
-        print(f"Error initializing Chrome driver: {e}")
-        print("Trying alternative Chrome path...")
-        # Alternative approach for macOS
-        chrome_options.binary_location = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    
-    try:
+    def open_search(driver):
+        """Load the page with the search box: the home page, then the header search link if needed"""
         # Navigate to Zara.com
-        print("Navigating to Zara.com...")
-        driver.get("https://www.zara.com/in/")
+        logger.debug("Navigating to Zara.com...")
+        driver.get(base_url)
         
         # Wait for page to load
         time.sleep(3)
         
-        # Find the link with class "layout-header-action__link"
-        print("Looking for link with class 'layout-header-action__link'...")
-        link_element = driver.find_element(By.CLASS_NAME, "layout-header-action__link")
-        
-        # Get the href
-        href = link_element.get_attribute("href")
-        print(f"Found link with href: {href}")
-        
-        # Click the link
-        print("Clicking the link...")
-        link_element.click()
-        
-        # Wait for the new page to load
-        time.sleep(3)
-        
-        # Loop through each keyword
-        for i, keyword_obj in enumerate(filtered_keywords):
-            keyword_id = keyword_obj["id"]
-            keyword = keyword_obj["keyword"]
-            print(f"\nSearching for keyword {i+1}/{len(filtered_keywords)}: '{keyword}' (ID: {keyword_id})")
-            
-            # Find the search input with id "search-home-form-combo-input"
-            search_input = driver.find_element(By.ID, "search-home-form-combo-input")
-            
-            # Clear the input field
-            search_input.clear()
+        # A warm profile usually lands straight on a page with the search box; otherwise go
+        # through the header link with class "layout-header-action__link"
+        if driver.find_elements(By.ID, "search-home-form-combo-input"):
+            logger.debug("Search input already available, skipping the header link")
+        else:
+            logger.debug("Looking for link with class 'layout-header-action__link'...")
+            link_element = driver.find_element(By.CLASS_NAME, "layout-header-action__link")
             
-            # Type the keyword
-            search_input.send_keys(keyword)
-            print(f"Typed: {keyword}")
+            # Get the href
+            href = link_element.get_attribute("href")
+            logger.debug("Found link with href: %s", href)
             
-            # Hit Enter
-            search_input.send_keys(Keys.RETURN)
-            print("Pressed Enter")
+            # Click the link
+            logger.debug("Clicking the link...")
+            link_element.click()
             
-            # Wait for search results to load
+            # Wait for the new page to load
             time.sleep(3)
-            
-            # Find all product result links
-            print("Looking for product result links...")
-            product_links = driver.find_elements(By.CLASS_NAME, "product-grid-product__link")
-            print(f"Found {len(product_links)} product links")
-            
-            # Visit first 10 results (or all if less than 10)
-            results_to_visit = min(10, len(product_links))
-            print(f"Visiting first {results_to_visit} results...")
-            
-            for j in range(results_to_visit):
-                try:
-                    print(f"\nVisiting result {j+1}/{results_to_visit}")
-                    
-                    # Re-find product links each time to avoid stale element reference
-                    product_links = driver.find_elements(By.CLASS_NAME, "product-grid-product__link")
-                    
-                    if j >= len(product_links):
-                        print(f"No more product links available (tried to access index {j})")
-                        break
-                    
-                    # Get the product link
-                    product_link = product_links[j]
-                    product_url = product_link.get_attribute("href")
-                    print(f"Product URL: {product_url}")
-                    
-                    # Click on the product link
-                    product_link.click()
-                    print("Clicked on product link")
-                    
-                    # Wait for product page to load
-                    time.sleep(3)
-
-                    # Initialize product data structure with unified format
-                    product_data = {
-                        "site": "zara",
-                        "product_url": product_url,
-                        "keyword_id": keyword_id,
-                        "keyword": keyword,
-                        "product_id": "Not found",
-                        "brand_name": "Not applicable",
-                        "product_name": "Not found",
-                        "product_rating": "Not applicable",
-                        "product_rating_count": "Not applicable",
-                        "current_product_price": "Not found",
-                        "original_product_price": "Not found",
-                        "product_color": "Not found",
-                        "product_description": "Not found",
-                        "product_sizes_available": [],
-                        "product_sizes_coming_soon": [],
-                        "product_sizes_out_of_stock": [],
-                        "product_image_urls": [],
-                        "additional_information": "Not found"
-                    }
 
-                    # Extract product ID from URL
-                    try:
-                        current_url = driver.current_url
-                        parsed_url = urlparse(current_url)
-                        query_params = parse_qs(parsed_url.query)
-                        product_id = query_params.get('v1', ['Not found'])[0]
-                        product_data["product_id"] = product_id
-                        print(f"Product ID: {product_id}")
-                    except Exception as e:
-                        print(f"Product ID not found: {e}")
+    def start_browser():
+        # Initialize the driver on a warm profile (falls back to the macOS Chrome path)
+        driver = create_driver(chrome_options, "zara")
+        try:
+            open_search(driver)
+        except Exception:
+            # A launch that never reached the search box must not keep its profile locked
+            retire_driver(driver, healthy=False)
+            raise
+        return driver
+    
+    def scrape_keyword(i, keyword_obj):
+        """Products for one keyword; a lost browser session propagates so the keyword is retried"""
+        products = []
+        driver = lifecycle.driver
+        keyword_id = keyword_obj["id"]
+        keyword = keyword_obj["keyword"]
+        logger.info("Searching for keyword %s/%s: '%s' (ID: %s)", i+1, len(filtered_keywords), keyword, keyword_id)
+        
+        # Find the search input with id "search-home-form-combo-input"
+        search_started = time.time()
+        heartbeat.beat("search", keyword_id=keyword_id, keyword=keyword)
+        search_input = driver.find_element(By.ID, "search-home-form-combo-input")
+        
+        # Clear the input field
+        search_input.clear()
+        
+        # Type the keyword
+        search_input.send_keys(keyword)
+        logger.debug("Typed: %s", keyword)
+        
+        # Hit Enter
+        search_input.send_keys(Keys.RETURN)
+        logger.debug("Pressed Enter")
+        
+        # Wait for search results to load
+        time.sleep(3)
+        lifecycle.page_served()
+        metrics.observe_phase("search", search_started)
+        snapshot_recorder.capture(driver, "zara", "search", keyword_id=keyword_id, keyword=keyword)
+        
+        # Find all product result links
+        logger.debug("Looking for product result links...")
+        product_links = driver.find_elements(By.CLASS_NAME, "product-grid-product__link")
+        logger.info("Found %s product links", len(product_links))
+        if not product_links:
+            metrics.record_empty_results()
+        
+        # Collected up front so a browser recycle between products keeps our place
+        product_urls = []
+        for product_link in product_links[:10]:
+            try:
+                product_urls.append(product_link.get_attribute("href"))
+            except Exception as e:
+                if is_session_error(e):
+                    raise
+                logger.debug("Product link not found: %s", e)
+        
+        # Visit first 10 results (or all if less than 10)
+        results_to_visit = len(product_urls)
+        logger.info("Visiting first %s results...", results_to_visit)
+        
+        for j, product_url in enumerate(product_urls):
+            try:
+                lifecycle.maybe_recycle()
+                driver = lifecycle.driver
+                logger.debug("Visiting result %s/%s", j+1, results_to_visit)
+                logger.debug("Product URL: %s", product_url)
+                
+                # Open the product page directly instead of clicking through the grid
+                pdp_started = time.time()
+                heartbeat.beat("pdp_load", product=product_url)
+                with tracing.span("pdp.get"):
+                    driver.get(product_url)
+                logger.debug("Opened product page")
+                
+                # Wait for product page to load
+                tracing.sleep(3, "wait_pdp_load")
+                lifecycle.page_served()
+                metrics.observe_phase("pdp_load", pdp_started)
+                extraction_started = time.time()
+                heartbeat.beat("extraction")
 
-                    # Extract product header
-                    try:
-                        product_header = driver.find_element(By.CLASS_NAME, "product-detail-info__header-name")
-                        product_data["product_name"] = product_header.text
-                        print(f"Product header text: {product_data['product_name']}")
-                    except Exception as e:
-                        print(f"Product header not found: {e}")
-                    
-                    # Extract original product price
-                    try:
-                        product_price = driver.find_element(By.CSS_SELECTOR, "span.price-old__amount>div.money-amount>span.money-amount__main")
-                        product_data["original_product_price"] = product_price.text
-                        print(f"Product price text: {product_data['original_product_price']}")
-                    except Exception as e:
-                        print(f"Product price not found: {e}")
+                # Initialize product data structure with unified format
+                product_data = {
+                    "site": "zara",
+                    "product_url": product_url,
+                    "keyword_id": keyword_id,
+                    "keyword": keyword,
+                    "product_id": "Not found",
+                    "brand_name": "Not applicable",
+                    "product_name": "Not found",
+                    "product_rating": "Not applicable",
+                    "product_rating_count": "Not applicable",
+                    "current_product_price": "Not found",
+                    "original_product_price": "Not found",
+                    "product_color": "Not found",
+                    "product_description": "Not found",
+                    "product_sizes_available": [],
+                    "product_sizes_coming_soon": [],
+                    "product_sizes_out_of_stock": [],
+                    "product_image_urls": [],
+                    "additional_information": "Not found"
+                }
 
-                    # Extract current product price
-                    try:
-                        product_price = driver.find_element(By.CSS_SELECTOR, "span.price-current__amount>div.money-amount>span.money-amount__main")
-                        product_data["current_product_price"] = product_price.text
-                        print(f"Product price text: {product_data['current_product_price']}")
-                    except Exception as e:
-                        print(f"Product price not found: {e}")
+                # Extract product ID from URL
+                try:
+                    current_url = driver.current_url
+                    parsed_url = urlparse(current_url)
+                    query_params = parse_qs(parsed_url.query)
+                    product_id = query_params.get('v1', ['Not found'])[0]
+                    product_data["product_id"] = product_id
+                    logger.debug("Product ID: %s", product_id)
+                except Exception as e:
+                    logger.debug("Product ID not found: %s", e)
 
-                    # Extract product color
-                    try:
-                        product_color = driver.find_element(By.CSS_SELECTOR, "p.product-color-extended-name")
-                        product_data["product_color"] = product_color.text
-                        print(f"Product color text: {product_data['product_color']}")
-                    except Exception as e:
-                        print(f"Product color not found: {e}")
+                # Extract product header
+                try:
+                    product_header = driver.find_element(By.CLASS_NAME, "product-detail-info__header-name")
+                    product_data["product_name"] = product_header.text
+                    logger.debug("Product header text: %s", product_data['product_name'])
+                except Exception as e:
+                    logger.debug("Product header not found: %s", e)
+                
+                # Extract original product price
+                try:
+                    product_price = driver.find_element(By.CSS_SELECTOR, "span.price-old__amount>div.money-amount>span.money-amount__main")
+                    product_data["original_product_price"] = product_price.text
+                    logger.debug("Product price text: %s", product_data['original_product_price'])
+                except Exception as e:
+                    logger.debug("Product price not found: %s", e)
 
-                    # Extract product description
-                    try:
-                        product_description = driver.find_element(By.CSS_SELECTOR, "div.expandable-text__inner-content>p")
-                        product_data["product_description"] = product_description.text
-                        print(f"Product description text: {product_data['product_description']}")
-                    except Exception as e:
-                        print(f"Product description not found: {e}")
+                # Extract current product price
+                try:
+                    product_price = driver.find_element(By.CSS_SELECTOR, "span.price-current__amount>div.money-amount>span.money-amount__main")
+                    product_data["current_product_price"] = product_price.text
+                    logger.debug("Product price text: %s", product_data['current_product_price'])
+                except Exception as e:
+                    logger.debug("Product price not found: %s", e)
 
-                    # Extract product composition (may not exist on all products)
-                    try:
-                        product_composition = driver.find_element(By.CSS_SELECTOR, "div.product-detail-composition>span")
-                        product_data["additional_information"] = product_composition.text
-                        print(f"Additional information: {product_data['additional_information']}")
-                    except Exception as e:
-                        print(f"Product composition not found: {e}")
+                # Extract product color
+                try:
+                    product_color = driver.find_element(By.CSS_SELECTOR, "p.product-color-extended-name")
+                    product_data["product_color"] = product_color.text
+                    logger.debug("Product color text: %s", product_data['product_color'])
+                except Exception as e:
+                    logger.debug("Product color not found: %s", e)
+
+                # Extract product description
+                try:
+                    product_description = driver.find_element(By.CSS_SELECTOR, "div.expandable-text__inner-content>p")
+                    product_data["product_description"] = product_description.text
+                    logger.debug("Product description text: %s", product_data['product_description'])
+                except Exception as e:
+                    logger.debug("Product description not found: %s", e)
+
+                # Extract product composition (may not exist on all products)
+                try:
+                    product_composition = driver.find_element(By.CSS_SELECTOR, "div.product-detail-composition>span")
+                    product_data["additional_information"] = product_composition.text
+                    logger.debug("Additional information: %s", product_data['additional_information'])
+                except Exception as e:
+                    logger.debug("Product composition not found: %s", e)
 
-                    # Extract product sizes
+                # Extract product sizes
+                sizes_started = time.time()
+                try:
+                    static_sizes = read_product_sizes(driver, product_data["product_id"])
+                except Exception as e:
+                    static_sizes = None
+                    logger.debug("Could not read sizes from the page: %s", e)
+                if static_sizes:
+                    product_data.update(static_sizes)
+                    logger.debug("Product sizes available: %s", product_data['product_sizes_available'])
+                    logger.debug("Product sizes coming soon: %s", product_data['product_sizes_coming_soon'])
+                    logger.debug("Product sizes out of stock: %s", product_data['product_sizes_out_of_stock'])
+                else:
                     try:
                         add_to_bag_button = driver.find_element(By.CSS_SELECTOR, "div.product-detail-cart-buttons__main-action>button.product-detail-cart-buttons__button")
-                        
+                    
                         # Scroll the button into view to avoid click interception
                         driver.execute_script("arguments[0].scrollIntoView();", add_to_bag_button)
-                        time.sleep(1)
-                        
+                        tracing.sleep(1, "wait_add_to_bag_scroll")
+                    
                         # Use JavaScript click to avoid element interception
                         driver.execute_script("arguments[0].click();", add_to_bag_button)
-                        print("Clicked on add to bag button")
-                        time.sleep(2)
-                        print("dropdown opened")
-                        
+                        logger.debug("Clicked on add to bag button")
+                        tracing.sleep(2, "wait_size_dropdown")
+                        logger.debug("dropdown opened")
+                    
                         product_size_dropdown = driver.find_elements(By.CSS_SELECTOR, "button.size-selector-sizes-size__button")
                         for size_button in product_size_dropdown:
                             size_label = size_button.find_element(By.CSS_SELECTOR, "div.size-selector-sizes-size__label")
                             size_text = size_label.text
                             data_qa_action = size_button.get_attribute("data-qa-action")
-                            
+                        
                             if data_qa_action == "size-in-stock":
                                 product_data["product_sizes_available"].append(size_text)
                             elif data_qa_action == "size-back-soon":
@@ -826,77 +886,108 @@ def main():
                             elif data_qa_action == "size-out-of-stock":
                                 product_data["product_sizes_out_of_stock"].append(size_text)
 
-                        print(f"Product sizes available: {product_data['product_sizes_available']}")
-                        print(f"Product sizes coming soon: {product_data['product_sizes_coming_soon']}")
-                        print(f"Product sizes out of stock: {product_data['product_sizes_out_of_stock']}")
-                    except Exception as e:
-                        print(f"Product sizes not found: {e}")
-
-                    # Extract product images LAST (using comprehensive diagnostic function)
-                    try:
-                        product_data["product_image_urls"] = extract_product_images_comprehensive(driver)
-                        print(f"Final product images: {len(product_data['product_image_urls'])} images found")
-                        print(f"Product images: {product_data['product_image_urls']}")
+                        logger.debug("Product sizes available: %s", product_data['product_sizes_available'])
+                        logger.debug("Product sizes coming soon: %s", product_data['product_sizes_coming_soon'])
+                        logger.debug("Product sizes out of stock: %s", product_data['product_sizes_out_of_stock'])
                     except Exception as e:
-                        print(f"Product images not found: {e}")
+                        logger.debug("Product sizes not found: %s", e)
+                tracing.add_span("size_dropdown", sizes_started, source="page" if static_sizes else "dropdown")
 
-                    # Add product data to the main list
-                    all_scraped_data.append(product_data)
-                    print(f"Added product data for: {product_data['product_name']}")
+                metrics.observe_phase("extraction", extraction_started)
 
-                    # Go back to search results
-                    print("Going back to search results...")
-                    driver.back()
-                    time.sleep(2)
-                    
+                # Extract product images LAST
+                images_started = time.time()
+                heartbeat.beat("images")
+                try:
+                    product_data["product_image_urls"] = resolve_product_images(driver)
+                    logger.debug("Final product images: %s images found", len(product_data['product_image_urls']))
+                    logger.debug("Product images: %s", product_data['product_image_urls'])
                 except Exception as e:
-                    print(f"Error visiting result {j+1}: {e}")
-                    continue
-            
-            print(f"Completed visiting {results_to_visit} results for keyword: '{keyword}'")
-            
-            # Go back to the previous page for next search (if not the last keyword)
-            if i < len(keywords_data) - 1:
-                print("Going back for next search...")
-                driver.back()
-                time.sleep(2)
+                    logger.debug("Product images not found: %s", e)
+                metrics.observe_phase("images", images_started)
+                snapshot_recorder.capture(driver, "zara", "pdp", product_url, keyword_id, keyword)
+
+                # Fields fail fast once Chrome is gone; do not keep such an empty product
+                lifecycle.ensure_alive()
+                products.append(product_data)
+                metrics.record_product(product_data)
+                logger.info("Added product data for: %s", product_data['product_name'])
+                tracing.add_span("product", pdp_started, product_url=product_url)
+                
+            except Exception as e:
+                if is_session_error(e):
+                    raise
+                logger.warning("Error visiting result %s: %s", j+1, e)
+                continue
+        
+        logger.info("Completed visiting %s results for keyword: '%s'", results_to_visit, keyword)
+        metrics.keyword_done()
+        # Only finished keywords count as done; a queue worker hands the rest back
+        done_keyword_ids.add(str(keyword_id))
         
+        # Open the search page again for the next search (if not the last keyword)
+        if i < len(filtered_keywords) - 1:
+            logger.debug("Opening the search page for the next search...")
+            open_search(lifecycle.driver)
+        return products
+
+    lifecycle = DriverLifecycle("zara", start_browser)
+    
+    try:
+        lifecycle.start()
+        
+        # Loop through each keyword
+        for i, keyword_obj in enumerate(filtered_keywords):
+            if str(keyword_obj["id"]) in done_keyword_ids:
+                continue
+            lifecycle.maybe_recycle()
+            all_scraped_data.extend(lifecycle.run_keyword(keyword_obj["keyword"], scrape_keyword, i, keyword_obj))
+            heartbeat.save_checkpoint(all_scraped_data, done_keyword_ids)
+
         # Save all scraped data to individual JSON file
-        print(f"\nSaving {len(all_scraped_data)} products to zara_scraped_data.json...")
+        logger.info("Saving %s products to %s...", len(all_scraped_data), output_file)
         try:
-            with open('zara_scraped_data.json', 'w', encoding='utf-8') as f:
+            with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
-            print("Data saved successfully to zara_scraped_data.json")
+            logger.info("Data saved successfully to %s", output_file)
         except Exception as e:
-            print(f"Error saving data: {e}")
+            logger.error("Error saving data: %s", e)
         
         # Wait for 10 seconds after all searches are done
-        print("\nAll searches completed. Waiting for 10 seconds...")
+        logger.info("All searches completed. Waiting for 10 seconds...")
         time.sleep(10)
         
-        print("Done!")
+        logger.info("Done!")
         
     except KeyboardInterrupt:
-        print("\n🛑 Scraping interrupted by user (Ctrl+C)")
-        print("💾 Saving all collected data before shutdown...")
+        logger.warning("🛑 Scraping interrupted by user (Ctrl+C)")
+        logger.info("💾 Saving all collected data before shutdown...")
         
         # Save all scraped data before shutting down
         try:
-            with open('zara_scraped_data.json', 'w', encoding='utf-8') as f:
+            with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
-            print(f"✅ Saved {len(all_scraped_data)} products to zara_scraped_data.json")
+            logger.info("✅ Saved %s products to %s", len(all_scraped_data), output_file)
         except Exception as e:
-            print(f"❌ Error saving data during shutdown: {e}")
+            logger.error("❌ Error saving data during shutdown: %s", e)
         
-        print("🔚 Graceful shutdown completed")
+        logger.info("🔚 Graceful shutdown completed")
         
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
+        # e.g. the browser could not be restarted; keep what the finished keywords produced
+        logger.info("💾 Saving the %s products collected so far...", len(all_scraped_data))
+        try:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(all_scraped_data, f, indent=2, ensure_ascii=False)
+            logger.info("✅ Saved %s products to %s", len(all_scraped_data), output_file)
+        except Exception as save_error:
+            logger.error("❌ Error saving data: %s", save_error)
     
     finally:
         # Close the browser
-        driver.quit()
-        print("Browser closed")
+        lifecycle.quit()
+        logger.info("Browser closed")
 
 if __name__ == "__main__":
     main()